@@ -5,18 +5,12 @@ import time
 import numpy as np
 from pipewine import (
     Mapper,
-    Dataset,
     Sample,
     UnderfolderSource,
     MapOp,
     CacheOp,
-    FIFOCache,
-    LIFOCache,
-    RRCache,
-    LRUCache,
-    MemoCache,
-    MRUCache,
 )
+from pipewine.benchmarks import ACCESS_PATTERNS, CACHE_POLICIES
 
 try:
     import matplotlib.pyplot as plt
@@ -47,29 +41,26 @@ if __name__ == "__main__":
     n = 26000
     maxind = 26
 
+    rng = np.random.default_rng()
     patterns = {
-        "Cyclic": (np.arange(n) % maxind).tolist(),
-        "Back and Forth": np.abs(np.arange(n) % (2 * maxind - 1) - maxind + 1).tolist(),
-        "Hot Element": ((np.arange(n) // 2 % maxind) * (np.arange(n) % 2)).tolist(),
-        "Blocks": (np.arange(n) // 4 % maxind).tolist(),
-        "Sliding Window": (
-            (np.arange(4)[None] + np.arange(6500)[:, None]).flatten() % 26
-        ).tolist(),
-        "Uniform": np.random.randint(0, maxind - 1, [n]).tolist(),
-        "Zipfian": (np.random.zipf(2, n) % maxind).tolist(),
-        "Random Walk": (
-            (np.random.randn(n) + 0.5).cumsum().astype(np.int64) % maxind
-        ).tolist(),
+        name.replace("_", " ").title(): generator(n, maxind, rng)
+        for name, generator in ACCESS_PATTERNS.items()
     }
 
-    caches = {
-        "RR": (RRCache, "#15ac37"),
-        "FIFO": (FIFOCache, "#1237a7"),
-        "LIFO": (LIFOCache, "#2599c3"),
-        "LRU": (LRUCache, "#e68624"),
-        "MRU": (MRUCache, "#d73677"),
-        # "Memo": (MemoCache, "#f23022"), # Unfair comparison!
+    colors = {
+        "RR": "#15ac37",
+        "FIFO": "#1237a7",
+        "LIFO": "#2599c3",
+        "LRU": "#e68624",
+        "MRU": "#d73677",
+        "CLOCK": "#8c564b",
+        "LFU": "#7f7f7f",
+        "2Q": "#bcbd22",
+        "ARC": "#9467bd",
+        "W-TinyLFU": "#17becf",
+        "GDS": "#ff9896",
     }
+    caches = {name: (CACHE_POLICIES[name], color) for name, color in colors.items()}
 
     results: dict[str, list[float]] = defaultdict(list)
     for pattern_name, pattern in patterns.items():
@@ -77,10 +68,7 @@ if __name__ == "__main__":
             mapper = SlowMapper()
             slow_map = MapOp(mapper)
             dataset = slow_map(UnderfolderSource(path)())
-            if issubclass(cache, MemoCache):
-                dataset = CacheOp(cache)(dataset)
-            else:
-                dataset = CacheOp(cache, maxsize=maxsize)(dataset)
+            dataset = CacheOp(cache, maxsize=maxsize)(dataset)
             for idx in pattern:
                 sample = dataset[idx]
                 letter = sample["metadata"]()["letter"]
@@ -1,8 +1,8 @@
 """Pipewine root package, containing all the core classes and functions of the library.
 
-Everything except the `pipewine.workflows` and `pipewine.cli` modules is imported here,
-so that the user can conveniently access the most important classes and functions
-directly from the `pipewine` package.
+Everything except the `pipewine.workflows`, `pipewine.cli` and `pipewine.benchmarks`
+modules is imported here, so that the user can conveniently access the most important
+classes and functions directly from the `pipewine` package.
 
 The Pipewine API reference documentation is available as docstrings in every public
 module, class, function and attribute. This form of documentation assumes is intended to
@@ -17,14 +17,19 @@ __version__ = "0.2.0"
 """Pipewine package version."""
 
 from pipewine.bundle import Bundle, BundleMeta
-from pipewine.dataset import Dataset, LazyDataset, ListDataset
+from pipewine.dataset import Dataset, IndexedDataset, LazyDataset, ListDataset
 from pipewine.grabber import Grabber
 from pipewine.item import CachedItem, Item, MemoryItem, StoredItem
 from pipewine.mappers.base import Mapper
 from pipewine.mappers.cache import CacheMapper
 from pipewine.mappers.compose import ComposeMapper
 from pipewine.mappers.crypto import HashedSample, HashMapper
-from pipewine.mappers.item_transform import ConvertMapper, ShareMapper
+from pipewine.mappers.item_transform import (
+    ConvertMapper,
+    ShareMapper,
+    ThumbnailMapper,
+)
+from pipewine.mappers.perceptual import PerceptualHashedSample, PerceptualHashMapper
 from pipewine.mappers.key_transform import (
     DuplicateItemMapper,
     FilterKeysMapper,
@@ -33,18 +38,40 @@ from pipewine.mappers.key_transform import (
 )
 from pipewine.operators.base import DatasetOperator, IdentityOp
 from pipewine.operators.cache import (
+    ARCCache,
+    BoundedCache,
     Cache,
     CacheOp,
+    CacheStats,
+    ClockCache,
+    CompressedCache,
+    DiskCache,
     FIFOCache,
+    GreedyDualSizeCache,
     ItemCacheOp,
+    LFUCache,
     LIFOCache,
     LRUCache,
     MemoCache,
     MemorizeEverythingOp,
     MRUCache,
+    PrefetchOp,
     RRCache,
+    ShardedCache,
+    SharedCache,
+    TieredCache,
+    TwoQCache,
+    WTinyLFUCache,
+    estimate_nbytes,
+)
+from pipewine.operators.dedup import DedupOp, DuplicatesSample, NearDuplicatesOp
+from pipewine.operators.functional import (
+    FilterOp,
+    GroupByOp,
+    KeyIndexOp,
+    MapOp,
+    SortOp,
 )
-from pipewine.operators.functional import FilterOp, GroupByOp, MapOp, SortOp
 from pipewine.operators.iter import (
     CycleOp,
     IndexOp,
@@ -53,18 +80,25 @@ from pipewine.operators.iter import (
     ReverseOp,
     SliceOp,
 )
-from pipewine.operators.merge import CatOp, ZipOp
+from pipewine.operators.merge import CatOp, JoinOp, ZipOp
+from pipewine.operators.neighbors import NearestNeighborsOp, NeighborsSample
 from pipewine.operators.rand import ShuffleOp
 from pipewine.operators.split import BatchOp, ChunkOp, SplitOp
-from pipewine.parsers.base import Parser, ParserRegistry
+from pipewine.parsers.base import ArrayInfo, Parser, ParserRegistry
 from pipewine.parsers.image_parser import (
     BmpParser,
     ImageParser,
     JpegParser,
     PngParser,
     TiffParser,
+    box_reduce,
+)
+from pipewine.parsers.metadata_parser import (
+    JSONParser,
+    MetadataBackend,
+    MetadataBackendRegistry,
+    YAMLParser,
 )
-from pipewine.parsers.metadata_parser import JSONParser, YAMLParser
 from pipewine.parsers.numpy_parser import NumpyNpyParser
 from pipewine.parsers.pickle_parser import PickleParser
 from pipewine.reader import LocalFileReader, Reader
@@ -0,0 +1,152 @@
+"""Private module for fingerprinting utilities used by the `pipewine` package."""
+
+import hashlib
+import re
+import types
+from collections.abc import Hashable
+from functools import partial
+from typing import Any
+
+import numpy as np
+
+from pipewine.item import CachedItem, Item, StoredItem
+
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+_CLASS_MEMBERS = (types.FunctionType, staticmethod, classmethod, property)
+
+
+def _sorted(values: list) -> list:
+    return sorted(values, key=repr)
+
+
+def _class_code(cls: type, seen: set[int]) -> list:
+    # Code of the methods defined by the class and by its bases, except builtins.
+    members = []
+    for base in cls.__mro__:
+        if base.__module__ == "builtins":
+            continue
+        for name, value in base.__dict__.items():
+            if isinstance(value, _CLASS_MEMBERS):
+                func = value.fget if isinstance(value, property) else value
+                func = getattr(func, "__func__", func)
+                members.append((base.__qualname__, name, _canonical(func, seen)))
+    return _sorted(members)
+
+
+def _canonical(obj: Any, seen: set[int]) -> Any:
+    # Nested structure of builtin values whose repr is stable across runs.
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        return obj
+    if id(obj) in seen:
+        return "<cycle>"
+    seen = seen | {id(obj)}
+    if isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, [_canonical(x, seen) for x in obj])
+    if isinstance(obj, dict):
+        items = [(_canonical(k, seen), _canonical(v, seen)) for k, v in obj.items()]
+        return ("dict", _sorted(items))
+    if isinstance(obj, (set, frozenset)):
+        return ("set", _sorted([_canonical(x, seen) for x in obj]))
+    if isinstance(obj, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest()
+        return ("ndarray", obj.dtype.str, obj.shape, digest)
+    if isinstance(obj, types.CodeType):
+        consts = [_canonical(x, seen) for x in obj.co_consts]
+        return ("code", obj.co_code, obj.co_names, consts)
+    if isinstance(obj, types.FunctionType):
+        cells = [_canonical(x.cell_contents, seen) for x in obj.__closure__ or ()]
+        return (
+            "function",
+            obj.__module__,
+            obj.__qualname__,
+            _canonical(obj.__code__, seen),
+            _canonical(obj.__defaults__, seen),
+            _canonical(obj.__kwdefaults__, seen),
+            cells,
+        )
+    if isinstance(obj, types.MethodType):
+        return (
+            "method",
+            _canonical(obj.__func__, seen),
+            _canonical(obj.__self__, seen),
+        )
+    if isinstance(obj, partial):
+        return (
+            "partial",
+            _canonical(obj.func, seen),
+            _canonical(obj.args, seen),
+            _canonical(obj.keywords, seen),
+        )
+    if isinstance(obj, (types.BuiltinFunctionType, types.ModuleType)):
+        return (type(obj).__name__, getattr(obj, "__module__", None), obj.__name__)
+    if isinstance(obj, type):
+        if obj.__module__ == "builtins":
+            return ("type", obj.__qualname__)
+        return ("type", obj.__module__, obj.__qualname__, _class_code(obj, seen))
+    try:
+        state = obj.__getstate__()
+    except Exception:
+        state = _ADDRESS.sub("", repr(obj))
+    return ("object", _canonical(type(obj), seen), _canonical(state, seen))
+
+
+def stable_digest(obj: Any) -> str:
+    """Compute a digest of an object that is stable across runs and changes whenever
+    its state or its code change.
+
+    Contrary to hashing the pickled object, the digest does not depend on the iteration
+    order of sets and dicts, and it covers the code of functions and of the methods of
+    classes, so that editing a function or a mapper changes the digest.
+
+    Args:
+        obj (Any): The object to digest, e.g. a function or a mapper.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    return hashlib.sha256(repr(_canonical(obj, set())).encode()).hexdigest()
+
+
+def item_fingerprint(item: Item) -> Hashable | None:
+    """Fingerprint of the source of an item, e.g. the modification time and size of
+    the file it is read from, without reading it.
+
+    Args:
+        item (Item): The item, cached items are unwrapped.
+
+    Returns:
+        Hashable | None: The fingerprint, or None if the item is not stored or its
+            reader cannot detect changes.
+    """
+    if isinstance(item, CachedItem):
+        item = item.source_recursive
+    if isinstance(item, StoredItem):
+        return item.reader.fingerprint()
+    return None
+
+
+def _describe(obj: Any) -> str:
+    # Cheap description of the type and of the attributes of an object.
+    state = sorted(getattr(obj, "__dict__", {}).items())
+    return _ADDRESS.sub("", repr((type(obj).__module__, type(obj).__qualname__, state)))
+
+
+def item_key(item: Item) -> str | None:
+    """Key identifying the data of a stored item without reading it, made of its
+    reader (e.g. the path of the file), its parser and the fingerprint of the reader.
+
+    Args:
+        item (Item): The item, cached items are unwrapped.
+
+    Returns:
+        str | None: The key, or None if the item is not stored or its reader cannot
+            detect changes.
+    """
+    if isinstance(item, CachedItem):
+        item = item.source_recursive
+    if not isinstance(item, StoredItem):
+        return None
+    fingerprint = item.reader.fingerprint()
+    if fingerprint is None:
+        return None
+    return repr((_describe(item.reader), _describe(item.parser), fingerprint))
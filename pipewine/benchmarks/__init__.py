@@ -0,0 +1,22 @@
+"""Package for Pipewine benchmarks, that run headless and write their results to JSON."""
+
+from pipewine.benchmarks.cache import (
+    ACCESS_PATTERNS,
+    CACHE_POLICIES,
+    AccessPattern,
+    CacheBenchmarkResult,
+    ContentionBenchmarkResult,
+    ContentionStats,
+    LatencyStats,
+    benchmark_cache,
+    run_cache_benchmark,
+    run_contention_benchmark,
+    save_results,
+)
+from pipewine.benchmarks.metadata import (
+    METADATA_FORMATS,
+    MetadataBenchmarkResult,
+    benchmark_metadata_backend,
+    make_metadata,
+    run_metadata_benchmark,
+)
@@ -0,0 +1,472 @@
+"""Headless benchmarks for the cache eviction policies."""
+
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from pipewine.operators.cache import (
+    ARCCache,
+    Cache,
+    ClockCache,
+    FIFOCache,
+    GreedyDualSizeCache,
+    LFUCache,
+    LIFOCache,
+    LRUCache,
+    MRUCache,
+    RRCache,
+    ShardedCache,
+    TwoQCache,
+    WTinyLFUCache,
+)
+
+AccessPattern = Callable[[int, int, np.random.Generator], list[int]]
+"""Type alias for access pattern generators, functions that accept the number of
+accesses, the number of distinct keys and a random number generator, and return the
+list of keys to access.
+"""
+
+
+def cyclic(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys from first to last in multiple cycles."""
+    return (np.arange(n) % keys).tolist()
+
+
+def back_and_forth(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys from first to last in even cycles, from last to first in odd
+    cycles.
+    """
+    return np.abs(np.arange(n) % max(1, 2 * keys - 1) - keys + 1).tolist()
+
+
+def hot_element(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the first key at every even index and the keys in cycles at every odd
+    index.
+    """
+    return ((np.arange(n) // 2 % keys) * (np.arange(n) % 2)).tolist()
+
+
+def blocks(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys in cycles, repeating every key 4 times in a row."""
+    return (np.arange(n) // 4 % keys).tolist()
+
+
+def sliding_window(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys in groups of 4 increasing keys, shifting the group by one key
+    at a time.
+    """
+    return ((np.arange(n) // 4 + np.arange(n) % 4) % keys).tolist()
+
+
+def uniform(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys in random order, sampled from a uniform distribution."""
+    return rng.integers(0, keys, n).tolist()
+
+
+def zipfian(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys in random order, sampled from a Zipfian distribution."""
+    return (rng.zipf(2, n) % keys).tolist()
+
+
+def zipfian_scans(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Alternate Zipfian accesses with scans of all the keys from first to last."""
+    scans = np.arange(n) % (4 * keys) >= 2 * keys
+    return np.where(scans, np.arange(n) % keys, rng.zipf(2, n) % keys).tolist()
+
+
+def random_walk(n: int, keys: int, rng: np.random.Generator) -> list[int]:
+    """Access the keys in random order, adding to the previous key a random shift
+    sampled from a normal distribution with a small positive mean.
+    """
+    return ((rng.standard_normal(n) + 0.5).cumsum().astype(np.int64) % keys).tolist()
+
+
+ACCESS_PATTERNS: dict[str, AccessPattern] = {
+    "cyclic": cyclic,
+    "back_and_forth": back_and_forth,
+    "hot_element": hot_element,
+    "blocks": blocks,
+    "sliding_window": sliding_window,
+    "uniform": uniform,
+    "zipfian": zipfian,
+    "zipfian_scans": zipfian_scans,
+    "random_walk": random_walk,
+}
+"""Built-in access pattern generators, by name."""
+
+CACHE_POLICIES: dict[str, type[Cache]] = {
+    "RR": RRCache,
+    "FIFO": FIFOCache,
+    "LIFO": LIFOCache,
+    "LRU": LRUCache,
+    "MRU": MRUCache,
+    "CLOCK": ClockCache,
+    "LFU": LFUCache,
+    "2Q": TwoQCache,
+    "ARC": ARCCache,
+    "W-TinyLFU": WTinyLFUCache,
+    "GDS": GreedyDualSizeCache,
+}
+"""Built-in bounded cache policies, by name."""
+
+
+@dataclass
+class LatencyStats:
+    """Latency statistics of a cache operation, in nanoseconds. The latency includes
+    the overhead of the timer, which is in the order of tens of nanoseconds.
+    """
+
+    count: int
+    """Number of measured operations."""
+    mean: float
+    """Mean latency."""
+    p50: float
+    """Median latency."""
+    p99: float
+    """99th percentile of the latency."""
+    max: float
+    """Maximum latency."""
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[int]) -> "LatencyStats":
+        """Compute the statistics of a sequence of latency measurements.
+
+        Args:
+            samples (Sequence[int]): The measured latencies, in nanoseconds.
+
+        Returns:
+            LatencyStats: The statistics, all zero if there are no measurements.
+        """
+        if len(samples) == 0:
+            return cls(0, 0.0, 0.0, 0.0, 0.0)
+        array = np.asarray(samples, dtype=np.float64)
+        p50, p99 = np.percentile(array, [50, 99])
+        return cls(
+            len(array), float(array.mean()), float(p50), float(p99), float(array.max())
+        )
+
+
+@dataclass
+class ContentionStats:
+    """Statistics of the accesses to a cache shared by many concurrent threads."""
+
+    threads: int
+    """Number of threads accessing the cache."""
+    ops_per_second: float
+    """Total number of `get` and `put` calls per second, summed over all threads."""
+    lock_acquisitions: int
+    """Total number of lock acquisitions, including the re-entrant ones. Lower than the
+    number of `get` and `put` calls for caches whose `get` does not acquire the lock.
+    """
+    contended_fraction: float
+    """Fraction of lock acquisitions that had to wait for another thread."""
+    mean_wait_ns: float
+    """Mean time spent waiting for the lock, per lock acquisition."""
+
+
+@dataclass
+class ContentionBenchmarkResult:
+    """Result of the benchmark of a cache policy shared by many concurrent threads."""
+
+    policy: str
+    """Name of the cache policy."""
+    shards: int
+    """Number of shards of the cache, 1 if the cache is not sharded."""
+    contention: ContentionStats
+    """Statistics of the concurrent accesses."""
+
+
+@dataclass
+class CacheBenchmarkResult:
+    """Result of the benchmark of a cache policy on an access pattern."""
+
+    policy: str
+    """Name of the cache policy."""
+    pattern: str
+    """Name of the access pattern."""
+    accesses: int
+    """Number of accesses."""
+    hit_rate: float
+    """Fraction of accesses that found the key in the cache."""
+    get_latency: LatencyStats
+    """Latency of the `get` calls."""
+    put_latency: LatencyStats
+    """Latency of the `put` calls, one for every miss."""
+    peak_memory: int
+    """Peak number of bytes allocated while replaying the access pattern, including the
+    values kept in the cache.
+    """
+    contention: ContentionStats | None
+    """Statistics of concurrent accesses, or None if not measured."""
+
+
+class _TimedLock:
+    def __init__(self, lock: Any) -> None:
+        self._lock = lock
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_ns = 0
+
+    def __enter__(self) -> "_TimedLock":
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter_ns()
+            self._lock.acquire()
+            self.wait_ns += time.perf_counter_ns() - start
+            self.contended += 1
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._lock.release()
+
+
+def _replay(
+    cache: Cache, pattern: Sequence[int], value_nbytes: int
+) -> tuple[int, list[int], list[int]]:
+    hits = 0
+    get_ns: list[int] = []
+    put_ns: list[int] = []
+    clock = time.perf_counter_ns
+    for key in pattern:
+        start = clock()
+        value = cache.get(key)
+        get_ns.append(clock() - start)
+        if value is None:
+            value = np.zeros(value_nbytes, dtype=np.uint8)
+            start = clock()
+            cache.put(key, value)
+            put_ns.append(clock() - start)
+        else:
+            hits += 1
+    return hits, get_ns, put_ns
+
+
+def _measure_memory(cache: Cache, pattern: Sequence[int], value_nbytes: int) -> int:
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for key in pattern:
+            if cache.get(key) is None:
+                cache.put(key, np.zeros(value_nbytes, dtype=np.uint8))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def _measure_contention(
+    cache: Cache, pattern: Sequence[int], value_nbytes: int, threads: int
+) -> ContentionStats:
+    barrier = threading.Barrier(threads + 1)
+    value = np.zeros(value_nbytes, dtype=np.uint8)
+    ops = [0] * threads
+
+    def worker(index: int, offset: int) -> None:
+        keys = [*pattern[offset:], *pattern[:offset]]
+        count = 0
+        barrier.wait()
+        for key in keys:
+            count += 1
+            if cache.get(key) is None:
+                cache.put(key, value)
+                count += 1
+        ops[index] = count
+
+    workers = [
+        threading.Thread(target=worker, args=(i, i * len(pattern) // threads))
+        for i in range(threads)
+    ]
+    with cache.instrument_locks(_TimedLock) as locks:
+        for t in workers:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+    total = sum(x.acquisitions for x in locks)
+    acquisitions = max(1, total)
+    return ContentionStats(
+        threads=threads,
+        ops_per_second=sum(ops) / elapsed if elapsed > 0 else 0.0,
+        lock_acquisitions=total,
+        contended_fraction=sum(x.contended for x in locks) / acquisitions,
+        mean_wait_ns=sum(x.wait_ns for x in locks) / acquisitions,
+    )
+
+
+def benchmark_cache(
+    policy: str,
+    cache_factory: Callable[[], Cache],
+    pattern_name: str,
+    pattern: Sequence[int],
+    value_nbytes: int = 1024,
+    threads: int = 4,
+) -> CacheBenchmarkResult:
+    """Benchmark a cache on an access pattern. On every miss, a new value of the given
+    size is inserted in the cache.
+
+    The access pattern is replayed three times, each time on a new cache: once to
+    measure the hit rate and the latency of every operation, once to measure the
+    memory with `tracemalloc`, and once by many concurrent threads sharing the same
+    cache, each starting from a different position in the pattern, to measure the
+    contention on the cache lock.
+
+    Args:
+        policy (str): Name of the cache policy, reported in the result.
+        cache_factory (Callable[[], Cache]): Function that creates a new empty cache.
+        pattern_name (str): Name of the access pattern, reported in the result.
+        pattern (Sequence[int]): Keys to access, in order.
+        value_nbytes (int, optional): Size of the values inserted in the cache, in
+            bytes. Defaults to 1024.
+        threads (int, optional): Number of concurrent threads used to measure the lock
+            contention, or 0 to skip the measurement. Defaults to 4.
+
+    Returns:
+        CacheBenchmarkResult: The result of the benchmark.
+    """
+    hits, get_ns, put_ns = _replay(cache_factory(), pattern, value_nbytes)
+    peak_memory = _measure_memory(cache_factory(), pattern, value_nbytes)
+    contention = None
+    if threads > 0:
+        contention = _measure_contention(
+            cache_factory(), pattern, value_nbytes, threads
+        )
+    return CacheBenchmarkResult(
+        policy=policy,
+        pattern=pattern_name,
+        accesses=len(pattern),
+        hit_rate=hits / len(pattern) if len(pattern) > 0 else 0.0,
+        get_latency=LatencyStats.from_samples(get_ns),
+        put_latency=LatencyStats.from_samples(put_ns),
+        peak_memory=peak_memory,
+        contention=contention,
+    )
+
+
+def run_cache_benchmark(
+    policies: Mapping[str, Callable[[], Cache]] | None = None,
+    patterns: Mapping[str, AccessPattern] | None = None,
+    accesses: int = 26000,
+    keys: int = 26,
+    maxsize: int = 5,
+    value_nbytes: int = 1024,
+    threads: int = 4,
+    seed: int = 0,
+) -> list[CacheBenchmarkResult]:
+    """Benchmark every cache policy on every access pattern, see `benchmark_cache`.
+
+    Args:
+        policies (Mapping[str, Callable[[], Cache]] | None, optional): Functions that
+            create a new empty cache, by name. Defaults to None, in which case all the
+            `CACHE_POLICIES` are used, bounded by `maxsize`.
+        patterns (Mapping[str, AccessPattern] | None, optional): Access pattern
+            generators, by name. Defaults to None, in which case all the
+            `ACCESS_PATTERNS` are used.
+        accesses (int, optional): Number of accesses of every pattern. Defaults to
+            26000.
+        keys (int, optional): Number of distinct keys. Defaults to 26.
+        maxsize (int, optional): Maximum number of entries of the default policies.
+            Defaults to 5.
+        value_nbytes (int, optional): Size of the values inserted in the cache, in
+            bytes. Defaults to 1024.
+        threads (int, optional): Number of concurrent threads used to measure the lock
+            contention, or 0 to skip the measurement. Defaults to 4.
+        seed (int, optional): Seed of the random number generator used by the access
+            patterns. Defaults to 0.
+
+    Returns:
+        list[CacheBenchmarkResult]: The results, one for every pair of policy and
+            pattern.
+    """
+    if policies is None:
+        policies = {k: partial(v, maxsize=maxsize) for k, v in CACHE_POLICIES.items()}
+    if patterns is None:
+        patterns = ACCESS_PATTERNS
+    results = []
+    for pattern_name, generator in patterns.items():
+        pattern = generator(accesses, keys, np.random.default_rng(seed))
+        for policy, factory in policies.items():
+            result = benchmark_cache(
+                policy, factory, pattern_name, pattern, value_nbytes, threads
+            )
+            results.append(result)
+    return results
+
+
+def run_contention_benchmark(
+    policies: Mapping[str, type[Cache]] | None = None,
+    shards: Sequence[int] = (1, 2, 4, 8),
+    threads: int = 8,
+    accesses: int = 20000,
+    keys: int = 1000,
+    maxsize: int = 100,
+    value_nbytes: int = 1024,
+    seed: int = 0,
+) -> list[ContentionBenchmarkResult]:
+    """Benchmark the lock contention of every cache policy, shared by many concurrent
+    threads, with different numbers of shards. Every thread replays the same zipfian
+    access pattern, starting from a different position. On every miss, a new value of
+    the given size is inserted in the cache.
+
+    Args:
+        policies (Mapping[str, type[Cache]] | None, optional): Types of the caches, by
+            name. Defaults to None, in which case all the `CACHE_POLICIES` are used.
+        shards (Sequence[int], optional): Numbers of shards to compare. With 1 shard,
+            the cache is not wrapped in a `ShardedCache`. Defaults to (1, 2, 4, 8).
+        threads (int, optional): Number of concurrent threads. Defaults to 8.
+        accesses (int, optional): Number of accesses of every thread. Defaults to
+            20000.
+        keys (int, optional): Number of distinct keys. Defaults to 1000.
+        maxsize (int, optional): Total maximum number of entries of every cache.
+            Defaults to 100.
+        value_nbytes (int, optional): Size of the values inserted in the cache, in
+            bytes. Defaults to 1024.
+        seed (int, optional): Seed of the random number generator used by the access
+            pattern. Defaults to 0.
+
+    Returns:
+        list[ContentionBenchmarkResult]: The results, one for every pair of policy
+            and number of shards.
+    """
+    if policies is None:
+        policies = CACHE_POLICIES
+    pattern = zipfian(accesses, keys, np.random.default_rng(seed))
+    results = []
+    for policy, cache_type in policies.items():
+        for n in shards:
+            cache: Cache
+            if n == 1:
+                cache = cache_type(maxsize=maxsize)
+            else:
+                cache = ShardedCache(cache_type, shards=n, maxsize=maxsize)
+            contention = _measure_contention(cache, pattern, value_nbytes, threads)
+            results.append(ContentionBenchmarkResult(policy, n, contention))
+    return results
+
+
+def save_results(results: Sequence[Any], path: Path, **metadata: Any) -> None:
+    """Write the results of a benchmark to a JSON file.
+
+    Args:
+        results (Sequence[Any]): The results to write, dataclass instances like
+            `CacheBenchmarkResult` or `MetadataBenchmarkResult`.
+        path (Path): Path of the JSON file.
+        metadata (Any): Additional JSON-serializable information about the benchmark,
+            e.g. its parameters, written alongside the results.
+    """
+    data = {"metadata": metadata, "results": [asdict(x) for x in results]}
+    with open(path, "w") as fp:
+        json.dump(data, fp, indent=2)
@@ -0,0 +1,134 @@
+"""Headless benchmarks for the backends of the metadata parsers."""
+
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from pipewine.benchmarks.cache import LatencyStats
+from pipewine.parsers import MetadataBackend, MetadataBackendRegistry
+
+METADATA_FORMATS = ["json", "yaml"]
+"""Formats of the metadata parsers whose backends can be benchmarked."""
+
+
+@dataclass
+class MetadataBenchmarkResult:
+    """Result of the benchmark of a metadata backend."""
+
+    format: str
+    """Format of the data, e.g. "json" or "yaml"."""
+    backend: str
+    """Name of the backend."""
+    nbytes: int
+    """Size of the data dumped by the backend, in bytes."""
+    load_latency: LatencyStats
+    """Latency of the `load` calls."""
+    dump_latency: LatencyStats
+    """Latency of the `dump` calls."""
+
+
+def make_metadata(objects: int, rng: np.random.Generator) -> dict[str, Any]:
+    """Generate metadata similar to the annotations of an image, with a list of
+    objects with a label, a bounding box, a score and some attributes.
+
+    Args:
+        objects (int): Number of objects.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        dict[str, Any]: The generated metadata.
+    """
+    labels = ["person", "car", "dog", "bicycle", "traffic light"]
+    return {
+        "image_id": int(rng.integers(0, 1_000_000)),
+        "size": {"width": 1920, "height": 1080},
+        "source": "camera_01/2024-01-01T12:00:00",
+        "objects": [
+            {
+                "id": i,
+                "label": labels[int(rng.integers(0, len(labels)))],
+                "box": [round(float(x), 2) for x in rng.uniform(0, 1000, 4)],
+                "score": round(float(rng.random()), 4),
+                "occluded": bool(rng.random() < 0.2),
+                "attributes": {"color": "red", "tags": ["a", "b"]},
+            }
+            for i in range(objects)
+        ],
+    }
+
+
+def benchmark_metadata_backend(
+    format_: str,
+    name: str,
+    backend: MetadataBackend,
+    data: Any,
+    repeats: int = 100,
+) -> MetadataBenchmarkResult:
+    """Benchmark a metadata backend, dumping and loading the same data many times.
+
+    Args:
+        format_ (str): Format of the data, reported in the result.
+        name (str): Name of the backend, reported in the result.
+        backend (MetadataBackend): The backend.
+        data (Any): The data to dump and load.
+        repeats (int, optional): Number of times the data is dumped and loaded.
+            Defaults to 100.
+
+    Returns:
+        MetadataBenchmarkResult: The result of the benchmark.
+    """
+    dumped = backend.dump(data)
+    dump_ns, load_ns = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        backend.dump(data)
+        t1 = time.perf_counter_ns()
+        backend.load(dumped)
+        t2 = time.perf_counter_ns()
+        dump_ns.append(t1 - t0)
+        load_ns.append(t2 - t1)
+    return MetadataBenchmarkResult(
+        format=format_,
+        backend=name,
+        nbytes=len(dumped),
+        load_latency=LatencyStats.from_samples(load_ns),
+        dump_latency=LatencyStats.from_samples(dump_ns),
+    )
+
+
+def run_metadata_benchmark(
+    backends: Mapping[str, Sequence[str]] | None = None,
+    objects: int = 50,
+    repeats: int = 100,
+    seed: int = 0,
+) -> list[MetadataBenchmarkResult]:
+    """Benchmark the backends of the metadata parsers on the same generated metadata,
+    see `benchmark_metadata_backend` and `make_metadata`.
+
+    Args:
+        backends (Mapping[str, Sequence[str]] | None, optional): Names of the backends
+            to benchmark, by format. Defaults to None, in which case all the backends
+            registered for the `METADATA_FORMATS` are used.
+        objects (int, optional): Number of objects in the generated metadata.
+            Defaults to 50.
+        repeats (int, optional): Number of times the data is dumped and loaded by
+            every backend. Defaults to 100.
+        seed (int, optional): Seed of the generated metadata. Defaults to 0.
+
+    Returns:
+        list[MetadataBenchmarkResult]: The results of the benchmark.
+    """
+    if backends is None:
+        backends = {k: MetadataBackendRegistry.names(k) for k in METADATA_FORMATS}
+    data = make_metadata(objects, np.random.default_rng(seed))
+    results = []
+    for format_, names in backends.items():
+        for name in names:
+            backend = MetadataBackendRegistry.get(format_, name)
+            results.append(
+                benchmark_metadata_backend(format_, name, backend, data, repeats)
+            )
+    return results
@@ -0,0 +1,167 @@
+"""CLI for running benchmarks."""
+
+from collections.abc import Mapping
+from functools import partial
+from pathlib import Path
+from typing import Annotated
+
+from typer import Option, Typer
+
+from pipewine.benchmarks import (
+    ACCESS_PATTERNS,
+    CACHE_POLICIES,
+    METADATA_FORMATS,
+    run_cache_benchmark,
+    run_contention_benchmark,
+    run_metadata_benchmark,
+    save_results,
+)
+from pipewine.parsers import MetadataBackendRegistry
+
+bench_app = Typer(
+    name="bench",
+    help="Run a pipewine benchmark headless and write the results to JSON.",
+    no_args_is_help=True,
+)
+"""Typer app for the Pipewine benchmarks CLI."""
+
+
+output_help = "Path of the output JSON file."
+policy_help = (
+    f"Cache policies to benchmark, all if none. Choices: {list(CACHE_POLICIES)}"
+)
+pattern_help = (
+    f"Access patterns to replay, all if none. Choices: {list(ACCESS_PATTERNS)}"
+)
+accesses_help = "Number of accesses of every pattern."
+keys_help = "Number of distinct keys."
+maxsize_help = "Maximum number of entries of every cache."
+value_help = "Size of the cached values, in bytes."
+threads_help = "Number of concurrent threads to measure lock contention, 0 to skip."
+seed_help = "Seed of the random access patterns."
+shards_help = "Numbers of shards to compare, 1 for no sharding. Default: 1, 2, 4, 8."
+contention_threads_help = "Number of concurrent threads sharing the cache."
+contention_accesses_help = "Number of accesses of every thread."
+contention_maxsize_help = "Total maximum number of entries of every cache."
+format_help = f"Metadata formats to benchmark, all if none. Choices: {METADATA_FORMATS}"
+objects_help = "Number of objects in the generated metadata."
+repeats_help = "Number of times the metadata is dumped and loaded by every backend."
+
+
+def _check_names(names: list[str], choices: Mapping) -> None:
+    unknown = [x for x in names if x not in choices]
+    if unknown:
+        raise ValueError(f"Unknown names: {unknown}, choices: {list(choices)}")
+
+
+@bench_app.command()
+def cache(
+    output: Annotated[Path, Option(..., "-o", "--output", help=output_help)],
+    policy: Annotated[list[str], Option(..., "-p", "--policy", help=policy_help)] = [],
+    pattern: Annotated[
+        list[str], Option(..., "-P", "--pattern", help=pattern_help)
+    ] = [],
+    accesses: Annotated[
+        int, Option(..., "-n", "--accesses", help=accesses_help)
+    ] = 26000,
+    keys: Annotated[int, Option(..., "-k", "--keys", help=keys_help)] = 26,
+    maxsize: Annotated[int, Option(..., "-s", "--maxsize", help=maxsize_help)] = 5,
+    value_nbytes: Annotated[int, Option(..., "--value-nbytes", help=value_help)] = 1024,
+    threads: Annotated[int, Option(..., "-t", "--threads", help=threads_help)] = 4,
+    seed: Annotated[int, Option(..., "--seed", help=seed_help)] = 0,
+) -> None:
+    """Benchmark hit rate, latency, memory and lock contention of the cache policies."""
+    policy = policy or list(CACHE_POLICIES)
+    pattern = pattern or list(ACCESS_PATTERNS)
+    _check_names(policy, CACHE_POLICIES)
+    _check_names(pattern, ACCESS_PATTERNS)
+    results = run_cache_benchmark(
+        policies={k: partial(CACHE_POLICIES[k], maxsize=maxsize) for k in policy},
+        patterns={k: ACCESS_PATTERNS[k] for k in pattern},
+        accesses=accesses,
+        keys=keys,
+        value_nbytes=value_nbytes,
+        threads=threads,
+        seed=seed,
+    )
+    metadata = {
+        "accesses": accesses,
+        "keys": keys,
+        "maxsize": maxsize,
+        "value_nbytes": value_nbytes,
+        "threads": threads,
+        "seed": seed,
+    }
+    save_results(results, output, **metadata)
+
+
+@bench_app.command()
+def contention(
+    output: Annotated[Path, Option(..., "-o", "--output", help=output_help)],
+    policy: Annotated[list[str], Option(..., "-p", "--policy", help=policy_help)] = [],
+    shards: Annotated[list[int], Option(..., "-S", "--shards", help=shards_help)] = [],
+    threads: Annotated[
+        int, Option(..., "-t", "--threads", help=contention_threads_help)
+    ] = 8,
+    accesses: Annotated[
+        int, Option(..., "-n", "--accesses", help=contention_accesses_help)
+    ] = 20000,
+    keys: Annotated[int, Option(..., "-k", "--keys", help=keys_help)] = 1000,
+    maxsize: Annotated[
+        int, Option(..., "-s", "--maxsize", help=contention_maxsize_help)
+    ] = 100,
+    value_nbytes: Annotated[int, Option(..., "--value-nbytes", help=value_help)] = 1024,
+    seed: Annotated[int, Option(..., "--seed", help=seed_help)] = 0,
+) -> None:
+    """Benchmark the lock contention of the cache policies with a varying number of
+    shards, shared by many concurrent threads.
+    """
+    policy = policy or list(CACHE_POLICIES)
+    shards = shards or [1, 2, 4, 8]
+    _check_names(policy, CACHE_POLICIES)
+    results = run_contention_benchmark(
+        policies={k: CACHE_POLICIES[k] for k in policy},
+        shards=shards,
+        threads=threads,
+        accesses=accesses,
+        keys=keys,
+        maxsize=maxsize,
+        value_nbytes=value_nbytes,
+        seed=seed,
+    )
+    metadata = {
+        "shards": shards,
+        "threads": threads,
+        "accesses": accesses,
+        "keys": keys,
+        "maxsize": maxsize,
+        "value_nbytes": value_nbytes,
+        "seed": seed,
+    }
+    save_results(results, output, **metadata)
+
+
+@bench_app.command()
+def metadata(
+    output: Annotated[Path, Option(..., "-o", "--output", help=output_help)],
+    format_: Annotated[list[str], Option(..., "-f", "--format", help=format_help)] = [],
+    objects: Annotated[int, Option(..., "-n", "--objects", help=objects_help)] = 50,
+    repeats: Annotated[int, Option(..., "-r", "--repeats", help=repeats_help)] = 100,
+    seed: Annotated[int, Option(..., "--seed", help=seed_help)] = 0,
+) -> None:
+    """Benchmark the load and dump latency of every available backend of the metadata
+    parsers.
+    """
+    format_ = format_ or METADATA_FORMATS
+    _check_names(format_, {k: None for k in METADATA_FORMATS})
+    backends = {k: MetadataBackendRegistry.names(k) for k in format_}
+    results = run_metadata_benchmark(
+        backends=backends, objects=objects, repeats=repeats, seed=seed
+    )
+    metadata = {
+        "backends": backends,
+        "objects": objects,
+        "repeats": repeats,
+        "seed": seed,
+    }
+    save_results(results, output, **metadata)
@@ -5,6 +5,7 @@ from typing import Annotated
 
 from typer import Option, Typer
 
+from pipewine.cli.bench import bench_app
 from pipewine.cli.extension import import_module
 from pipewine.cli.mappers import map_app
 from pipewine.cli.ops import op_app
@@ -39,6 +40,7 @@ pipewine_app = Typer(
 pipewine_app.add_typer(op_app)
 pipewine_app.add_typer(map_app)
 pipewine_app.add_typer(wf_app)
+pipewine_app.add_typer(bench_app)
 
 
 def main() -> None:  # pragma: no cover
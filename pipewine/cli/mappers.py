@@ -90,6 +90,7 @@ map_app = Typer(
 
 algo_help = "Hashing algorithm, see 'hashlib' documentation for a full list."
 keys_help = "List of keys on which to compute the hash, None for all keys."
+raw_help = "Hash the raw bytes of stored items without decoding them."
 
 
 @map_cli(name="hash")
@@ -98,9 +99,12 @@ def hash_(
         str, Option(..., "-a", "--algorithm", help=algo_help)
     ] = "sha256",
     keys: Annotated[list[str], Option(..., "-k", "--keys", help=keys_help)] = [],
+    raw: Annotated[bool, Option(..., "--raw", "-r", help=raw_help)] = False,
 ) -> HashMapper:
     """Apply a hashing function to each sample."""
-    return HashMapper(algorithm=algorithm, keys=None if len(keys) == 0 else keys)
+    return HashMapper(
+        algorithm=algorithm, keys=None if len(keys) == 0 else keys, raw=raw
+    )
 
 
 conversion_help = (
@@ -563,6 +563,94 @@ def zip_() -> ZipOp:
     return ZipOp()
 
 
+class JoinHow(str, Enum):
+    inner = "inner"
+    left = "left"
+
+
+key_help = "Join key of the left dataset (e.g. metadata.id)."
+right_key_help = "Join key of the right dataset, if different from the left one."
+how_help = "Keep only matching samples (inner) or all the left samples (left)."
+
+
+@op_cli()
+def join(
+    grabber: Grabber,
+    key: Annotated[str, Option(..., "--key", "-k", help=key_help)],
+    right_key: Annotated[
+        str, Option(..., "--right-key", "-K", help=right_key_help)
+    ] = None,  # type: ignore
+    how: Annotated[JoinHow, Option(..., "--how", help=how_help)] = JoinHow.inner,
+) -> JoinOp:
+    """Join two datasets by merging the samples with the same value of a key."""
+
+    def _join_fn(key: str, idx: int, sample: Sample) -> Any:
+        return deep_get(sample, key)
+
+    return JoinOp(
+        partial(_join_fn, key),
+        right_fn=partial(_join_fn, right_key) if right_key else None,
+        how=JoinHow(how).value,
+        grabber=grabber,
+    )
+
+
+keys_help = "Keys of the items to compare, all keys if not specified."
+algo_help = "Hashing algorithm, see 'hashlib' documentation for a full list."
+
+
+@op_cli()
+def dedup(
+    grabber: Grabber,
+    keys: Annotated[list[str], Option(..., "-k", "--keys", help=keys_help)] = [],
+    algorithm: Annotated[
+        str, Option(..., "-a", "--algorithm", help=algo_help)
+    ] = "sha256",
+) -> DedupOp:
+    """Remove duplicate samples and write the groups of duplicates found."""
+    return DedupOp(
+        keys=None if len(keys) == 0 else keys, algorithm=algorithm, grabber=grabber
+    )
+
+
+class PHashMethod(str, Enum):
+    average = "average"
+    difference = "difference"
+
+
+image_key_help = "Key of the image item to compare."
+threshold_help = "Maximum Hamming distance between the hashes of two near-duplicates."
+method_help = "Perceptual hashing method."
+size_help = "Side of the downscaled image used for hashing."
+hash_batch_help = "Number of images hashed together by a worker."
+
+
+@op_cli()
+def near_dedup(
+    grabber: Grabber,
+    key: Annotated[str, Option(..., "-k", "--key", help=image_key_help)] = "image",
+    threshold: Annotated[
+        int, Option(..., "-t", "--threshold", help=threshold_help)
+    ] = 4,
+    method: Annotated[
+        PHashMethod, Option(..., "-m", "--method", help=method_help)
+    ] = PHashMethod.average,
+    size: Annotated[int, Option(..., "-s", "--size", help=size_help)] = 8,
+    batch_size: Annotated[
+        int, Option(..., "-b", "--batch-size", help=hash_batch_help)
+    ] = 64,
+) -> NearDuplicatesOp:
+    """Remove near-duplicate images and write the groups of similar samples found."""
+    return NearDuplicatesOp(
+        key=key,
+        threshold=threshold,
+        method=PHashMethod(method).value,
+        size=size,
+        batch_size=batch_size,
+        grabber=grabber,
+    )
+
+
 @op_cli()
 def shuffle(
     seed: Annotated[int, Option(..., "--seed", "-s", help="Random seed.")] = -1
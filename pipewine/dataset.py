@@ -1,9 +1,10 @@
 """Base classes for Pipewine datasets."""
 
 import math
-from typing import overload
+from typing import Any, overload
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Sequence
+from bisect import bisect_left
+from collections.abc import Callable, Hashable, KeysView, Mapping, Sequence
 from functools import partial
 
 from pipewine.sample import Sample
@@ -111,3 +112,93 @@ class LazyDataset[T: Sample](Dataset[T]):
             self.get_sample,
             partial(self._slice_fn, step, start),
         )
+
+
+class IndexedDataset[T: Sample](Dataset[T]):
+    """Dataset that wraps another dataset together with an index that maps the values
+    of a key to the positions of the samples that have that value, enabling fast
+    point lookups and range queries without scanning the whole dataset.
+
+    The index is a hash map, so `lookup` is O(1). Range queries require the keys to be
+    mutually comparable, they are answered with a binary search on the sorted keys,
+    that are only computed the first time a range query is performed.
+
+    Slicing an `IndexedDataset` returns a slice of the wrapped dataset, without index.
+    """
+
+    def __init__(
+        self, dataset: Dataset[T], index: Mapping[Hashable, Sequence[int]]
+    ) -> None:
+        """
+        Args:
+            dataset (Dataset[T]): The dataset to wrap.
+            index (Mapping[Hashable, Sequence[int]]): Mapping from the values of the key
+                to the positions of the samples in the wrapped dataset.
+        """
+        super().__init__()
+        self._dataset = dataset
+        self._index = index
+        self._sorted_keys: list[Any] | None = None
+
+    @property
+    def index(self) -> Mapping[Hashable, Sequence[int]]:
+        """The index mapping the values of the key to the positions of the samples."""
+        return self._index
+
+    def size(self) -> int:
+        return len(self._dataset)
+
+    def get_sample(self, idx: int) -> T:
+        return self._dataset[idx]
+
+    def get_slice(self, idx: slice) -> Dataset[T]:
+        return self._dataset[idx]
+
+    def keys(self) -> KeysView[Hashable]:
+        """Return a keys view of all the distinct values of the key."""
+        return self._index.keys()
+
+    def positions(self, key: Hashable) -> Sequence[int]:
+        """Return the positions of the samples whose key is equal to the given value.
+
+        Args:
+            key (Hashable): The value of the key to look up.
+
+        Returns:
+            Sequence[int]: The positions of the matching samples, empty if none.
+        """
+        return self._index.get(key, ())
+
+    def lookup(self, key: Hashable) -> Dataset[T]:
+        """Return a lazy dataset containing all the samples whose key is equal to the
+        given value, in the order in which they appear in the wrapped dataset.
+
+        Args:
+            key (Hashable): The value of the key to look up.
+
+        Returns:
+            Dataset[T]: The dataset of matching samples, empty if none.
+        """
+        index = self.positions(key)
+        return LazyDataset(len(index), self._dataset.get_sample, index.__getitem__)
+
+    def lookup_range(self, start: Any = None, stop: Any = None) -> Dataset[T]:
+        """Return a lazy dataset containing all the samples whose key is in the
+        half-open interval `[start, stop)`, sorted by key.
+
+        Args:
+            start (Any, optional): Lower bound (inclusive) of the range. Defaults to
+                None, in which case the range is unbounded below.
+            stop (Any, optional): Upper bound (exclusive) of the range. Defaults to
+                None, in which case the range is unbounded above.
+
+        Returns:
+            Dataset[T]: The dataset of matching samples, empty if none.
+        """
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._index.keys())  # type: ignore
+        keys = self._sorted_keys
+        lo = 0 if start is None else bisect_left(keys, start)
+        hi = len(keys) if stop is None else bisect_left(keys, stop)
+        index = [i for k in keys[lo:hi] for i in self._index[k]]
+        return LazyDataset(len(index), self._dataset.get_sample, index.__getitem__)
@@ -1,9 +1,12 @@
 """`Item` base class and implementations to represent data items in Pipewine."""
 
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Hashable
+from threading import Lock
 from typing import Any, Self
 
-from pipewine.parsers import Parser
+from pipewine.parsers import ArrayInfo, Parser
 from pipewine.reader import Reader
 
 
@@ -87,6 +90,31 @@ class Item[T: Any](ABC):
         """
         pass
 
+    def region(self, rows: slice, cols: slice) -> Any:
+        """Return a rectangular region of image-like data, e.g. a crop of an image.
+        Depending on the item and on its parser, only the requested region may be read
+        and decoded.
+
+        Args:
+            rows (slice): The rows of the region.
+            cols (slice): The columns of the region.
+
+        Returns:
+            Any: The data in the region.
+        """
+        return self()[rows, cols]
+
+    def probe(self) -> ArrayInfo | None:
+        """Return the shape and the data type of array-like data, e.g. an image.
+        Depending on the item and on its parser, they may be read from the headers of
+        the data without decoding it.
+
+        Returns:
+            ArrayInfo | None: The description of the data, or None if the data is not
+                an array.
+        """
+        return ArrayInfo.of(self())
+
     def __call__(self) -> T:
         """Return the data held by the item."""
         return self._get()
@@ -144,6 +172,8 @@ class StoredItem[T: Any](Item[T]):
         self._shared = shared
 
     def _get(self) -> T:
+        if self._parser.zero_copy:
+            return self._parser.parse_buffer(self._reader.read_buffer())
         return self._parser.parse(self._reader.read())
 
     def _get_parser(self) -> Parser[T]:
@@ -155,34 +185,120 @@ class StoredItem[T: Any](Item[T]):
     def with_sharedness(self, shared: bool) -> Self:
         return type(self)(self._reader, self._parser, shared=shared)
 
+    def region(self, rows: slice, cols: slice) -> Any:
+        return self._parser.parse_region(self._reader.read_buffer(), rows, cols)
+
+    def probe(self) -> ArrayInfo | None:
+        return self._parser.probe(self._reader.read_buffer())
+
     @property
     def reader(self) -> Reader:
         """Return the reader used to read the data from the external source."""
         return self._reader
 
 
+class _Missing:
+    def __reduce__(self) -> str:
+        # Unpickled as the module-level singleton, preserving identity checks.
+        return "_MISSING"
+
+
+_MISSING: Any = _Missing()
+
+
 class CachedItem[T: Any](Item[T]):
     """A `CachedItem` is an `Item` that wraps another item and caches the value it
     returns when it is requested for the first time. Subsequent requests will return
     the cached value without calling the wrapped item again.
+
+    The wrapped item is called at most once, even when many threads request the value
+    at the same time: the first thread computes it, while the others wait for it.
+
+    When validation is enabled and the original source is a `StoredItem`, requests
+    compare the fingerprint of its reader (e.g. modification time and size of a local
+    file) with the one taken when the value was cached, and reload the value if they
+    differ. The fingerprint is taken while holding the lock, at most once every
+    `validate_interval` seconds: requests in between return the cached value without
+    checking it.
     """
 
-    def __init__(self, source: Item[T], shared: bool | None = None) -> None:
+    def __init__(
+        self,
+        source: Item[T],
+        shared: bool | None = None,
+        validate: bool = False,
+        validate_interval: float = 0.0,
+    ) -> None:
         """
         Args:
             source (Item[T]): The item to wrap and cache.
             shared (bool | None, optional): The sharedness of the item. If `None`, the
                 sharedness of the item is the same as the sharedness of the wrapped item.
                 Defaults to None.
+            validate (bool, optional): Whether to reload the cached value when the
+                data of the original source changes. Defaults to False.
+            validate_interval (float, optional): Minimum number of seconds between two
+                validations, only used when `validate` is True. Defaults to 0.0, in
+                which case the value is validated on every request.
+
+        Raises:
+            ValueError: If `validate_interval` is negative.
         """
+        if validate_interval < 0:
+            raise ValueError(
+                f"Validate interval must be non-negative, got {validate_interval}"
+            )
         self._source = source
-        self._cache = None
+        self._cache: T = _MISSING
         self._shared = shared
+        self._validate = validate
+        self._validate_interval = validate_interval
+        self._fingerprint: Hashable | None = None
+        self._checked = 0.0
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = Lock()
+
+    def _read_fingerprint(self) -> Hashable | None:
+        source = self.source_recursive
+        return source.reader.fingerprint() if isinstance(source, StoredItem) else None
+
+    def _is_due(self) -> bool:
+        return (
+            self._validate
+            and time.monotonic() - self._checked >= self._validate_interval
+        )
 
     def _get(self) -> T:
-        if self._cache is None:
-            self._cache = self._source()
-        return self._cache
+        value = self._cache
+        if value is _MISSING or self._is_due():
+            with self._lock:
+                value = self._cache
+                if value is _MISSING or self._is_due():
+                    fingerprint = self._read_fingerprint() if self._validate else None
+                    self._checked = time.monotonic()
+                    if value is _MISSING or fingerprint != self._fingerprint:
+                        self._fingerprint = fingerprint
+                        value = self._cache = self._source()
+                callbacks, self._callbacks = self._callbacks, []
+            # Callbacks run without holding the lock, so they can access the item.
+            for callback in callbacks:
+                callback()
+        return value
+
+    def on_load(self, callback: Callable[[], None]) -> None:
+        """Register a function to call once the value of the wrapped item is cached,
+        e.g. to account for the memory it occupies. The function is called by the
+        thread that loads the value, or immediately if the value is already cached.
+        Callbacks are not pickled.
+
+        Args:
+            callback (Callable[[], None]): The function to call.
+        """
+        with self._lock:
+            if not self.is_cached:
+                self._callbacks.append(callback)
+                return
+        callback()
 
     def _get_parser(self) -> Parser[T]:
         return self._source._get_parser()
@@ -193,7 +309,29 @@ class CachedItem[T: Any](Item[T]):
         return self._shared
 
     def with_sharedness(self, shared: bool) -> Self:
-        return type(self)(self._source, shared=shared)
+        return type(self)(
+            self._source,
+            shared=shared,
+            validate=self._validate,
+            validate_interval=self._validate_interval,
+        )
+
+    def region(self, rows: slice, cols: slice) -> Any:
+        # Regions are not cached, they are read from the source unless the whole
+        # value is already available.
+        if self.is_cached:
+            return super().region(rows, cols)
+        return self._source.region(rows, cols)
+
+    def probe(self) -> ArrayInfo | None:
+        if self.is_cached:
+            return super().probe()
+        return self._source.probe()
+
+    @property
+    def is_cached(self) -> bool:
+        """Whether the value of the wrapped item has already been cached."""
+        return self._cache is not _MISSING
 
     @property
     def source(self) -> Item[T]:
@@ -207,3 +345,14 @@ class CachedItem[T: Any](Item[T]):
         while isinstance(source, CachedItem):
             source = source.source
         return source
+
+    def __getstate__(self) -> dict[str, Any]:
+        data = {**self.__dict__}
+        del data["_lock"]
+        del data["_callbacks"]
+        return data
+
+    def __setstate__(self, data: dict[str, Any]) -> None:
+        self.__dict__.update(data)
+        self._callbacks = []
+        self._lock = Lock()
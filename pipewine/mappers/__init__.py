@@ -10,4 +10,9 @@ from pipewine.mappers.key_transform import (
     FormatKeysMapper,
     RenameMapper,
 )
-from pipewine.mappers.item_transform import ConvertMapper, ShareMapper
+from pipewine.mappers.item_transform import (
+    ConvertMapper,
+    ShareMapper,
+    ThumbnailMapper,
+)
+from pipewine.mappers.perceptual import PerceptualHashedSample, PerceptualHashMapper
@@ -10,10 +10,39 @@ class CacheMapper[T: Sample](Mapper[T, T]):
     the original items.
     """
 
+    def __init__(self, validate: bool = False, validate_interval: float = 0.0) -> None:
+        """
+        Args:
+            validate (bool, optional): Whether the cached items reload their value when
+                the data of their original source changes, see `CachedItem`. Defaults
+                to False.
+            validate_interval (float, optional): Minimum number of seconds between two
+                validations of the same item, only used when `validate` is True.
+                Defaults to 0.0, in which case items are validated on every access.
+
+        Raises:
+            ValueError: If `validate_interval` is negative.
+        """
+        super().__init__()
+        if validate_interval < 0:
+            raise ValueError(
+                f"Validate interval must be non-negative, got {validate_interval}"
+            )
+        self._validate = validate
+        self._validate_interval = validate_interval
+
     def __call__(self, idx: int, x: T) -> T:
         return x.with_items(
             **{
-                k: v if isinstance(v, CachedItem) else CachedItem(v)
+                k: (
+                    v
+                    if isinstance(v, CachedItem)
+                    else CachedItem(
+                        v,
+                        validate=self._validate,
+                        validate_interval=self._validate_interval,
+                    )
+                )
                 for k, v in x.items()
             }
         )
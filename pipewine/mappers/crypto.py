@@ -5,11 +5,18 @@ import pickle
 from collections.abc import Sequence, Iterable
 from typing import Any
 
-from pipewine.item import Item, MemoryItem
+from pipewine.item import CachedItem, Item, MemoryItem, StoredItem
 from pipewine.mappers.base import Mapper
 from pipewine.parsers import YAMLParser
 from pipewine.sample import Sample, TypedSample
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None  # type: ignore
+
+_XXHASH_ALGORITHMS = ["xxh32", "xxh64", "xxh128", "xxh3_64", "xxh3_128"]
+
 
 class HashedSample(TypedSample):
     """Sample type to represent the hash of a sample."""
@@ -22,39 +29,69 @@ class HashMapper(Mapper[Sample, HashedSample]):
     """Compute the hash of a sample based on the selected items."""
 
     def __init__(
-        self, algorithm: str = "sha256", keys: str | Sequence[str] | None = None
+        self,
+        algorithm: str = "sha256",
+        keys: str | Sequence[str] | None = None,
+        raw: bool = False,
     ) -> None:
         """
         Args:
             algorithm (str, optional): Hash algorithm to use, must be one of the
-                algorithms available in `hashlib.algorithms_available`. Defaults to
-                "sha256".
+                algorithms available in `hashlib.algorithms_available`, or one of the
+                fast non-cryptographic algorithms of the `xxhash` library ("xxh32",
+                "xxh64", "xxh128", "xxh3_64", "xxh3_128") if it is installed. Defaults
+                to "sha256".
             keys (str | Sequence[str] | None, optional): Keys of the sample to use for
                 computing the hash. If a string is provided, it is treated as a single
                 key. If a sequence is provided, it is treated as a list of keys. If
                 `None` is provided, all keys in the sample are used. Defaults to `None`.
+            raw (bool, optional): Whether to hash stored items by the raw bytes read
+                from their reader, without parsing them. Items that are not stored are
+                hashed by their value, as usual. Hashes computed with `raw=True` are
+                not comparable with those computed with `raw=False`. Defaults to False.
 
         Raises:
             ValueError: If the provided algorithm is not available in `hashlib` or if it
                 requires parameters. Currently, the only two algorithms that require
                 parameters (and thus are not supported) are "shake_128" and "shake_256".
+                Also raised if an `xxhash` algorithm is requested but the library is
+                not installed.
         """
         super().__init__()
         algorithms_with_parameters = ["shake_128", "shake_256"]
-        if (
+        if algorithm in _XXHASH_ALGORITHMS:
+            if xxhash is None:  # pragma: no cover
+                raise ValueError(
+                    f"Algorithm {algorithm} requires the 'xxhash' package, install it "
+                    "with 'pip install xxhash'."
+                )
+        elif (
             algorithm not in hashlib.algorithms_available
             or algorithm in algorithms_with_parameters
         ):
             raise ValueError(f"Invalid algorithm: {algorithm}")
         self._algorithm = algorithm
         self._keys = keys
+        self._raw = raw
 
     def __call__(self, idx: int, x: Sample) -> HashedSample:
         hash_ = self._compute_sample_hash(x)
         return HashedSample(hash=MemoryItem(hash_, YAMLParser(type_=str)))
 
+    def _hash_bytes(self, data: bytes) -> str:
+        if self._algorithm in _XXHASH_ALGORITHMS:
+            return getattr(xxhash, self._algorithm)(data).hexdigest()
+        return hashlib.new(self._algorithm, data).hexdigest()
+
     def _compute_item_hash(self, data: Any) -> str:
-        return hashlib.new(self._algorithm, pickle.dumps(data)).hexdigest()
+        return self._hash_bytes(pickle.dumps(data))
+
+    def _compute_raw_item_hash(self, item: Item) -> str:
+        if isinstance(item, CachedItem):
+            item = item.source_recursive
+        if isinstance(item, StoredItem):
+            return self._hash_bytes(item.reader.read())
+        return self._compute_item_hash(item())
 
     def _compute_sample_hash(self, sample: Sample) -> str:
         keys: Iterable[str]
@@ -64,4 +101,6 @@ class HashMapper(Mapper[Sample, HashedSample]):
             keys = self._keys
         else:
             keys = sorted(list(sample.keys()))
+        if self._raw:
+            return "".join([self._compute_raw_item_hash(sample[k]) for k in keys])
         return "".join([self._compute_item_hash(sample[k]()) for k in keys])  # type: ignore
@@ -2,9 +2,11 @@
 
 from collections.abc import Iterable, Mapping
 
-from pipewine.item import Item
+import numpy as np
+
+from pipewine.item import CachedItem, Item, MemoryItem, StoredItem
 from pipewine.mappers.base import Mapper
-from pipewine.parsers import Parser
+from pipewine.parsers import ImageParser, Parser, box_reduce
 from pipewine.sample import Sample
 
 
@@ -56,3 +58,50 @@ class ShareMapper[T: Sample](Mapper[T, T]):
             elif item.is_shared and k in self._unshare:
                 to_modify[k] = item.with_sharedness(False)
         return x.with_items(**to_modify)
+
+
+class ThumbnailMapper[T: Sample](Mapper[T, T]):
+    """Mapper that reduces the resolution of selected image items in a sample by an
+    integer factor, e.g., to create thumbnails or previews of a dataset.
+
+    Images stored in files are not decoded by the mapper: the items are replaced with
+    stored items that decode the same files at a reduced resolution (see the `reduce`
+    option of `ImageParser`), so that codecs supporting it, like JPEG, can skip most
+    of the decoding work. Other items are loaded and downscaled by averaging blocks of
+    pixels.
+    """
+
+    def __init__(self, factor: int = 2, keys: Iterable[str] = ("image",)) -> None:
+        """
+        Args:
+            factor (int, optional): Integer factor by which the width and height of the
+                images are divided, rounding up. Defaults to 2.
+            keys (Iterable[str], optional): Keys of the image items to reduce. Defaults
+                to ("image",).
+
+        Raises:
+            ValueError: If `factor` is lower than 1.
+        """
+        super().__init__()
+        if factor < 1:
+            raise ValueError(f"Factor must be at least 1, got {factor}")
+        self._factor = factor
+        self._keys = list(keys)
+
+    def _reduce(self, item: Item) -> Item:
+        source = item.source_recursive if isinstance(item, CachedItem) else item
+        parser = source.parser
+        if isinstance(source, StoredItem) and isinstance(parser, ImageParser):
+            reduced = parser.with_reduce(parser.reduce * self._factor)
+            return StoredItem(source.reader, reduced, shared=item.is_shared)
+        image = box_reduce(np.asarray(item()), self._factor)
+        return MemoryItem(image, item.parser, shared=item.is_shared)
+
+    def __call__(self, idx: int, x: T) -> T:
+        if self._factor == 1:
+            return x
+        to_modify: dict[str, Item] = {}
+        for k in self._keys:
+            if k in x:
+                to_modify[k] = self._reduce(x[k])
+        return x.with_items(**to_modify)
@@ -0,0 +1,119 @@
+"""Mappers for perceptual hashing of images."""
+
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Literal
+
+import numpy as np
+
+from pipewine.item import Item, MemoryItem
+from pipewine.mappers.base import Mapper
+from pipewine.parsers import YAMLParser
+from pipewine.sample import Sample, TypedSample
+
+
+class PerceptualHashedSample(TypedSample):
+    """Sample type to represent the perceptual hash of an image."""
+
+    phash: Item[str]
+    """The hexadecimal representation of the perceptual hash bits."""
+
+
+def _to_grayscale(image: np.ndarray) -> np.ndarray:
+    image = np.asarray(image, dtype=np.float64)
+    if image.ndim == 3:
+        image = image.mean(axis=2)
+    if image.ndim != 2:
+        raise ValueError(f"Expected an image with 2 or 3 dimensions, got {image.ndim}")
+    return image
+
+
+def _area_resize(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    # Resizes the last two axes, so that a stack of images can be resized at once.
+    if image.shape[-2] < height:
+        image = np.repeat(image, -(-height // image.shape[-2]), axis=-2)
+    if image.shape[-1] < width:
+        image = np.repeat(image, -(-width // image.shape[-1]), axis=-1)
+    h, w = image.shape[-2:]
+    rows = (np.arange(height) * h) // height
+    cols = (np.arange(width) * w) // width
+    sums = np.add.reduceat(np.add.reduceat(image, rows, axis=-2), cols, axis=-1)
+    counts = np.outer(np.diff(rows, append=h), np.diff(cols, append=w))
+    return sums / counts
+
+
+class PerceptualHashMapper(Mapper[Sample, PerceptualHashedSample]):
+    """Compute a perceptual hash of an image item. Contrary to cryptographic hashes,
+    similar images are mapped to hashes that differ by a small number of bits, so the
+    Hamming distance between two perceptual hashes can be used to detect
+    near-duplicates.
+
+    The image is converted to grayscale and downscaled by averaging blocks of pixels,
+    all computations are vectorized with numpy. Use `hash_batch` to hash many images
+    with a single vectorized computation.
+    """
+
+    def __init__(
+        self,
+        key: str = "image",
+        method: Literal["average", "difference"] = "average",
+        size: int = 8,
+    ) -> None:
+        """
+        Args:
+            key (str, optional): Key of the image item to hash. Defaults to "image".
+            method (Literal["average", "difference"], optional): Hashing method, either
+                "average" (each bit tells whether a pixel of the downscaled image is
+                brighter than the mean) or "difference" (each bit tells whether a pixel
+                is brighter than its right neighbour). Defaults to "average".
+            size (int, optional): Side of the downscaled image, the hash will have
+                `size**2` bits. Defaults to 8.
+
+        Raises:
+            ValueError: If the method is not valid or if the size is not positive.
+        """
+        super().__init__()
+        if method not in ["average", "difference"]:
+            raise ValueError(f"Invalid method: {method}")
+        if size <= 0:
+            raise ValueError(f"Size must be positive, got {size}")
+        self._key = key
+        self._method = method
+        self._size = size
+
+    def _compute_bits(self, images: np.ndarray) -> np.ndarray:
+        # Bits of a stack of grayscale images with the same shape.
+        if self._method == "average":
+            small = _area_resize(images, self._size, self._size)
+            return small > small.mean(axis=(-2, -1), keepdims=True)
+        small = _area_resize(images, self._size, self._size + 1)
+        return small[..., 1:] > small[..., :-1]
+
+    def hash_batch(self, images: Sequence[np.ndarray]) -> list[str]:
+        """Compute the perceptual hashes of a batch of images.
+
+        Images with the same shape are stacked and hashed with a single vectorized
+        computation, which is much faster than hashing them one by one when the images
+        are small or the batch is large.
+
+        Args:
+            images (Sequence[np.ndarray]): The images to hash.
+
+        Returns:
+            list[str]: The hexadecimal hashes, in the same order as the images.
+        """
+        grays = [_to_grayscale(image) for image in images]
+        by_shape: dict[tuple[int, ...], list[int]] = defaultdict(list)
+        for i, gray in enumerate(grays):
+            by_shape[gray.shape].append(i)
+        hashes = [""] * len(grays)
+        for indices in by_shape.values():
+            bits = self._compute_bits(np.stack([grays[i] for i in indices]))
+            packed = np.packbits(bits.reshape(len(indices), -1), axis=1)
+            for i, row in zip(indices, packed):
+                hashes[i] = row.tobytes().hex()
+        return hashes
+
+    def __call__(self, idx: int, x: Sample) -> PerceptualHashedSample:
+        hash_ = self.hash_batch([x[self._key]()])[0]
+        return PerceptualHashedSample(phash=MemoryItem(hash_, YAMLParser(type_=str)))
@@ -2,18 +2,40 @@
 
 from pipewine.operators.base import DatasetOperator, IdentityOp
 from pipewine.operators.cache import (
+    ARCCache,
+    BoundedCache,
     Cache,
     CacheOp,
+    CacheStats,
+    ClockCache,
+    CompressedCache,
+    DiskCache,
     FIFOCache,
+    GreedyDualSizeCache,
+    LFUCache,
     LIFOCache,
     LRUCache,
     MemoCache,
     MemorizeEverythingOp,
     MRUCache,
+    PrefetchOp,
     ItemCacheOp,
     RRCache,
+    ShardedCache,
+    SharedCache,
+    TieredCache,
+    TwoQCache,
+    WTinyLFUCache,
+    estimate_nbytes,
+)
+from pipewine.operators.dedup import DedupOp, DuplicatesSample, NearDuplicatesOp
+from pipewine.operators.functional import (
+    FilterOp,
+    GroupByOp,
+    KeyIndexOp,
+    MapOp,
+    SortOp,
 )
-from pipewine.operators.functional import FilterOp, GroupByOp, MapOp, SortOp
 from pipewine.operators.iter import (
     CycleOp,
     IndexOp,
@@ -22,6 +44,7 @@ from pipewine.operators.iter import (
     ReverseOp,
     SliceOp,
 )
-from pipewine.operators.merge import CatOp, ZipOp
+from pipewine.operators.merge import CatOp, JoinOp, ZipOp
+from pipewine.operators.neighbors import NearestNeighborsOp, NeighborsSample
 from pipewine.operators.rand import ShuffleOp
 from pipewine.operators.split import BatchOp, ChunkOp, SplitOp
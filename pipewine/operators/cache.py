@@ -1,22 +1,112 @@
 """Operators for caching the results of other operators to avoid recomputation."""
 
+import hashlib
+import heapq
+import mmap
+import os
+import pickle
 import random
+import sys
+import tempfile
+import time
 import weakref
+import zlib
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 from functools import partial
-from threading import RLock
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.managers import SyncManager
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from threading import Lock, RLock
 from typing import Any
 from uuid import uuid4
 
+import numpy as np
+
 from pipewine.dataset import Dataset, LazyDataset
 from pipewine.grabber import Grabber, InheritedData
+from pipewine.item import CachedItem, MemoryItem, StoredItem
 from pipewine.mappers import CacheMapper
 from pipewine.operators.base import DatasetOperator
 from pipewine.operators.functional import MapOp
+from pipewine.reader import Reader
 from pipewine.sample import Sample
 
 
+def _estimate_nbytes(obj: Any, seen: set[int], unloaded: list[CachedItem]) -> int:
+    # Unloaded cached items found in the object are appended to `unloaded`.
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (np.ndarray, memoryview)):
+        return obj.nbytes
+    if isinstance(obj, Sample):
+        return sum(_estimate_nbytes(item, seen, unloaded) for item in obj.values())
+    if isinstance(obj, CachedItem):
+        if obj.is_cached:
+            return _estimate_nbytes(obj(), seen, unloaded)
+        unloaded.append(obj)
+        return _estimate_nbytes(obj.source, seen, unloaded)
+    if isinstance(obj, MemoryItem):
+        return _estimate_nbytes(obj(), seen, unloaded)
+    if isinstance(obj, StoredItem):
+        return 0
+    nbytes = sys.getsizeof(obj)
+    if isinstance(obj, Mapping):
+        obj = [x for kv in obj.items() for x in kv]
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        nbytes += sum(_estimate_nbytes(x, seen, unloaded) for x in obj)
+    return nbytes
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Estimate the number of bytes of memory used by an object.
+
+    Numpy arrays are measured by their `nbytes`, samples and collections are measured
+    recursively, and `MemoryItem` and `CachedItem` instances are measured by the value
+    they hold. Items that read their data from an external source and have not been
+    loaded yet (e.g. a `StoredItem` or a `CachedItem` that was never accessed) do not
+    occupy any memory and count as zero bytes. All other objects are measured with
+    `sys.getsizeof`.
+
+    Objects referenced more than once are counted only once.
+
+    Args:
+        obj (Any): Object to measure.
+
+    Returns:
+        int: Estimated number of bytes.
+    """
+    return _estimate_nbytes(obj, set(), [])
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of the statistics of a cache."""
+
+    hits: int
+    """Number of calls to `get` that found the key in the cache."""
+    misses: int
+    """Number of calls to `get` that did not find the key in the cache."""
+    evictions: int
+    """Number of key-value pairs evicted to make room for new ones."""
+    nbytes: int
+    """Number of bytes held by the cache, zero if the cache does not track it."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of calls to `get` that found the key in the cache, zero if `get`
+        was never called.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
 class Cache[K, V](ABC):
     """Key-value cache abstraction with thread-safe operations on arbitrary keys and
     values.
@@ -25,13 +115,31 @@ class Cache[K, V](ABC):
     cache behavior and eviction policy. These methods are automatically made thread-safe
     by the `Cache` class, so there is no need to worry about acquiring and releasing
     locks when implementing them.
+
+    Subclasses whose `_get` is safe to call concurrently with all the other methods can
+    set `_lock_free_get` to True: `get` then never acquires the lock, so that readers
+    never wait for each other nor for writers.
+
+    Every cache counts hits, misses and evictions, see `stats`. Counters are updated
+    while holding the lock that is already needed to access the cache, so they add a
+    negligible overhead. The hit and miss counters of caches with `_lock_free_get` are
+    updated without the lock instead, and may miss a few of the `get` calls that run
+    concurrently in different threads. Each process counts the accesses to its own copy of the cache:
+    the counters of a cache sent to the grabber workers are not reported back to the
+    process that created it, see `is_local`.
     """
 
+    _lock_free_get: bool = False
+
     def __init__(self) -> None:
         """Initialize the locks necessary for thread-safety, always make sure to call
         this constructor when inheriting from this class.
         """
         self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._local = True
 
     @abstractmethod
     def _clear(self) -> None:
@@ -76,20 +184,97 @@ class Cache[K, V](ABC):
             V | None: Value associated with the key, or `None` if the key is not present
                 in the cache.
         """
+        if self._lock_free_get:
+            value = self._get(key)
+            self._count(value)
+            return value
+        with self._lock:
+            value = self._get(key)
+            self._count(value)
+            return value
+
+    def _lookup(self, key: K) -> V | None:
+        # Like `get`, without updating the counters.
+        if self._lock_free_get:
+            return self._get(key)
         with self._lock:
             return self._get(key)
 
-    def put(self, key: K, value: V) -> None:
+    def _count(self, value: V | None) -> None:
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+
+    def put(self, key: K, value: V, cost: float | None = None) -> None:
         """Put a key-value pair in the cache.
 
         Args:
             key (K): Key to associate with the value.
             value (V): Value to store in the cache.
+            cost (float | None, optional): Cost of recomputing the value, e.g. the time
+                taken to compute it, ignored by caches whose `uses_cost` is False.
+                Defaults to None.
         """
         with self._lock:
             self._put(key, value)
 
+    @property
+    def uses_cost(self) -> bool:
+        """Whether the eviction policy takes into account the cost passed to `put`."""
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes held by the cache, zero if the cache does not track it."""
+        return 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit, miss and eviction counters of the cache, and of the
+        number of bytes it holds. Counters are not reset when the cache is cleared.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                nbytes=self.nbytes,
+            )
+
+    @contextmanager
+    def instrument_locks[L](self, wrapper: Callable[[Any], L]) -> Iterator[list[L]]:
+        """Temporarily replace the locks that serialize the accesses to the cache with
+        wrappers, e.g. to measure how long threads wait for them. The wrappers are used
+        as context managers to acquire and release the locks, and the original locks
+        are restored on exit.
+
+        Args:
+            wrapper (Callable[[Any], L]): Function that accepts a lock and returns its
+                wrapper.
+
+        Yields:
+            list[L]: The wrappers, one for every lock of the cache.
+        """
+        lock = self._lock
+        wrapped = wrapper(lock)
+        self._lock = wrapped  # type: ignore
+        try:
+            yield [wrapped]
+        finally:
+            self._lock = lock
+
+    @property
+    def is_local(self) -> bool:
+        """Whether the cache was only accessed by the current process, i.e. it was never
+        pickled, e.g. to be sent to the grabber workers. When False, `stats` does not
+        count the accesses made by the other processes.
+        """
+        return self._local
+
     def __getstate__(self) -> dict[str, Any]:
+        # The copy may be accessed by another process, whose accesses are not counted.
+        self._local = False
         data = {**self.__dict__}
         del data["_lock"]
         return data
@@ -100,6 +285,127 @@ class Cache[K, V](ABC):
             setattr(self, k, v)
 
 
+class BoundedCache[K, V](Cache[K, V]):
+    """Base class for caches with a bounded capacity, expressed as a maximum number of
+    key-value pairs, a maximum number of bytes, or both.
+
+    Subclasses must implement the `_evict` method to define the eviction policy, and
+    must call `_on_evict` every time they evict a key-value pair inside `_put`.
+
+    The size of each value is estimated with `estimate_nbytes` when it is inserted.
+    Values containing `CachedItem` instances that were not loaded yet are re-estimated
+    (alone, without touching the other entries) as soon as one of those items is loaded,
+    and entries are evicted right away if the cache exceeds `maxbytes`. The bound thus
+    covers all the data held in memory by the cached values, including the data that
+    their items load lazily after insertion, while the data of items that are not
+    wrapped in a `CachedItem` (e.g. a plain `StoredItem`) is never held in memory and is
+    not counted.
+    """
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. Values larger than
+                this limit are not stored at all. Defaults to None.
+
+        Raises:
+            ValueError: If `maxbytes` is negative.
+        """
+        super().__init__()
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError(f"maxbytes must be non-negative, got {maxbytes}")
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._sizes: dict[K, int] = {}
+        self._pending: dict[K, V] = {}
+        self._nbytes = 0
+
+    @abstractmethod
+    def _evict(self) -> K:
+        """Evict a key-value pair according to the eviction policy. Only called when
+        the cache is not empty.
+
+        Returns:
+            K: The key of the evicted key-value pair.
+        """
+        pass
+
+    def _is_full(self, size: int) -> bool:
+        return self._maxsize is not None and size >= self._maxsize
+
+    def _on_evict(self, key: K) -> None:
+        """Release the bookkeeping of an evicted key, must be called by subclasses
+        every time they evict a key-value pair.
+
+        Args:
+            key (K): The evicted key.
+        """
+        self._evictions += 1
+        self._untrack(key)
+
+    def _untrack(self, key: K) -> None:
+        self._nbytes -= self._sizes.pop(key, 0)
+        self._pending.pop(key, None)
+
+    def _track(self, key: K, value: V, register: bool = True) -> None:
+        unloaded: list[CachedItem] = []
+        nbytes = _estimate_nbytes(value, set(), unloaded)
+        self._nbytes += nbytes - self._sizes.get(key, 0)
+        self._sizes[key] = nbytes
+        if not unloaded:
+            self._pending.pop(key, None)
+            return
+        self._pending[key] = value
+        if register:
+            for item in unloaded:
+                item.on_load(partial(self._on_load, key, value))
+
+    def _on_load(self, key: K, value: V) -> None:
+        with self._lock:
+            if self._pending.get(key) is not value:
+                return
+            self._track(key, value, register=False)
+            if self._maxbytes is None:
+                return
+            while self._sizes and self._nbytes > self._maxbytes:
+                self._on_evict(self._evict())
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated number of bytes of the values stored in the cache, tracked even if
+        the cache is not bounded by `maxbytes`.
+        """
+        return self._nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+            self._sizes.clear()
+            self._pending.clear()
+            self._nbytes = 0
+
+    def put(self, key: K, value: V, cost: float | None = None) -> None:
+        with self._lock:
+            if self._maxbytes is not None:
+                nbytes = estimate_nbytes(value)
+                if nbytes > self._maxbytes:
+                    return
+                self._untrack(key)
+                while self._sizes and self._nbytes + nbytes > self._maxbytes:
+                    self._on_evict(self._evict())
+            self._put(key, value)
+            self._track(key, value)
+
+    def __setstate__(self, data: dict[str, Any]) -> None:
+        super().__setstate__(data)
+        # Load callbacks are not pickled, register them on the copied items.
+        for key, value in list(self._pending.items()):
+            self._track(key, value)
+
+
 class MemoCache[K, V](Cache[K, V]):
     """Simple cache that stores key-value pairs in a dictionary, with no eviction policy
     or size limit, useful for memoization of functions with a bounded number of
@@ -109,6 +415,8 @@ class MemoCache[K, V](Cache[K, V]):
     memory indefinitely.
     """
 
+    _lock_free_get = True
+
     def __init__(self) -> None:
         """Initialize the cache with an empty dictionary."""
         super().__init__()
@@ -124,24 +432,28 @@ class MemoCache[K, V](Cache[K, V]):
         self._memo[key] = value
 
 
-class RRCache[K, V](Cache[K, V]):
+class RRCache[K, V](BoundedCache[K, V]):
     """Random Replacement (RR) cache that evicts a random key-value pair when the cache
     is full and a new key-value pair is inserted. This cache is useful for scenarios
     where the order of access to the keys is not known or when no suitable eviction
     policy is particularly effective.
     """
 
-    def __init__(self, maxsize: int = 32) -> None:
+    _lock_free_get = True
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
         """
         Args:
-            maxsize (int, optional): Maximum number of key-value pairs to store in the
-                cache. Defaults to 32.
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
         """
 
-        super().__init__()
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
         self._mp: dict[K, V] = {}
         self._keys: list[K] = []
-        self._maxsize = maxsize
 
     def _clear(self) -> None:
         self._mp.clear()
@@ -150,34 +462,50 @@ class RRCache[K, V](Cache[K, V]):
     def _get(self, key: K) -> V | None:
         return self._mp.get(key)
 
+    def _evict(self) -> K:
+        idx = random.randint(0, len(self._keys) - 1)
+        evicted = self._keys[idx]
+        self._keys[idx] = self._keys[-1]
+        self._keys.pop()
+        del self._mp[evicted]
+        return evicted
+
     def _put(self, key: K, value: V) -> None:
-        if len(self._keys) < self._maxsize:
+        if key in self._mp:
+            self._mp[key] = value
+            return
+        if not self._is_full(len(self._keys)):
             self._keys.append(key)
         else:
-            idx = random.randint(0, self._maxsize - 1)
+            idx = random.randint(0, len(self._keys) - 1)
             prev_k = self._keys[idx]
             self._keys[idx] = key
             del self._mp[prev_k]
+            self._on_evict(prev_k)
         self._mp[key] = value
 
 
-class FIFOCache[K, V](Cache[K, V]):
+class FIFOCache[K, V](BoundedCache[K, V]):
     """First-In-First-Out (FIFO) cache that evicts the least recently **inserted**
     key-value pair when the cache is full and a new key-value pair is inserted. This
     cache is useful for scenarios where the order of access to the keys is known and
     the oldest keys are likely to be the least useful.
     """
 
-    def __init__(self, maxsize: int = 32) -> None:
+    _lock_free_get = True
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
         """
         Args:
-            maxsize (int, optional): Maximum number of key-value pairs to store in the
-                cache. Defaults to 32.
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
         """
-        super().__init__()
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
         self._mp: dict[K, V] = {}
         self._keys: deque[K] = deque()
-        self._maxsize = maxsize
 
     def _clear(self) -> None:
         self._mp.clear()
@@ -186,33 +514,46 @@ class FIFOCache[K, V](Cache[K, V]):
     def _get(self, key: K) -> V | None:
         return self._mp.get(key)
 
+    def _evict(self) -> K:
+        evicted = self._keys.popleft()
+        del self._mp[evicted]
+        return evicted
+
     def _put(self, key: K, value: V) -> None:
-        if len(self._keys) < self._maxsize:
+        if key in self._mp:
+            self._mp[key] = value
+            return
+        if not self._is_full(len(self._keys)):
             self._keys.append(key)
         else:
             evicted = self._keys.popleft()
             self._keys.append(key)
             del self._mp[evicted]
+            self._on_evict(evicted)
         self._mp[key] = value
 
 
-class LIFOCache[K, V](Cache[K, V]):
+class LIFOCache[K, V](BoundedCache[K, V]):
     """Last-In-First-Out (LIFO) cache that evicts the most recently **inserted**
     key-value pair when the cache is full and a new key-value pair is inserted. This
     cache is useful for scenarios where the data is accessed in long repeated cycles,
     where the most recently inserted keys are likely to not going to be used again soon.
     """
 
-    def __init__(self, maxsize: int = 32) -> None:
+    _lock_free_get = True
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
         """
         Args:
-            maxsize (int, optional): Maximum number of key-value pairs to store in the
-                cache. Defaults to 32.
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
         """
-        super().__init__()
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
         self._mp: dict[K, V] = {}
         self._keys: list[K] = []
-        self._maxsize = maxsize
 
     def _clear(self) -> None:
         self._mp.clear()
@@ -221,17 +562,26 @@ class LIFOCache[K, V](Cache[K, V]):
     def _get(self, key: K) -> V | None:
         return self._mp.get(key)
 
+    def _evict(self) -> K:
+        evicted = self._keys.pop()
+        del self._mp[evicted]
+        return evicted
+
     def _put(self, key: K, value: V) -> None:
-        if len(self._keys) < self._maxsize:
+        if key in self._mp:
+            self._mp[key] = value
+            return
+        if not self._is_full(len(self._keys)):
             self._keys.append(key)
         else:
             evicted = self._keys[-1]
             self._keys[-1] = key
             del self._mp[evicted]
+            self._on_evict(evicted)
         self._mp[key] = value
 
 
-class LRUCache[K, V](Cache[K, V]):
+class LRUCache[K, V](BoundedCache[K, V]):
     """Least Recently Used (LRU) cache that evicts the least recently **accessed**
     key-value pair when the cache is full and a new key-value pair is inserted. This
     cache is useful for scenarios where the most recently accessed keys are likely to
@@ -240,14 +590,16 @@ class LRUCache[K, V](Cache[K, V]):
 
     _PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
 
-    def __init__(self, maxsize: int = 32) -> None:
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
         """
         Args:
-            maxsize (int, optional): Maximum number of key-value pairs to store in the
-                cache. Defaults to 32.
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
         """
-        super().__init__()
-        self._maxsize = maxsize
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
         self._dll: list = []
         self._dll[:] = [self._dll, self._dll, None, None]
         self._mp: dict[K, list] = {}
@@ -269,19 +621,27 @@ class LRUCache[K, V](Cache[K, V]):
             return value
         return None
 
+    def _evict(self) -> K:
+        link = self._dll[self._NEXT]
+        link_prev, link_next, key, _ = link
+        link_prev[self._NEXT] = link_next
+        link_next[self._PREV] = link_prev
+        del self._mp[key]
+        return key
+
     def _put(self, key: K, value: V) -> None:
         if key in self._mp:
             self._mp[key][self._VALUE] = value
             self._get(key)  # Set key as mru
-        elif len(self._mp) >= self._maxsize:
+        elif self._is_full(len(self._mp)):
             oldroot = self._dll
             oldroot[self._KEY] = key
             oldroot[self._VALUE] = value
             self._dll = oldroot[self._NEXT]
             oldkey = self._dll[self._KEY]
-            oldvalue = self._dll[self._VALUE]
             self._dll[self._KEY] = self._dll[self._VALUE] = None
             del self._mp[oldkey]
+            self._on_evict(oldkey)
             self._mp[key] = oldroot
         else:
             last = self._dll[self._PREV]
@@ -289,7 +649,7 @@ class LRUCache[K, V](Cache[K, V]):
             last[self._NEXT] = self._dll[self._PREV] = self._mp[key] = link
 
 
-class MRUCache[K, V](Cache[K, V]):
+class MRUCache[K, V](BoundedCache[K, V]):
     """Most Recently Used (MRU) cache that evicts the most recently **accessed**
     key-value pair when the cache is full and a new key-value pair is inserted. This
     cache is useful for scenarios where the most recently accessed keys are likely not
@@ -298,15 +658,17 @@ class MRUCache[K, V](Cache[K, V]):
 
     _PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
 
-    def __init__(self, maxsize: int = 32) -> None:
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
         """
         Args:
-            maxsize (int, optional): Maximum number of key-value pairs to store in the
-                cache. Defaults to 32.
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
         """
 
-        super().__init__()
-        self._maxsize = maxsize
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
         self._dll: list = []
         self._dll[:] = [self._dll, self._dll, None, None]
         self._mp: dict[K, list] = {}
@@ -328,17 +690,25 @@ class MRUCache[K, V](Cache[K, V]):
             return value
         return None
 
+    def _evict(self) -> K:
+        link = self._dll[self._PREV]
+        link_prev, link_next, key, _ = link
+        link_prev[self._NEXT] = link_next
+        link_next[self._PREV] = link_prev
+        del self._mp[key]
+        return key
+
     def _put(self, key: K, value: V) -> None:
         if key in self._mp:
             self._mp[key][self._VALUE] = value
             self._get(key)  # Set key as mru
-        elif len(self._mp) >= self._maxsize:
+        elif self._is_full(len(self._mp)):
             mru = self._dll[self._PREV]
             oldkey = mru[self._KEY]
-            oldvalue = mru[self._VALUE]
             mru[self._KEY] = key
             mru[self._VALUE] = value
             del self._mp[oldkey]
+            self._on_evict(oldkey)
             self._mp[key] = mru
         else:
             last = self._dll[self._PREV]
@@ -346,53 +716,1657 @@ class MRUCache[K, V](Cache[K, V]):
             last[self._NEXT] = self._dll[self._PREV] = self._mp[key] = link
 
 
+class ClockCache[K, V](BoundedCache[K, V]):
+    """CLOCK (second chance) cache that approximates an LRU cache with the cost of a
+    FIFO cache. Every key-value pair has a reference bit, set when it is accessed. When
+    the cache is full, the clock hand sweeps the key-value pairs in insertion order,
+    clearing the reference bits and evicting the first key-value pair whose bit is not
+    set.
+    """
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        self._mp: OrderedDict[K, V] = OrderedDict()
+        self._ref: dict[K, bool] = {}
+
+    def _clear(self) -> None:
+        self._mp.clear()
+        self._ref.clear()
+
+    def _get(self, key: K) -> V | None:
+        if key in self._mp:
+            self._ref[key] = True
+        return self._mp.get(key)
+
+    def _evict(self) -> K:
+        while True:
+            key = next(iter(self._mp))
+            if not self._ref[key]:
+                break
+            self._ref[key] = False
+            self._mp.move_to_end(key)
+        del self._mp[key]
+        del self._ref[key]
+        return key
+
+    def _put(self, key: K, value: V) -> None:
+        if key not in self._mp and self._is_full(len(self._mp)):
+            self._on_evict(self._evict())
+        self._ref[key] = key in self._mp
+        self._mp[key] = value
+
+
+class LFUCache[K, V](BoundedCache[K, V]):
+    """Least Frequently Used (LFU) cache that evicts the least frequently **accessed**
+    key-value pair when the cache is full, breaking ties in favour of the least recently
+    used one. This cache is useful when some keys are accessed much more often than the
+    others, like in Zipfian access patterns, since a long scan of keys accessed only
+    once cannot evict the most popular ones.
+
+    To let the cache adapt when the popularity of the keys changes over time, access
+    frequencies are periodically aged, halving all of them.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 32,
+        maxbytes: int | None = None,
+        aging_period: int = 1024,
+    ) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+            aging_period (int, optional): Number of accesses after which all the
+                frequencies are halved. Defaults to 1024.
+
+        Raises:
+            ValueError: If `aging_period` is not positive.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        if aging_period <= 0:
+            raise ValueError(f"aging_period must be positive, got {aging_period}")
+        self._aging_period = aging_period
+        self._accesses = 0
+        self._mp: dict[K, V] = {}
+        self._freq: dict[K, int] = {}
+        self._buckets: dict[int, OrderedDict[K, None]] = {}
+
+    def _clear(self) -> None:
+        self._mp.clear()
+        self._freq.clear()
+        self._buckets.clear()
+        self._accesses = 0
+
+    def _unlink(self, key: K) -> int:
+        freq = self._freq.pop(key)
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+        return freq
+
+    def _link(self, key: K, freq: int) -> None:
+        self._freq[key] = freq
+        self._buckets.setdefault(freq, OrderedDict())[key] = None
+
+    def _age(self) -> None:
+        self._accesses += 1
+        if self._accesses < self._aging_period:
+            return
+        self._accesses = 0
+        buckets = sorted(self._buckets.items())
+        self._freq.clear()
+        self._buckets.clear()
+        for freq, bucket in buckets:
+            for key in bucket:
+                self._link(key, max(1, freq // 2))
+
+    def _get(self, key: K) -> V | None:
+        self._age()
+        if key not in self._mp:
+            return None
+        self._link(key, self._unlink(key) + 1)
+        return self._mp[key]
+
+    def _evict(self) -> K:
+        bucket = self._buckets[min(self._buckets)]
+        key = next(iter(bucket))
+        self._unlink(key)
+        del self._mp[key]
+        return key
+
+    def _put(self, key: K, value: V) -> None:
+        if key in self._mp:
+            self._mp[key] = value
+            return
+        if self._is_full(len(self._mp)):
+            self._on_evict(self._evict())
+        self._mp[key] = value
+        self._link(key, 1)
+
+
+class TwoQCache[K, V](BoundedCache[K, V]):
+    """2Q cache, that keeps new key-value pairs in a small FIFO queue and promotes them
+    to a main LRU queue only if they are accessed again after being evicted from it,
+    which is remembered by keeping the keys of recently evicted pairs in a ghost queue.
+    This cache is resistant to scans: keys accessed only once never reach the main
+    queue, so they cannot evict the frequently accessed ones.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 32,
+        maxbytes: int | None = None,
+        in_ratio: float = 0.25,
+        out_ratio: float = 0.5,
+    ) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+            in_ratio (float, optional): Size of the FIFO queue of new key-value pairs,
+                relative to the capacity of the cache. Defaults to 0.25.
+            out_ratio (float, optional): Size of the ghost queue of evicted keys,
+                relative to the capacity of the cache. Defaults to 0.5.
+
+        If the cache is bounded only by `maxbytes`, the capacity is the current number
+        of key-value pairs.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        self._in_ratio = in_ratio
+        self._out_ratio = out_ratio
+        self._a1in: OrderedDict[K, V] = OrderedDict()
+        self._a1out: OrderedDict[K, None] = OrderedDict()
+        self._am: OrderedDict[K, V] = OrderedDict()
+
+    def _capacity(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return len(self._a1in) + len(self._am)
+
+    def _clear(self) -> None:
+        self._a1in.clear()
+        self._a1out.clear()
+        self._am.clear()
+
+    def _get(self, key: K) -> V | None:
+        if key in self._am:
+            self._am.move_to_end(key)
+            return self._am[key]
+        return self._a1in.get(key)
+
+    def _evict(self) -> K:
+        capacity = self._capacity()
+        if self._a1in and (len(self._a1in) > capacity * self._in_ratio or not self._am):
+            key, _ = self._a1in.popitem(last=False)
+            self._a1out[key] = None
+            while len(self._a1out) > max(1, int(capacity * self._out_ratio)):
+                self._a1out.popitem(last=False)
+        else:
+            key, _ = self._am.popitem(last=False)
+        return key
+
+    def _put(self, key: K, value: V) -> None:
+        if key in self._am:
+            self._am[key] = value
+            return
+        if key in self._a1in:
+            self._a1in[key] = value
+            return
+        promote = key in self._a1out
+        if promote:
+            del self._a1out[key]
+        if self._is_full(len(self._a1in) + len(self._am)):
+            self._on_evict(self._evict())
+        if promote:
+            self._am[key] = value
+        else:
+            self._a1in[key] = value
+
+
+class ARCCache[K, V](BoundedCache[K, V]):
+    """Adaptive Replacement Cache (ARC), that splits the cache between key-value pairs
+    accessed only once recently and key-value pairs accessed at least twice, each
+    managed with an LRU policy. Two ghost lists remember the keys recently evicted from
+    each part, and a hit on a ghost key adaptively moves the target split towards the
+    part it was evicted from. This cache combines the benefits of LRU and LFU policies
+    and is resistant to scans, without any parameter to tune.
+
+    If the cache is bounded only by `maxbytes`, the ghost lists are bounded by the
+    current number of key-value pairs.
+    """
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        self._p = 0.0
+        self._t1: OrderedDict[K, V] = OrderedDict()
+        self._t2: OrderedDict[K, V] = OrderedDict()
+        self._b1: OrderedDict[K, None] = OrderedDict()
+        self._b2: OrderedDict[K, None] = OrderedDict()
+
+    def _capacity(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return max(1, len(self._t1) + len(self._t2))
+
+    def _clear(self) -> None:
+        self._p = 0.0
+        self._t1.clear()
+        self._t2.clear()
+        self._b1.clear()
+        self._b2.clear()
+
+    def _get(self, key: K) -> V | None:
+        if key in self._t1:
+            value = self._t1.pop(key)
+            self._t2[key] = value
+            return value
+        if key in self._t2:
+            self._t2.move_to_end(key)
+            return self._t2[key]
+        return None
+
+    def _replace(self, in_b2: bool) -> K:
+        if self._t1 and (
+            not self._t2
+            or len(self._t1) > self._p
+            or (in_b2 and len(self._t1) == self._p)
+        ):
+            key, _ = self._t1.popitem(last=False)
+            self._b1[key] = None
+        else:
+            key, _ = self._t2.popitem(last=False)
+            self._b2[key] = None
+        return key
+
+    def _evict(self) -> K:
+        key = self._replace(False)
+        self._trim_ghosts()
+        return key
+
+    def _trim_ghosts(self) -> None:
+        capacity = self._capacity()
+        while self._b1 and len(self._t1) + len(self._b1) > capacity:
+            self._b1.popitem(last=False)
+        while (
+            self._b2
+            and len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2)
+            > 2 * capacity
+        ):
+            self._b2.popitem(last=False)
+
+    def _put(self, key: K, value: V) -> None:
+        if key in self._t1:
+            self._t1[key] = value
+            return
+        if key in self._t2:
+            self._t2[key] = value
+            return
+        capacity = self._capacity()
+        full = self._is_full(len(self._t1) + len(self._t2))
+        if key in self._b1:
+            self._p = min(capacity, self._p + max(len(self._b2) / len(self._b1), 1))
+            del self._b1[key]
+            if full:
+                self._on_evict(self._replace(False))
+            self._t2[key] = value
+        elif key in self._b2:
+            self._p = max(0.0, self._p - max(len(self._b1) / len(self._b2), 1))
+            del self._b2[key]
+            if full:
+                self._on_evict(self._replace(True))
+            self._t2[key] = value
+        else:
+            if full:
+                self._on_evict(self._replace(False))
+            self._t1[key] = value
+        self._trim_ghosts()
+
+
+class _CountMinSketch:
+    def __init__(self, width: int, depth: int = 4, maxcount: int = 15) -> None:
+        self._mask = (1 << max(6, (width - 1).bit_length())) - 1
+        self._rows = [[0] * (self._mask + 1) for _ in range(depth)]
+        self._maxcount = maxcount
+        self._additions = 0
+        self._sample_size = 10 * (self._mask + 1)
+
+    def _indices(self, key: Any) -> list[int]:
+        return [hash((i, key)) & self._mask for i in range(len(self._rows))]
+
+    def estimate(self, key: Any) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indices(key)))
+
+    def increment(self, key: Any) -> None:
+        for row, i in zip(self._rows, self._indices(key)):
+            if row[i] < self._maxcount:
+                row[i] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._additions //= 2
+            for row in self._rows:
+                row[:] = [x // 2 for x in row]
+
+
+class WTinyLFUCache[K, V](BoundedCache[K, V]):
+    """Window TinyLFU (W-TinyLFU) cache, that admits new key-value pairs in a small LRU
+    window and then lets them enter the main cache only if they are accessed more
+    frequently than the key-value pair that would be evicted in their place. Access
+    frequencies of all keys, including the ones not in the cache, are estimated with a
+    compact count-min sketch that is periodically aged. The main cache is a segmented
+    LRU, split into a probation and a protected segment.
+
+    This cache is resistant to scans and performs well with skewed access patterns,
+    where a few keys are accessed much more frequently than the others, while the
+    window lets it handle bursts of accesses to new keys.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = 32,
+        maxbytes: int | None = None,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+    ) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+            window_ratio (float, optional): Size of the admission window, relative to
+                the capacity of the cache. Defaults to 0.01.
+            protected_ratio (float, optional): Size of the protected segment, relative
+                to the capacity of the main cache. Defaults to 0.8.
+
+        If the cache is bounded only by `maxbytes`, every new key-value pair enters
+        the main cache, and the frequency estimates decide which key-value pair to
+        evict among the least recently used ones of each segment.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        capacity = maxsize if maxsize is not None else 256
+        self._window_size = max(1, int(capacity * window_ratio))
+        self._protected_size = max(
+            1, int((capacity - self._window_size) * protected_ratio)
+        )
+        self._capacity = capacity
+        self._sketch = _CountMinSketch(capacity)
+        self._window: OrderedDict[K, V] = OrderedDict()
+        self._probation: OrderedDict[K, V] = OrderedDict()
+        self._protected: OrderedDict[K, V] = OrderedDict()
+
+    def _clear(self) -> None:
+        self._sketch = _CountMinSketch(self._capacity)
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+
+    def _get(self, key: K) -> V | None:
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+            return self._window[key]
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return self._protected[key]
+        if key in self._probation:
+            value = self._protected[key] = self._probation.pop(key)
+            if len(self._protected) > self._protected_size:
+                demoted, demoted_value = self._protected.popitem(last=False)
+                self._probation[demoted] = demoted_value
+            return value
+        return None
+
+    def _evict(self) -> K:
+        segments = [x for x in (self._window, self._probation, self._protected) if x]
+        victims = [
+            (self._sketch.estimate(next(iter(x))), i) for i, x in enumerate(segments)
+        ]
+        key, _ = segments[min(victims)[1]].popitem(last=False)
+        return key
+
+    def _put(self, key: K, value: V) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                segment[key] = value
+                return
+        self._window[key] = value
+        if self._maxsize is None:
+            if len(self._window) > self._window_size:
+                candidate, candidate_value = self._window.popitem(last=False)
+                self._probation[candidate] = candidate_value
+            return
+        if len(self._window) <= self._window_size:
+            return
+        candidate, candidate_value = self._window.popitem(last=False)
+        main = len(self._probation) + len(self._protected)
+        if main < self._maxsize - self._window_size:
+            self._probation[candidate] = candidate_value
+            return
+        if main == 0:  # The window takes the whole capacity, e.g. with maxsize=1
+            self._on_evict(candidate)
+            return
+        victim_segment = self._probation or self._protected
+        victim = next(iter(victim_segment))
+        if self._sketch.estimate(candidate) > self._sketch.estimate(victim):
+            del victim_segment[victim]
+            self._on_evict(victim)
+            self._probation[candidate] = candidate_value
+        else:
+            self._on_evict(candidate)
+
+
+class GreedyDualSizeCache[K, V](BoundedCache[K, V]):
+    """GreedyDual-Size (GDS) cache that takes into account both the cost of
+    recomputing every key-value pair and its size, evicting first the key-value pairs
+    with the lowest cost per byte. Every key-value pair has a priority equal to its cost
+    divided by its size, plus an inflation value that is raised to the priority of the
+    last evicted key-value pair, so that key-value pairs that are not accessed for a
+    long time are eventually evicted, regardless of their cost. Accessing a key-value
+    pair restores its priority. The size of every value is estimated once, when it is
+    inserted, and reused every time its priority is restored.
+
+    The cost is passed to `put`, and defaults to 1 for all key-value pairs, in which
+    case small values are preferred. When used with `CacheOp`, even through a wrapper
+    such as `ShardedCache` or `CompressedCache`, the cost of every sample is the time
+    taken to compute it and to load all its items.
+    """
+
+    def __init__(self, maxsize: int | None = 32, maxbytes: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to 32.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                values stored in the cache, or None for no limit. See `BoundedCache`.
+                Defaults to None.
+        """
+        super().__init__(maxsize=maxsize, maxbytes=maxbytes)
+        self._mp: dict[K, V] = {}
+        self._weights: dict[K, float] = {}
+        self._entries: dict[K, tuple[float, int]] = {}
+        self._heap: list[tuple[float, int, K]] = []
+        self._counter = 0
+        self._inflation = 0.0
+        self._next_cost = 1.0
+
+    def _clear(self) -> None:
+        self._mp.clear()
+        self._weights.clear()
+        self._entries.clear()
+        self._heap.clear()
+        self._inflation = 0.0
+
+    def _prioritize(self, key: K) -> None:
+        entry = (self._inflation + self._weights[key], self._counter)
+        self._counter += 1
+        self._entries[key] = entry
+        heapq.heappush(self._heap, (*entry, key))
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [(*v, k) for k, v in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _get(self, key: K) -> V | None:
+        if key not in self._mp:
+            return None
+        self._prioritize(key)
+        return self._mp[key]
+
+    def _evict(self) -> K:
+        while True:
+            priority, counter, key = heapq.heappop(self._heap)
+            if self._entries.get(key) == (priority, counter):
+                break
+        self._inflation = priority
+        del self._mp[key]
+        del self._weights[key]
+        del self._entries[key]
+        return key
+
+    def _put(self, key: K, value: V) -> None:
+        if key not in self._mp and self._is_full(len(self._mp)):
+            self._on_evict(self._evict())
+        self._mp[key] = value
+        self._weights[key] = self._next_cost / max(1, estimate_nbytes(value))
+        self._prioritize(key)
+
+    @property
+    def uses_cost(self) -> bool:
+        return True
+
+    def put(self, key: K, value: V, cost: float | None = None) -> None:
+        """Put a key-value pair in the cache, together with the cost of recomputing it.
+
+        Args:
+            key (K): Key to associate with the value.
+            value (V): Value to store in the cache.
+            cost (float | None, optional): Cost of recomputing the value, e.g. the time
+                taken to compute it. Defaults to None, meaning 1.0.
+        """
+        with self._lock:
+            self._next_cost = 1.0 if cost is None else cost
+            super().put(key, value)
+
+
+def _create_segment(size: int) -> SharedMemory:
+    # Segments are owned by the cache, not by the process that creates or attaches to
+    # them: unregister them from the resource tracker to prevent it from unlinking them
+    # when a grabber worker exits.
+    shm = SharedMemory(create=True, size=max(size, 1))
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    return shm
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    shm = SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    return shm
+
+
+def _unlink_segment(name: str) -> None:
+    try:
+        shm = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.unlink()
+    shm.close()
+
+
+class _SharedIndex:
+    # Index of a SharedCache, living in its manager process: maps every key to the name
+    # and size of its segment, in insertion order, and keeps the total size, so that
+    # each operation is a single round trip that does not copy the index.
+    def __init__(self, maxsize: int | None, maxbytes: int | None) -> None:
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._entries: OrderedDict[Any, tuple[str, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def get(self, key: Any) -> tuple[str, int] | None:
+        return self._entries.get(key)
+
+    def put(self, key: Any, name: str, size: int) -> int:
+        with self._lock:
+            prev = self._entries.pop(key, None)
+            if prev is not None:
+                _unlink_segment(prev[0])
+                self._nbytes -= prev[1]
+            evicted = 0
+            while self._entries and (
+                (self._maxsize is not None and len(self._entries) >= self._maxsize)
+                or (self._maxbytes is not None and self._nbytes + size > self._maxbytes)
+            ):
+                _, (old_name, old_size) = self._entries.popitem(last=False)
+                _unlink_segment(old_name)
+                self._nbytes -= old_size
+                evicted += 1
+            self._entries[key] = (name, size)
+            self._nbytes += size
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            for name, _ in self._entries.values():
+                _unlink_segment(name)
+            self._entries.clear()
+            self._nbytes = 0
+
+    def segments(self) -> list[str]:
+        return [name for name, _ in self._entries.values()]
+
+    def nbytes(self) -> int:
+        return self._nbytes
+
+
+class _SharedCacheManager(SyncManager):
+    pass
+
+
+_SharedCacheManager.register("SharedIndex", _SharedIndex)
+
+
+class SharedCache[K, V](Cache[K, V]):
+    """Cache shared by the process that creates it and all the processes it is sent to,
+    such as the grabber workers. An entry inserted by any process is visible to all the
+    others.
+
+    Values are pickled into `multiprocessing.shared_memory` segments, one for every
+    entry, while the index that maps keys to segments lives in a manager process,
+    together with the total size of the entries. When full, the cache evicts the least
+    recently inserted entries first.
+
+    Before a sample is serialized, all its `CachedItem` instances (e.g. the ones created
+    by `CacheOp`) are loaded, so that the decoded data is shared and the processes that
+    read the entry do not need to load it again.
+
+    The process that creates the cache owns the manager and the segments, which are
+    released when the cache is garbage collected. Creating a cache has the fixed cost of
+    starting the manager process, and inserting an entry or looking up a key for the
+    first time requires a round trip to it. Every process remembers the segments of the
+    keys it already accessed, which are then read from shared memory directly: since
+    replaced and evicted segments are removed, an outdated segment is detected when it
+    cannot be opened anymore, and looked up again in the manager. This cache is only
+    worth using when recomputing a value is considerably more expensive than unpickling
+    it.
+    """
+
+    _lock_free_get = True
+    _max_segments = 4096
+
+    def __init__(self, maxsize: int | None = None, maxbytes: int | None = None) -> None:
+        """
+        Args:
+            maxsize (int | None, optional): Maximum number of key-value pairs to store
+                in the cache, or None for no limit. Defaults to None.
+            maxbytes (int | None, optional): Maximum number of bytes of the pickled
+                values stored in the cache, or None for no limit. Values larger than
+                this limit are not stored at all. Defaults to None.
+        """
+        super().__init__()
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._manager = _SharedCacheManager(ctx=get_context("spawn"))
+        self._manager.start()
+        self._index = self._manager.SharedIndex(maxsize, maxbytes)  # type: ignore
+        self._segments: OrderedDict[K, tuple[str, int]] = OrderedDict()
+        self._finalizer = weakref.finalize(
+            self, SharedCache._release, self._manager, self._index
+        )
+
+    @staticmethod
+    def _release(manager: SyncManager, index: Any) -> None:
+        try:
+            index.clear()
+        finally:
+            manager.shutdown()
+
+    def _clear(self) -> None:
+        self._index.clear()
+        self._segments.clear()
+
+    def _read(self, name: str, size: int) -> V | None:
+        try:
+            shm = _attach_segment(name)
+        except FileNotFoundError:  # Evicted or replaced in the meantime
+            return None
+        try:
+            with shm.buf[:size] as view:
+                return pickle.loads(view)
+        finally:
+            shm.close()
+
+    def _remember(self, key: K, entry: tuple[str, int]) -> None:
+        self._segments[key] = entry
+        if len(self._segments) > self._max_segments:
+            self._segments.popitem(last=False)
+
+    def _get(self, key: K) -> V | None:
+        entry = self._segments.get(key)
+        if entry is not None:
+            value = self._read(*entry)
+            if value is not None:
+                return value
+            self._segments.pop(key, None)
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        value = self._read(*entry)
+        if value is not None:
+            self._remember(key, entry)
+        return value
+
+    def _put(self, key: K, value: V) -> None:
+        _load_cached_items(value)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._maxbytes is not None and len(data) > self._maxbytes:
+            return
+        shm = _create_segment(len(data))
+        shm.buf[: len(data)] = data
+        shm.close()
+        self._evictions += self._index.put(key, shm.name, len(data))
+        self._remember(key, (shm.name, len(data)))
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of the pickled values stored in the cache."""
+        return self._index.nbytes()
+
+    def __getstate__(self) -> dict[str, Any]:
+        data = super().__getstate__()
+        del data["_manager"]
+        del data["_finalizer"]
+        data["_segments"] = OrderedDict()
+        return data
+
+
+class DiskCache[K, V](Cache[K, V]):
+    """Persistent cache that stores pickled values as files in a local directory, so
+    that they survive across different runs and can be shared by many processes.
+
+    Keys are hashed to obtain file names, so any key with a stable `repr` can be used.
+    When `maxbytes` is set, the least recently used files are deleted first. Every
+    process keeps an index of the files in the directory and of their sizes, ordered by
+    their last access, which is built from the modification times when the cache is
+    created and then updated by every access without touching the file system. Files
+    written by other processes are only added to the index when they are accessed, or
+    when the directory is scanned again, at most every `rescan_period` seconds while
+    evicting.
+
+    Used with `CacheOp`, entries are keyed by the index of the sample, which is only
+    safe as long as the upstream dataset does not change between runs. To reuse the
+    results of an expensive mapper across runs, pass a `DiskCache` to `MapOp` instead,
+    which keys the entries by a fingerprint of the input sample and of the mapper.
+    """
+
+    _SUFFIX = ".pkl"
+    _lock_free_get = True
+
+    def __init__(
+        self, path: Path, maxbytes: int | None = None, rescan_period: float = 60.0
+    ) -> None:
+        """
+        Args:
+            path (Path): Directory where the cached values are stored, created if it
+                does not exist.
+            maxbytes (int | None, optional): Maximum number of bytes of the files in
+                the directory, or None for no limit. Values larger than this limit are
+                not stored at all. Defaults to None.
+            rescan_period (float, optional): Minimum number of seconds between two
+                scans of the directory to account for the files written by other
+                processes. Defaults to 60.
+        """
+        super().__init__()
+        self._path = Path(path)
+        self._maxbytes = maxbytes
+        self._rescan_period = rescan_period
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._nbytes = 0
+        self._scan()
+
+    def _file(self, key: K) -> Path:
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self._path / (name + self._SUFFIX)
+
+    def _scan(self) -> None:
+        entries = []
+        for file in self._path.glob("*" + self._SUFFIX):
+            try:
+                entries.append((file.name, file.stat()))
+            except FileNotFoundError:  # pragma: no cover
+                pass
+        entries.sort(key=lambda x: x[1].st_mtime_ns)
+        self._files = OrderedDict((name, st.st_size) for name, st in entries)
+        self._nbytes = sum(self._files.values())
+        self._scan_time = time.monotonic()
+
+    def _track(self, name: str, size: int) -> None:
+        self._nbytes += size - self._files.pop(name, 0)
+        self._files[name] = size
+
+    def _untrack(self, name: str) -> None:
+        self._nbytes -= self._files.pop(name, 0)
+
+    def _evict(self, maxbytes: int) -> None:
+        if time.monotonic() - self._scan_time > self._rescan_period:
+            self._scan()
+        while self._files and self._nbytes > maxbytes:
+            name, size = self._files.popitem(last=False)
+            (self._path / name).unlink(missing_ok=True)
+            self._nbytes -= size
+            self._evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of the files in the directory known to this process."""
+        return self._nbytes
+
+    def _clear(self) -> None:
+        self._scan()
+        for name in self._files:
+            (self._path / name).unlink(missing_ok=True)
+        self._files.clear()
+        self._nbytes = 0
+
+    def _get(self, key: K) -> V | None:
+        file = self._file(key)
+        try:
+            with open(file, "rb") as fp:
+                size = os.fstat(fp.fileno()).st_size
+                value = pickle.load(fp)
+            os.utime(file)
+        except FileNotFoundError:
+            with self._lock:
+                self._untrack(file.name)
+            return None
+        except (EOFError, pickle.UnpicklingError):
+            file.unlink(missing_ok=True)
+            with self._lock:
+                self._untrack(file.name)
+            return None
+        with self._lock:
+            self._track(file.name, size)
+        return value
+
+    def _put(self, key: K, value: V) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._maxbytes is not None and len(data) > self._maxbytes:
+            return
+        file = self._file(key)
+        tmp_file = file.with_name(f".{file.name}.{uuid4().hex}")
+        with open(tmp_file, "wb") as fp:
+            fp.write(data)
+        # Atomic replacement, so that concurrent readers never see partial files.
+        os.replace(tmp_file, file)
+        self._track(file.name, len(data))
+        if self._maxbytes is not None and self._nbytes > self._maxbytes:
+            self._evict(self._maxbytes)
+
+
+def _load_cached_items(value: Any) -> None:
+    if isinstance(value, Sample):
+        for item in value.values():
+            if isinstance(item, CachedItem):
+                item()
+
+
+class _SpillFile:
+    def __init__(self, path: Path, owner: bool) -> None:
+        self._path = path
+        self._owner = owner
+        self._fp = open(path, "r+b" if owner else "rb")
+        self._size = self._fp.seek(0, os.SEEK_END)
+        self._mmap: mmap.mmap | None = None
+        self._finalizer = weakref.finalize(
+            self, _SpillFile._release, self._fp, path if owner else None
+        )
+
+    @staticmethod
+    def _release(fp: Any, path: Path | None) -> None:
+        fp.close()
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    @property
+    def owner(self) -> bool:
+        return self._owner
+
+    def append(self, data: bytes) -> int:
+        offset = self._size
+        self._fp.seek(offset)
+        self._fp.write(data)
+        self._fp.flush()
+        self._size += len(data)
+        return offset
+
+    def load(self, offset: int, size: int) -> Any:
+        if self._mmap is None or len(self._mmap) < offset + size:
+            self._mmap = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        with memoryview(self._mmap)[offset : offset + size] as view:
+            return pickle.loads(view)
+
+    def release(self) -> None:
+        self._mmap = None
+        self._finalizer()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self._path}
+
+    def __setstate__(self, data: dict[str, Any]) -> None:
+        self.__init__(data["path"], owner=False)  # type: ignore
+
+
+class TieredCache[K, V](Cache[K, V]):
+    """Two-tier cache that keeps the most recently used values in memory, within a
+    budget of bytes, and spills the others to a memory-mapped file on local disk. No
+    value is ever discarded: values spilled to disk are read back through the memory
+    map, and moved to the memory tier again, when they are accessed.
+
+    Values are pickled only once, the first time they are spilled, and spilled values
+    are never rewritten unless they are replaced with `put`, in which case the space of
+    the old value is not reclaimed until the cache is cleared. The `CachedItem`
+    instances of sample values are loaded when they are inserted, so that their size
+    can be estimated and their content is spilled as well.
+
+    When the cache is sent to another process, e.g. a grabber worker, the copy reads
+    the values already spilled by the original cache from the same file, and spills
+    new values to a file of its own. Files are deleted when the cache that created them
+    is garbage collected or cleared.
+    """
+
+    def __init__(self, maxbytes: int, path: Path | None = None) -> None:
+        """
+        Args:
+            maxbytes (int): Maximum estimated number of bytes of the values kept in
+                memory.
+            path (Path | None, optional): Directory where the spill files are created,
+                created if it does not exist. Defaults to None, in which case the
+                system temporary directory is used.
+
+        Raises:
+            ValueError: If `maxbytes` is negative.
+        """
+        super().__init__()
+        if maxbytes < 0:
+            raise ValueError(f"maxbytes must be non-negative, got {maxbytes}")
+        self._maxbytes = maxbytes
+        self._path = Path(tempfile.gettempdir()) if path is None else Path(path)
+        self._hot: OrderedDict[K, V] = OrderedDict()
+        self._sizes: dict[K, int] = {}
+        self._nbytes = 0
+        self._files: list[_SpillFile] = []
+        self._index: dict[K, tuple[int, int, int]] = {}
+
+    def _spill(self, key: K, value: V) -> None:
+        if not self._files or not self._files[-1].owner:
+            self._path.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(prefix="pipewine-", dir=self._path)
+            os.close(fd)
+            self._files.append(_SpillFile(Path(name), owner=True))
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        offset = self._files[-1].append(data)
+        self._index[key] = (len(self._files) - 1, offset, len(data))
+
+    def _insert(self, key: K, value: V) -> None:
+        _load_cached_items(value)
+        nbytes = estimate_nbytes(value)
+        if nbytes > self._maxbytes:
+            if key not in self._index:
+                self._spill(key, value)
+            return
+        while self._hot and self._nbytes + nbytes > self._maxbytes:
+            evicted, evicted_value = self._hot.popitem(last=False)
+            self._nbytes -= self._sizes.pop(evicted)
+            if evicted not in self._index:
+                self._spill(evicted, evicted_value)
+            self._evictions += 1
+        self._hot[key] = value
+        self._sizes[key] = nbytes
+        self._nbytes += nbytes
+
+    def _clear(self) -> None:
+        self._hot.clear()
+        self._sizes.clear()
+        self._nbytes = 0
+        self._index.clear()
+        for file in self._files:
+            file.release()
+        self._files.clear()
+
+    def _get(self, key: K) -> V | None:
+        if key in self._hot:
+            self._hot.move_to_end(key)
+            return self._hot[key]
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        file_idx, offset, size = entry
+        value = self._files[file_idx].load(offset, size)
+        self._insert(key, value)
+        return value
+
+    def _put(self, key: K, value: V) -> None:
+        self._index.pop(key, None)
+        if key in self._hot:
+            del self._hot[key]
+            self._nbytes -= self._sizes.pop(key)
+        self._insert(key, value)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated number of bytes of the values kept in memory."""
+        return self._nbytes
+
+
+class CompressedCache[K, V](Cache[K, V]):
+    """Cache that stores the values pickled and compressed with `zlib`, decompressing
+    them on every hit. Trades CPU time for memory: decoded arrays such as masks or
+    label maps often compress by more than an order of magnitude, so much larger
+    datasets fit in memory.
+
+    Compressed values are stored in another cache, which defines the eviction policy
+    and the size limits. A bounded cache with `maxbytes` limits the number of bytes of
+    the compressed values.
+
+    Values are serialized when they are inserted: the `CachedItem` instances of sample
+    values are loaded before compression, so that their content is stored as well.
+    Every hit returns a new copy of the value.
+    """
+
+    _lock_free_get = True
+
+    def __init__(
+        self, inner_type: type[Cache] = MemoCache, level: int = 1, **cache_params
+    ) -> None:
+        """
+        Args:
+            inner_type (type[Cache], optional): Type of the cache that stores the
+                compressed values. Defaults to `MemoCache`.
+            level (int, optional): Compression level, from 0 (no compression) to 9
+                (slowest, best compression). Defaults to 1, the fastest.
+            cache_params (Any): Additional parameters to pass to the constructor of the
+                cache that stores the compressed values.
+
+        Raises:
+            ValueError: If `level` is not between 0 and 9.
+        """
+        super().__init__()
+        if not 0 <= level <= 9:
+            raise ValueError(f"level must be between 0 and 9, got {level}")
+        self._level = level
+        self._cache: Cache[K, bytes] = inner_type(**cache_params)
+
+    def _compress(self, value: V) -> bytes:
+        _load_cached_items(value)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return zlib.compress(data, self._level)
+
+    def _clear(self) -> None:
+        self._cache.clear()
+
+    def _get(self, key: K) -> bytes | None:  # type: ignore
+        return self._cache.get(key)
+
+    def _put(self, key: K, value: bytes) -> None:  # type: ignore  # pragma: no cover
+        # Never called: `put` compresses the value outside of the lock.
+        self._cache.put(key, value)
+
+    def get(self, key: K) -> V | None:
+        data = super().get(key)
+        return None if data is None else pickle.loads(zlib.decompress(data))
+
+    def _lookup(self, key: K) -> V | None:
+        data = self._cache._lookup(key)
+        return None if data is None else pickle.loads(zlib.decompress(data))
+
+    def put(self, key: K, value: V, cost: float | None = None) -> None:
+        # Compress outside of the lock, so that threads do not wait for each other.
+        data = self._compress(value)
+        with self._lock:
+            self._cache.put(key, data, cost=cost)
+
+    @property
+    def uses_cost(self) -> bool:
+        """Whether the cache that stores the compressed values uses the cost."""
+        return self._cache.uses_cost
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes held by the cache that stores the compressed values."""
+        return self._cache.nbytes
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit and miss counters of the cache, together with the
+        evictions and the number of bytes of the cache that stores the compressed
+        values.
+        """
+        inner = self._cache.stats
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=inner.evictions,
+                nbytes=inner.nbytes,
+            )
+
+
+class ShardedCache[K, V](Cache[K, V]):
+    """Cache split into independent shards, each one a cache of the same type with its
+    own lock and its own eviction policy. Keys are assigned to shards by their hash.
+
+    Every cache serializes all the accesses with a single lock: when many threads share
+    the same cache, they wait for each other even if they access different keys.
+    Accesses to keys in different shards do not contend for the same lock, at the cost
+    of evicting entries from each shard independently, which approximates the policy of
+    a single cache with the same total capacity.
+    """
+
+    def __init__(
+        self, inner_type: type[Cache] = LRUCache, shards: int = 8, **cache_params
+    ) -> None:
+        """
+        Args:
+            inner_type (type[Cache], optional): Type of the cache of every shard.
+                Defaults to `LRUCache`.
+            shards (int, optional): Number of shards. Defaults to 8.
+            cache_params (Any): Additional parameters to pass to the constructor of the
+                cache of every shard. The `maxsize` and `maxbytes` limits, if present
+                and not None, are the total limits of the cache: they are divided by
+                the number of shards, rounding up.
+
+        Raises:
+            ValueError: If `shards` is not positive.
+        """
+        super().__init__()
+        if shards <= 0:
+            raise ValueError(f"shards must be positive, got {shards}")
+        for name in ["maxsize", "maxbytes"]:
+            if cache_params.get(name) is not None:
+                cache_params[name] = -(-cache_params[name] // shards)
+        self._shards: list[Cache[K, V]] = [
+            inner_type(**cache_params) for _ in range(shards)
+        ]
+
+    def _shard(self, key: K) -> Cache[K, V]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    def _get(self, key: K) -> V | None:
+        return self._shard(key).get(key)
+
+    def _put(self, key: K, value: V) -> None:  # pragma: no cover
+        # Never called: `put` forwards the cost to the shard.
+        self._shard(key).put(key, value)
+
+    def clear(self) -> None:
+        # Shards have their own locks, there is no need to hold the lock of this cache.
+        self._clear()
+
+    def get(self, key: K) -> V | None:
+        return self._get(key)
+
+    def _lookup(self, key: K) -> V | None:
+        return self._shard(key)._lookup(key)
+
+    def put(self, key: K, value: V, cost: float | None = None) -> None:
+        self._shard(key).put(key, value, cost=cost)
+
+    @property
+    def uses_cost(self) -> bool:
+        """Whether the caches of the shards use the cost."""
+        return self._shards[0].uses_cost
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes held by all the shards."""
+        return sum(shard.nbytes for shard in self._shards)
+
+    @contextmanager
+    def instrument_locks[L](self, wrapper: Callable[[Any], L]) -> Iterator[list[L]]:
+        """Temporarily replace the locks of all the shards with wrappers, see
+        `Cache.instrument_locks`.
+        """
+        with ExitStack() as stack:
+            locks = [
+                stack.enter_context(x.instrument_locks(wrapper)) for x in self._shards
+            ]
+            yield [x for shard_locks in locks for x in shard_locks]
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the statistics of the cache, summed over all the shards."""
+        stats = [shard.stats for shard in self._shards]
+        return CacheStats(
+            hits=sum(x.hits for x in stats),
+            misses=sum(x.misses for x in stats),
+            evictions=sum(x.evictions for x in stats),
+            nbytes=sum(x.nbytes for x in stats),
+        )
+
+
+class _SingleFlight[K, V]:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: dict[K, Future[V]] = {}
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self._lock:
+            pending = self._calls.get(key)
+            if pending is None:
+                future: Future[V] = Future()
+                self._calls[key] = future
+        if pending is not None:
+            return pending.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        future.set_result(result)
+        return result
+
+
+class _Validator:
+    # Fingerprints of the samples cached by a `CacheOp`. The fingerprint of a reader is
+    # taken at most once every `interval` seconds and reused by all the samples that
+    # share it, e.g. the root items of an underfolder, so that stat calls are batched
+    # per interval instead of being repeated for every sample.
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._lock = Lock()
+        self._samples: dict[int, tuple[tuple, float]] = {}
+        self._readers: weakref.WeakKeyDictionary[
+            Reader, tuple[Hashable | None, float]
+        ] = weakref.WeakKeyDictionary()
+
+    def _reader_fingerprint(self, reader: Reader, now: float) -> Any:
+        try:
+            entry = self._readers.get(reader)
+            if entry is None or now - entry[1] >= self._interval:
+                entry = self._readers[reader] = (reader.fingerprint(), now)
+        except TypeError:  # Readers that cannot be weakly referenced or hashed.
+            return reader.fingerprint()
+        return entry[0]
+
+    def _fingerprint(self, sample: Sample, now: float) -> tuple:
+        # Fingerprints of all stored items of a sample, computed in a single pass.
+        result = []
+        for key, item in sample.items():
+            if isinstance(item, CachedItem):
+                item = item.source_recursive
+            if isinstance(item, StoredItem):
+                fingerprint = self._reader_fingerprint(item.reader, now)
+                result.append((key, fingerprint))
+        return tuple(result)
+
+    def track(self, idx: int, sample: Sample) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._samples[idx] = (self._fingerprint(sample, now), now)
+
+    def is_stale(self, idx: int, sample: Sample) -> bool:
+        entry = self._samples.get(idx)
+        if entry is not None and time.monotonic() - entry[1] < self._interval:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            entry = self._samples.get(idx)
+            if entry is None:
+                # Cached by another process: validate from now on.
+                self._samples[idx] = (self._fingerprint(sample, now), now)
+                return False
+            fingerprint, checked = entry
+            if now - checked < self._interval:
+                return False
+            if self._fingerprint(sample, now) != fingerprint:
+                return True
+            self._samples[idx] = (fingerprint, now)
+            return False
+
+
 class CacheOp(DatasetOperator[Dataset, Dataset]):
     """Operator that caches the results of another operator to avoid recomputation.
     See the "Cache" section in the documentation for more information.
+
+    When many threads request the same missing sample at the same time, it is computed
+    only once: the first thread computes it, while the others wait for it.
+
+    When validation is enabled, a cached sample is recomputed if the data of any of its
+    stored items changed since it was cached, e.g. because a file was modified on disk.
+    The readers of all the stored items of a sample are checked together, at most once
+    every `validate_interval` seconds for the same sample. The fingerprint of a reader
+    shared by many samples is taken once per interval for all of them. Checks are only
+    batched with a positive `validate_interval`: with the default of 0, every access to
+    a cached sample takes the fingerprints of all its readers.
     """
 
-    def __init__(self, cache_type: type[Cache], **cache_params) -> None:
+    def __init__(
+        self,
+        cache_type: type[Cache],
+        validate: bool = False,
+        validate_interval: float = 0.0,
+        **cache_params,
+    ) -> None:
         """
         Args:
             cache_type (type[Cache]): Type of cache to use, must be a subclass of
                 `Cache`.
-            cache_params (Any): Additional parameters to pass to the cache constructor.
+            validate (bool, optional): Whether to recompute cached samples whose stored
+                items changed. Defaults to False.
+            validate_interval (float, optional): Minimum number of seconds between two
+                validations of the same sample, only used when `validate` is True.
+                Must be positive to batch the checks of readers shared by many samples.
+                Defaults to 0.0, in which case samples are validated on every access.
+            cache_params (Any): Additional parameters to pass to the cache constructor,
+                including an `inner_type` for caches that wrap another one, such as
+                `ShardedCache` and `CompressedCache`.
+
+        Raises:
+            ValueError: If `validate_interval` is negative.
         """
         super().__init__()
+        if validate_interval < 0:
+            raise ValueError(
+                f"Validate interval must be non-negative, got {validate_interval}"
+            )
         self._cache_mapper: CacheMapper = CacheMapper()
         self._cache_type = cache_type
         self._cache_params = cache_params
+        self._validate = validate
+        self._validate_interval = validate_interval
+        self._cache_ref: weakref.ref[Cache] | None = None
+        self._cache_id: str | None = None
+        self._stats: CacheStats | None = None
+        self._flights: dict[str, _SingleFlight[int, Sample]] = {}
+        self._validators: dict[str, _Validator] = {}
+        self._lock = Lock()
+
+    @property
+    def cache(self) -> Cache | None:
+        """The cache created by the last call of this operator, or None if the operator
+        was never called or the cache was already garbage collected. Useful to inspect
+        its `stats`.
+        """
+        return None if self._cache_ref is None else self._cache_ref()
+
+    @property
+    def stats(self) -> CacheStats | None:
+        """Statistics of the cache created by the last call of this operator. Contrary
+        to `cache`, they are still available after the cache is garbage collected, as
+        a snapshot is taken when the output dataset is finalized. None if the operator
+        was never called, or if the cache was sent to other processes (e.g. the
+        grabber workers), whose accesses are not counted.
+        """
+        cache = self.cache
+        if cache is None:
+            return self._stats
+        return cache.stats if cache.is_local else None
 
     def _get_sample[T: Sample](self, dataset: Dataset[T], cache_id: str, idx: int) -> T:
         cache: Cache[int, T] = InheritedData.data[cache_id]
         result = cache.get(idx)
+        if result is not None and self._validate:
+            if self._validator(cache_id).is_stale(idx, result):
+                result = None
         if result is None:
-            result = self._cache_mapper(idx, dataset[idx])
-            cache.put(idx, result)
+            fn = partial(self._compute_sample, dataset, cache_id, cache, idx)
+            result = self._flight(cache_id).do(idx, fn)  # type: ignore
+        return result
+
+    def _flight(self, cache_id: str) -> _SingleFlight[int, Sample]:
+        with self._lock:
+            flight = self._flights.get(cache_id)
+            if flight is None:
+                flight = self._flights[cache_id] = _SingleFlight()
+            return flight
+
+    def _validator(self, cache_id: str) -> _Validator:
+        with self._lock:
+            validator = self._validators.get(cache_id)
+            if validator is None:
+                validator = _Validator(self._validate_interval)
+                self._validators[cache_id] = validator
+            return validator
+
+    def _compute_sample[T: Sample](
+        self, dataset: Dataset[T], cache_id: str, cache: Cache[int, T], idx: int
+    ) -> T:
+        # Another thread may have computed the sample after the miss, before this
+        # flight started. The miss was already counted, look it up without counting.
+        result = cache._lookup(idx)
+        if result is not None and self._validate:
+            if self._validator(cache_id).is_stale(idx, result):
+                result = None
+        if result is not None:
+            return result
+        start = time.perf_counter()
+        sample = dataset[idx]
+        if self._validate:
+            self._validator(cache_id).track(idx, sample)
+        result = self._cache_mapper(idx, sample)
+        if cache.uses_cost:
+            # Items are loaded lazily: load them now to include the decoding time in
+            # the cost, and their size in the estimate of the cache.
+            _load_cached_items(result)
+        cache.put(idx, result, cost=time.perf_counter() - start)
         return result
 
     def _finalize_cache(self, id_: str) -> None:
+        with self._lock:
+            self._flights.pop(id_, None)
+            self._validators.pop(id_, None)
         if id_ in InheritedData.data:  # pragma: no branch
-            del InheritedData.data[id_]
+            cache: Cache = InheritedData.data.pop(id_)
+            if id_ == self._cache_id:
+                self._stats = cache.stats if cache.is_local else None
 
     def __call__[T: Sample](self, x: Dataset[T]) -> LazyDataset[T]:
         cache = self._cache_type(**self._cache_params)
-        id_ = uuid4().hex
+        self._cache_ref = weakref.ref(cache)
+        self._stats = None
+        id_ = self._cache_id = uuid4().hex
         InheritedData.data[id_] = cache
         dataset = LazyDataset(len(x), partial(self._get_sample, x, id_))
         weakref.finalize(dataset, self._finalize_cache, id_=id_)
         return dataset
 
+    def __getstate__(self) -> dict[str, Any]:
+        data = {**self.__dict__}
+        data["_cache_ref"] = None
+        data["_cache_id"] = None
+        data["_stats"] = None
+        data["_flights"] = {}
+        data["_validators"] = {}
+        del data["_lock"]
+        return data
+
+    def __setstate__(self, data: dict[str, Any]) -> None:
+        self.__dict__.update(data)
+        self._lock = Lock()
+
+
+class _Prefetcher:
+    def __init__(self, depth: int, workers: int, maxbytes: int | None) -> None:
+        self._depth = depth
+        self._workers = workers
+        self._maxbytes = maxbytes
+        self._cache_mapper: CacheMapper = CacheMapper()
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._lock = RLock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._futures: dict[int, Future[Sample]] = {}
+        self._sizes: dict[int, int] = {}
+        self._nbytes = 0
+        self._estimate: int | None = None
+        self._last: int | None = None
+        self._stride: int | None = None
+
+    def _load(self, dataset: Dataset, idx: int) -> Sample:
+        sample = self._cache_mapper(idx, dataset[idx])
+        for key in sample.keys():
+            sample[key]()
+        return sample
+
+    def _on_done(self, idx: int, future: Future[Sample]) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._estimate = estimate_nbytes(future.result())
+            if self._futures.get(idx) is future:
+                self._sizes[idx] = self._estimate
+                self._nbytes += self._sizes[idx]
+
+    def _reserved(self, maxbytes: int) -> int:
+        # Bytes of the prefetched samples, plus those reserved for the pending ones,
+        # estimated as the size of the last prefetched sample. While no size is known,
+        # a single pending sample reserves the whole budget.
+        pending = len(self._futures) - len(self._sizes)
+        if pending == 0:
+            return self._nbytes
+        if self._estimate is None:
+            return maxbytes
+        return self._nbytes + pending * self._estimate
+
+    def _discard(self, idx: int) -> None:
+        self._futures.pop(idx).cancel()
+        self._nbytes -= self._sizes.pop(idx, 0)
+
+    def _schedule(self, dataset: Dataset, idx: int) -> None:
+        last, self._last = self._last, idx
+        if last is None or idx == last:
+            return
+        stride = idx - last
+        if stride != self._stride:
+            # The access pattern changed: prefetched samples will not be used.
+            self._stride = stride
+            for i in list(self._futures):
+                self._discard(i)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._workers)
+        for k in range(1, self._depth + 1):
+            next_idx = idx + k * stride
+            if not 0 <= next_idx < len(dataset):
+                break
+            if next_idx in self._futures:
+                continue
+            maxbytes = self._maxbytes
+            if maxbytes is not None and self._reserved(maxbytes) >= maxbytes:
+                break
+            future = self._executor.submit(self._load, dataset, next_idx)
+            self._futures[next_idx] = future
+            future.add_done_callback(partial(self._on_done, next_idx))
+
+    def get(self, dataset: Dataset, idx: int) -> Sample:
+        with self._lock:
+            future = self._futures.pop(idx, None)
+            self._nbytes -= self._sizes.pop(idx, 0)
+            self._schedule(dataset, idx)
+        if future is None:
+            return self._cache_mapper(idx, dataset[idx])
+        return future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for i in list(self._futures):
+                self._discard(i)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "_depth": self._depth,
+            "_workers": self._workers,
+            "_maxbytes": self._maxbytes,
+            "_cache_mapper": self._cache_mapper,
+        }
+
+    def __setstate__(self, data: dict[str, Any]) -> None:
+        self.__dict__.update(data)
+        self._init_state()
+
+
+class PrefetchOp(DatasetOperator[Dataset, Dataset]):
+    """Operator that detects sequential and strided access to a dataset and computes
+    the next samples in background threads, before they are requested.
+
+    When the same non-zero stride is observed between three consecutive accesses, the
+    next `depth` samples along that stride are submitted to a pool of threads, which
+    compute them and load all their items. Prefetched samples are discarded as soon as
+    the access pattern changes. Every process keeps its own prefetching state, so this
+    operator also works when the dataset is iterated with a `Grabber`.
+
+    Threads share the GIL, so prefetching is only effective when computing a sample
+    spends most of its time in code that releases it, such as reading files or
+    decoding images.
+    """
+
+    def __init__(
+        self, depth: int = 8, workers: int = 2, maxbytes: int | None = None
+    ) -> None:
+        """
+        Args:
+            depth (int, optional): Maximum number of samples to prefetch ahead of the
+                last accessed one. Defaults to 8.
+            workers (int, optional): Number of background threads. Defaults to 2.
+            maxbytes (int | None, optional): Maximum estimated number of bytes of the
+                prefetched samples that were not accessed yet, or None for no limit.
+                Samples that are still being prefetched count as large as the last
+                prefetched sample. No new sample is prefetched while the limit is
+                exceeded. Defaults to None.
+
+        Raises:
+            ValueError: If `depth` or `workers` are not positive, or if `maxbytes` is
+                negative.
+        """
+        super().__init__()
+        if depth <= 0:
+            raise ValueError(f"depth must be positive, got {depth}")
+        if workers <= 0:
+            raise ValueError(f"workers must be positive, got {workers}")
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError(f"maxbytes must be non-negative, got {maxbytes}")
+        self._depth = depth
+        self._workers = workers
+        self._maxbytes = maxbytes
+
+    def _get_sample[T: Sample](self, dataset: Dataset[T], id_: str, idx: int) -> T:
+        prefetcher: _Prefetcher = InheritedData.data[id_]
+        return prefetcher.get(dataset, idx)  # type: ignore
+
+    def _finalize_prefetcher(self, id_: str) -> None:
+        prefetcher = InheritedData.data.pop(id_, None)
+        if prefetcher is not None:  # pragma: no branch
+            prefetcher.shutdown()
+
+    def __call__[T: Sample](self, x: Dataset[T]) -> LazyDataset[T]:
+        id_ = uuid4().hex
+        InheritedData.data[id_] = _Prefetcher(
+            self._depth, self._workers, self._maxbytes
+        )
+        dataset = LazyDataset(len(x), partial(self._get_sample, x, id_))
+        weakref.finalize(dataset, self._finalize_prefetcher, id_=id_)
+        return dataset
+
 
 class ItemCacheOp(DatasetOperator[Dataset, Dataset]):
     """Operator that caches the items of the samples in a dataset to avoid
     recomputation. Essentially the same as `MapOp(CacheMapper())`.
     """
 
-    def __init__(self) -> None:
-        """Initialize the operator with a `MapOp` that uses a `CacheMapper`."""
+    def __init__(self, validate: bool = False, validate_interval: float = 0.0) -> None:
+        """Initialize the operator with a `MapOp` that uses a `CacheMapper`.
+
+        Args:
+            validate (bool, optional): Whether the cached items reload their value when
+                the data of their original source changes. Defaults to False.
+            validate_interval (float, optional): Minimum number of seconds between two
+                validations of the same item, only used when `validate` is True.
+                Defaults to 0.0, in which case items are validated on every access.
+
+        Raises:
+            ValueError: If `validate_interval` is negative.
+        """
         super().__init__()
-        self._map_op = MapOp(CacheMapper())
+        self._map_op = MapOp(
+            CacheMapper(validate=validate, validate_interval=validate_interval)
+        )
 
     def __call__[T: Sample](self, x: Dataset[T]) -> Dataset[T]:
         return self._map_op(x)
@@ -403,19 +2377,40 @@ class MemorizeEverythingOp(DatasetOperator[Dataset, Dataset]):
     This operator will block until all samples are computed and loaded in memory, so it
     may not be suitable for large datasets, or when memory is a concern.
 
-    In these cases, consider using a *Checkpoint*, see the "Cache" section in the
-    documentation for more information.
+    In these cases, consider storing the samples compressed with `compression`,
+    limiting the memory used with `maxbytes` to spill the rest of the samples to disk,
+    or using a *Checkpoint*, see the "Cache" section in the documentation for more
+    information.
     """
 
-    def __init__(self, grabber: Grabber | None = None) -> None:
+    def __init__(
+        self,
+        grabber: Grabber | None = None,
+        compression: int | None = None,
+        maxbytes: int | None = None,
+        spill_path: Path | None = None,
+    ) -> None:
         """
         Args:
             grabber (Grabber | None, optional): Grabber to use for loading the samples
                 from the dataset. Defaults to None, in which case a new `Grabber` is
                 created.
+            compression (int | None, optional): If not None, samples are loaded and
+                stored in a `CompressedCache` with this compression level, from 0 to 9.
+                Defaults to None, in which case samples are stored as they are.
+            maxbytes (int | None, optional): If not None, samples are loaded and
+                stored in a `TieredCache` that keeps at most this number of bytes in
+                memory, spilling the least recently used samples to disk. Defaults to
+                None, in which case all samples are kept in memory.
+            spill_path (Path | None, optional): Directory of the spill files, only used
+                when `maxbytes` is set. Defaults to None, in which case the system
+                temporary directory is used.
         """
         super().__init__()
         self._grabber = grabber or Grabber()
+        self._compression = compression
+        self._maxbytes = maxbytes
+        self._spill_path = spill_path
         self._cache_mapper: CacheMapper = CacheMapper()
 
     def _get_sample(self, cache_id: str, idx: int) -> Sample:
@@ -429,7 +2424,16 @@ class MemorizeEverythingOp(DatasetOperator[Dataset, Dataset]):
             del InheritedData.data[id_]
 
     def __call__(self, x: Dataset) -> Dataset:
-        cache = MemoCache()
+        cache_type: type[Cache] = MemoCache
+        cache_params: dict[str, Any] = {}
+        if self._maxbytes is not None:
+            cache_type = TieredCache
+            cache_params = {"maxbytes": self._maxbytes, "path": self._spill_path}
+        cache: Cache[int, Sample]
+        if self._compression is None:
+            cache = cache_type(**cache_params)
+        else:
+            cache = CompressedCache(cache_type, level=self._compression, **cache_params)
         id_ = uuid4().hex
         InheritedData.data[id_] = cache
         for i, sample in self.loop(x, self._grabber, "Caching"):
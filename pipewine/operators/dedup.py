@@ -0,0 +1,254 @@
+"""Operators for finding and removing duplicate samples."""
+
+from collections import defaultdict
+from collections.abc import Sequence
+from functools import partial
+from typing import Literal
+
+import numpy as np
+
+from pipewine.dataset import Dataset, LazyDataset, ListDataset
+from pipewine.grabber import Grabber
+from pipewine.item import Item, MemoryItem
+from pipewine.mappers import HashMapper, PerceptualHashMapper
+from pipewine.operators.base import DatasetOperator
+from pipewine.operators.functional import MapOp
+from pipewine.parsers import YAMLParser
+from pipewine.sample import Sample, TypedSample, TypelessSample
+
+_MAX_BUCKET = 256
+_BLOCK_ELEMENTS = 1 << 22
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+class DuplicatesSample(TypedSample):
+    """Sample type to represent a group of duplicate samples."""
+
+    hash: Item[str]
+    """The hash shared by all the samples of the group."""
+    indices: Item[list]
+    """The indices of the samples of the group in the input dataset, sorted."""
+
+
+def _make_groups_dataset(
+    groups: dict[str, list[int]],
+) -> ListDataset[DuplicatesSample]:
+    samples = [
+        DuplicatesSample(
+            hash=MemoryItem(hash_, YAMLParser(type_=str)),
+            indices=MemoryItem(index, YAMLParser(type_=list)),
+        )
+        for hash_, index in groups.items()
+        if len(index) > 1
+    ]
+    return ListDataset(samples)
+
+
+def _hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Hamming distance between broadcastable arrays of packed hash bytes.
+    return _POPCOUNT[a ^ b].sum(axis=-1, dtype=np.int64)
+
+
+def _hash_batch(
+    x: Dataset, mapper: PerceptualHashMapper, key: str, batch_size: int, idx: int
+) -> TypelessSample:
+    samples = x[idx * batch_size : (idx + 1) * batch_size]
+    hashes = mapper.hash_batch([sample[key]() for sample in samples])
+    return TypelessSample(phash=MemoryItem(hashes, YAMLParser(type_=list)))
+
+
+class DedupOp[T: Sample](
+    DatasetOperator[Dataset[T], tuple[Dataset[T], Dataset[DuplicatesSample]]]
+):
+    """Operator that removes exact duplicates from a dataset, keeping only the first
+    occurrence of every sample.
+
+    Samples are compared by hashing the raw bytes of their stored items as they are read
+    from their `Reader`, without decoding them. Items that are not backed by a reader
+    (e.g. results of previous computations) are hashed by their value. Hashes are
+    computed inside the grabber workers, so only the digests are sent back to the main
+    process.
+
+    Returns a tuple with the deduplicated dataset and a dataset containing one
+    `DuplicatesSample` for every group of two or more identical samples.
+    """
+
+    def __init__(
+        self,
+        keys: str | Sequence[str] | None = None,
+        algorithm: str = "sha256",
+        grabber: Grabber | None = None,
+    ) -> None:
+        """
+        Args:
+            keys (str | Sequence[str] | None, optional): Keys of the items to compare.
+                Defaults to None, in which case all the items are compared.
+            algorithm (str, optional): Hash algorithm to use, see `HashMapper` for the
+                available options. Use a fast non-cryptographic algorithm such as
+                "xxh3_128" (requires the `xxhash` package) to speed up the hashing of
+                large datasets. Defaults to "sha256".
+            grabber (Grabber, optional): Grabber to use for grabbing samples. Defaults
+                to None.
+        """
+        super().__init__()
+        self._hash_op = MapOp(HashMapper(algorithm=algorithm, keys=keys, raw=True))
+        self._grabber = grabber or Grabber()
+
+    def __call__(self, x: Dataset[T]) -> tuple[Dataset[T], Dataset[DuplicatesSample]]:
+        groups: dict[str, list[int]] = defaultdict(list)
+        hashes = self._hash_op(x)
+        for i, sample in self.loop(hashes, self._grabber, name="Hashing"):
+            groups[sample.hash()].append(i)
+        for group in groups.values():
+            group.sort()
+
+        index = sorted(group[0] for group in groups.values())
+        unique = LazyDataset(len(index), x.get_sample, index_fn=index.__getitem__)
+        return unique, _make_groups_dataset(groups)
+
+
+class NearDuplicatesOp[T: Sample](
+    DatasetOperator[Dataset[T], tuple[Dataset[T], Dataset[DuplicatesSample]]]
+):
+    """Operator that removes near-duplicate images from a dataset, keeping only the
+    first occurrence of every group of similar samples.
+
+    Images are hashed in batches with `PerceptualHashMapper.hash_batch` inside the
+    grabber workers. Two samples are considered near-duplicates if the Hamming distance
+    between their hashes is at most `threshold` bits, and groups are formed by
+    transitively connecting all near-duplicate pairs.
+
+    Samples with identical hashes are grouped directly, then, to avoid comparing all
+    pairs of distinct hashes, the hash bits are split into `threshold + 1` bands and
+    hashes are bucketed by the value of each band: by the pigeonhole principle, two
+    hashes within the threshold must share at least one band exactly, so only hashes
+    falling in the same bucket need to be compared. Buckets with more than 256 hashes,
+    which are common when the threshold is high and the bands are narrow, are compared
+    exhaustively with a vectorized check in blocks of bounded memory instead of
+    enumerating their pairs.
+
+    Returns a tuple with the deduplicated dataset and a dataset containing one
+    `DuplicatesSample` for every group of two or more similar samples, whose `hash` is
+    the perceptual hash of the first sample of the group.
+    """
+
+    def __init__(
+        self,
+        key: str = "image",
+        threshold: int = 4,
+        method: Literal["average", "difference"] = "average",
+        size: int = 8,
+        batch_size: int = 64,
+        grabber: Grabber | None = None,
+    ) -> None:
+        """
+        Args:
+            key (str, optional): Key of the image item to compare. Defaults to "image".
+            threshold (int, optional): Maximum Hamming distance between the hashes of
+                two near-duplicate samples. Higher values find more duplicates but
+                create fewer, larger buckets. Defaults to 4.
+            method (Literal["average", "difference"], optional): Perceptual hashing
+                method, see `PerceptualHashMapper`. Defaults to "average".
+            size (int, optional): Side of the downscaled image used for hashing, see
+                `PerceptualHashMapper`. Defaults to 8.
+            batch_size (int, optional): Number of images hashed together by a grabber
+                worker. Defaults to 64.
+            grabber (Grabber, optional): Grabber to use for grabbing samples. Defaults
+                to None.
+
+        Raises:
+            ValueError: If the threshold is negative or not lower than the number of
+                bits of the hash, or if the batch size is not positive.
+        """
+        super().__init__()
+        if not 0 <= threshold < size**2:
+            raise ValueError(
+                f"Threshold must be between 0 and {size**2 - 1}, got {threshold}"
+            )
+        if batch_size <= 0:
+            raise ValueError(f"Batch size must be positive, got {batch_size}")
+        self._mapper = PerceptualHashMapper(key=key, method=method, size=size)
+        self._key = key
+        self._threshold = threshold
+        self._nbits = size**2
+        self._batch_size = batch_size
+        self._grabber = grabber or Grabber()
+
+    def _exhaustive_pairs(self, packed: np.ndarray, members: np.ndarray) -> np.ndarray:
+        rows = max(1, _BLOCK_ELEMENTS // (len(members) * packed.shape[1]))
+        others = packed[members]
+        chunks = [np.empty((0, 2), dtype=np.int64)]
+        for start in range(0, len(members), rows):
+            block = members[start : start + rows]
+            dists = _hamming(packed[block][:, None], others[None])
+            i, j = np.nonzero(dists <= self._threshold)
+            a, b = block[i], members[j]
+            chunks.append(np.stack([a, b], axis=1)[a < b])
+        return np.concatenate(chunks)
+
+    def _close_pairs(self, packed: np.ndarray) -> np.ndarray:
+        bits = np.unpackbits(packed, axis=1)[:, : self._nbits]
+        small: list[np.ndarray] = []
+        large: list[np.ndarray] = []
+        for band in np.array_split(bits, self._threshold + 1, axis=1):
+            _, inverse = np.unique(band, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+            for bucket in np.split(order, bounds):
+                if len(bucket) > _MAX_BUCKET:
+                    large.append(bucket)
+                elif len(bucket) > 1:
+                    a, b = np.triu_indices(len(bucket), 1)
+                    small.append(np.stack([bucket[a], bucket[b]], axis=1))
+
+        # Comparing all hashes at once is cheaper than comparing many large buckets.
+        if large and sum(len(b) ** 2 for b in large) >= len(packed) ** 2:
+            return self._exhaustive_pairs(packed, np.arange(len(packed)))
+
+        chunks = [self._exhaustive_pairs(packed, bucket) for bucket in large]
+        if small:
+            pairs = np.unique(np.concatenate(small), axis=0)
+            dists = _hamming(packed[pairs[:, 0]], packed[pairs[:, 1]])
+            chunks.append(pairs[dists <= self._threshold])
+        return np.concatenate([np.empty((0, 2), dtype=np.int64), *chunks])
+
+    def __call__(self, x: Dataset[T]) -> tuple[Dataset[T], Dataset[DuplicatesSample]]:
+        size = -(-len(x) // self._batch_size)
+        get_batch = partial(_hash_batch, x, self._mapper, self._key, self._batch_size)
+        hashes: list[str] = [""] * len(x)
+        batches = LazyDataset(size, get_batch)
+        for i, sample in self.loop(batches, self._grabber, name="Hashing"):
+            start = i * self._batch_size
+            hashes[start : start + self._batch_size] = sample["phash"]()
+
+        buffer = b"".join(bytes.fromhex(h) for h in hashes)
+        nbytes = -(-self._nbits // 8)
+        packed = np.frombuffer(buffer, dtype=np.uint8).reshape(len(x), nbytes)
+        distinct, first, inverse = np.unique(
+            packed, axis=0, return_index=True, return_inverse=True
+        )
+        pairs = first[self._close_pairs(distinct)]
+
+        # Every sample starts attached to the first sample with the same hash.
+        parent = first[inverse.reshape(-1)].tolist()
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for a, b in pairs.tolist():
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+        members: dict[int, list[int]] = defaultdict(list)
+        for i in range(len(x)):
+            members[find(i)].append(i)
+        groups = {hashes[root]: group for root, group in members.items()}
+
+        index = sorted(members)
+        unique = LazyDataset(len(index), x.get_sample, index_fn=index.__getitem__)
+        return unique, _make_groups_dataset(groups)
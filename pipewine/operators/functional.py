@@ -1,16 +1,23 @@
 """Operators that change behavior based on user-defined functions."""
 
+import hashlib
+import pickle
 from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from functools import partial
-from typing import Any, Protocol, TypeVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
 
-from pipewine.dataset import Dataset, LazyDataset
+from pipewine._fingerprint import item_fingerprint, item_key, stable_digest
+from pipewine.dataset import Dataset, IndexedDataset, LazyDataset
 from pipewine.grabber import Grabber
-from pipewine.mappers import Mapper
+from pipewine.mappers import HashMapper, Mapper
 from pipewine.operators.base import DatasetOperator
 from pipewine.sample import Sample
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pipewine.operators.cache import Cache
+
 
 class FilterOp[T: Sample](DatasetOperator[Dataset[T], Dataset[T]]):
     """Operator that keeps only or removes samples from a dataset based on a
@@ -128,21 +135,150 @@ class SortOp[T: Sample](DatasetOperator[Dataset[T], Dataset[T]]):
         return LazyDataset(len(x), x.get_sample, index_fn=index.__getitem__)
 
 
+class KeyIndexOp[T: Sample](DatasetOperator[Dataset[T], IndexedDataset[T]]):
+    """Operator that builds an index from the values of a user-defined key function to
+    the positions of the samples in a dataset, returning an `IndexedDataset` that
+    supports fast point lookups and range queries.
+
+    The index can optionally be persisted to a file, e.g. next to the underfolder the
+    dataset was read from (see `UnderfolderSource.index_path`), so that it is built
+    only once and loaded on subsequent runs. The index is saved with a fingerprint of
+    the key function (including its code) and of the files of all the stored items,
+    i.e. their modification time and size, which are checked without reading the
+    files: a persisted index is rebuilt if any of them changes. Datasets with items
+    that are not stored in files cannot be checked, so their index is always rebuilt.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[int, T], Hashable],
+        path: Path | None = None,
+        grabber: Grabber | None = None,
+    ) -> None:
+        """
+        Args:
+            fn (Callable[[int, T], Hashable]): Function that takes the index and the
+                sample and returns the (hashable) key to index the sample by.
+            path (Path | None, optional): Path to the file where the index is persisted.
+                If the file exists and is up to date, the index is loaded from it
+                instead of being computed. Defaults to None, in which case the index is
+                never persisted.
+            grabber (Grabber, optional): Grabber to use for grabbing samples. Defaults
+                to None.
+        """
+        super().__init__()
+        self._fn = fn
+        self._fn_digest = stable_digest(fn)
+        self._path = path
+        self._grabber = grabber or Grabber()
+
+    def _fingerprint(self, samples: list[Hashable | None]) -> str | None:
+        if any(x is None for x in samples):
+            return None
+        return hashlib.sha256(repr((self._fn_digest, samples)).encode()).hexdigest()
+
+    def _sample_fingerprint(self, sample: T) -> Hashable | None:
+        result = []
+        for key, item in sorted(sample.items()):
+            fingerprint = item_fingerprint(item)
+            if fingerprint is None:
+                return None
+            result.append((key, fingerprint))
+        return tuple(result)
+
+    def _load_index(self, x: Dataset[T]) -> dict[Hashable, list[int]] | None:
+        if self._path is None or not self._path.is_file():
+            return None
+        with open(self._path, "rb") as fp:
+            data = pickle.load(fp)
+        if data["size"] != len(x) or data.get("fingerprint") is None:
+            return None
+        samples: list[Hashable | None] = [None] * len(x)
+        for i, sample in self.loop(x, self._grabber, name="Checking index"):
+            samples[i] = self._sample_fingerprint(sample)
+        if self._fingerprint(samples) != data["fingerprint"]:
+            return None
+        return data["index"]
+
+    def _save_index(
+        self, size: int, index: dict[Hashable, list[int]], fingerprint: str | None
+    ) -> None:
+        if self._path is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, "wb") as fp:
+            data = {"size": size, "fingerprint": fingerprint, "index": index}
+            pickle.dump(data, fp)
+
+    def __call__(self, x: Dataset[T]) -> IndexedDataset[T]:
+        index = self._load_index(x)
+        if index is None:
+            index = defaultdict(list)
+            samples: list[Hashable | None] = [None] * len(x)
+            for i, sample in self.loop(x, self._grabber, name="Computing index"):
+                index[self._fn(i, sample)].append(i)
+                samples[i] = self._sample_fingerprint(sample)
+            index = dict(index)
+            self._save_index(len(x), index, self._fingerprint(samples))
+        return IndexedDataset(x, index)
+
+
 class MapOp[T_IN: Sample, T_OUT: Sample](
     DatasetOperator[Dataset[T_IN], Dataset[T_OUT]]
 ):
-    """Operator that applies a `Mapper` to each sample in a dataset."""
+    """Operator that applies a `Mapper` to each sample in a dataset.
+
+    Optionally, the results of the mapper can be stored in a `Cache` (e.g. a
+    `DiskCache` to reuse them across different runs), keyed by a fingerprint of the
+    mapper and of the input sample. The mapper is fingerprinted with its state and the
+    code of its class, so two mappers of the same type with the same parameters share
+    their entries, while editing the mapper invalidates them. Stored items of the input
+    sample are fingerprinted by their reader, parser and reader fingerprint (e.g. the
+    path, modification time and size of the file) without reading them. Items that
+    are not stored, or whose reader cannot detect changes, are fingerprinted by hashing
+    their raw bytes or their pickled values. The index of the sample is not part of the
+    fingerprint: only use a cache with mappers whose output depends exclusively on the
+    input sample.
+    """
 
-    def __init__(self, mapper: Mapper[T_IN, T_OUT]) -> None:
+    def __init__(
+        self,
+        mapper: Mapper[T_IN, T_OUT],
+        cache: "Cache[str, T_OUT] | None" = None,
+    ) -> None:
         """
         Args:
             mapper (Mapper[T_IN, T_OUT]): Mapper to apply to each sample.
+            cache (Cache[str, T_OUT] | None, optional): Cache where the results of the
+                mapper are stored, keyed by a fingerprint of the mapper and of the
+                input sample. Defaults to None, in which case nothing is cached.
         """
         super().__init__()
         self._mapper = mapper
+        self._cache = cache
+        self._fingerprint = ""
+        if cache is not None:
+            self._fingerprint = stable_digest(mapper)
+
+    def _sample_key(self, idx: int, sample: T_IN) -> str:
+        keys: dict[str, str | None] = {k: item_key(v) for k, v in sample.items()}
+        unknown = sorted(k for k, v in keys.items() if v is None)
+        if unknown:
+            hashed = HashMapper(keys=unknown, raw=True)(idx, sample).hash()
+            keys.update(dict.fromkeys(unknown, hashed))
+        data = repr((self._fingerprint, sorted(keys.items())))
+        return hashlib.sha256(data.encode()).hexdigest()
 
     def _get_sample(self, x: Dataset[T_IN], idx: int) -> T_OUT:
-        return self._mapper(idx, x[idx])
+        if self._cache is None:
+            return self._mapper(idx, x[idx])
+        sample = x[idx]
+        key = self._sample_key(idx, sample)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._mapper(idx, sample)
+            self._cache.put(key, result)
+        return result
 
     def __call__(self, x: Dataset[T_IN]) -> Dataset[T_OUT]:
         return LazyDataset(len(x), partial(self._get_sample, x))
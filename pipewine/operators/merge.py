@@ -1,10 +1,13 @@
 """Operators for merging datasets."""
 
 from bisect import bisect
-from collections.abc import Sequence
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Sequence
 from functools import partial
+from typing import Literal
 
 from pipewine.dataset import Dataset, LazyDataset
+from pipewine.grabber import Grabber
 from pipewine.item import Item
 from pipewine.operators.base import DatasetOperator
 from pipewine.sample import Sample, TypelessSample
@@ -53,3 +56,84 @@ class ZipOp[T: Sample](DatasetOperator[Sequence[Dataset], Dataset[T]]):
         len0 = len(x[0])
         assert all(len(dataset) == len0 for dataset in x)
         return LazyDataset(len(x[0]), partial(self._get_sample, x))
+
+
+class JoinOp[T: Sample](DatasetOperator[tuple[Dataset, Dataset], Dataset[T]]):
+    """Operator that joins two datasets by matching the values of a user-defined key
+    function, similar to a SQL join, merging the items of every pair of matching
+    samples.
+
+    A hash index is built over the right dataset and then probed with every sample of
+    the left dataset. Samples of the output dataset are merged lazily, only when they
+    are requested. Unlike `ZipOp`, the input datasets can have different lengths and
+    arbitrary order.
+
+    Output samples preserve the order of the left dataset. When multiple samples of
+    the right dataset match the same key, the left sample is repeated once for every
+    match, in the order in which they appear in the right dataset. In case of
+    conflicting item keys, items of the right sample take precedence.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[int, Sample], Hashable],
+        right_fn: Callable[[int, Sample], Hashable] | None = None,
+        how: Literal["inner", "left"] = "inner",
+        out_type: type[T] | None = None,
+        grabber: Grabber | None = None,
+    ) -> None:
+        """
+        Args:
+            fn (Callable[[int, Sample], Hashable]): Function that takes the index and
+                the sample and returns the (hashable) join key of the sample.
+            right_fn (Callable[[int, Sample], Hashable] | None, optional): Function
+                used to compute the join key of the samples of the right dataset.
+                Defaults to None, in which case `fn` is used for both datasets.
+            how (Literal["inner", "left"], optional): Type of join. "inner" only keeps
+                the left samples with at least one match, "left" keeps all the left
+                samples, leaving them unchanged if they have no match. Defaults to
+                "inner".
+            out_type (type[T] | None, optional): Type of the output samples. Defaults
+                to None (TypelessSample).
+            grabber (Grabber, optional): Grabber to use for grabbing samples. Defaults
+                to None.
+
+        Raises:
+            ValueError: If `how` is not one of the supported join types.
+        """
+        super().__init__()
+        if how not in ("inner", "left"):
+            raise ValueError(f"Invalid join type: {how}")
+        self._fn = fn
+        self._right_fn = right_fn or fn
+        self._how = how
+        self._out_type = out_type or TypelessSample
+        self._grabber = grabber or Grabber()
+
+    def _get_sample(
+        self,
+        left: Dataset[Sample],
+        right: Dataset[Sample],
+        pairs: list[tuple[int, int | None]],
+        idx: int,
+    ) -> T:
+        left_idx, right_idx = pairs[idx]
+        data: dict[str, Item] = dict(left[left_idx].items())
+        if right_idx is not None:
+            data.update(right[right_idx].items())
+        return self._out_type(**data)  # type: ignore
+
+    def __call__(self, x: tuple[Dataset[Sample], Dataset[Sample]]) -> Dataset[T]:
+        left, right = x
+        index: dict[Hashable, list[int]] = defaultdict(list)
+        for i, sample in self.loop(right, self._grabber, name="Building index"):
+            index[self._right_fn(i, sample)].append(i)
+
+        pairs: list[tuple[int, int | None]] = []
+        for i, sample in self.loop(left, self._grabber, name="Probing index"):
+            matches = index.get(self._fn(i, sample))
+            if matches:
+                pairs.extend((i, j) for j in matches)
+            elif self._how == "left":
+                pairs.append((i, None))
+        return LazyDataset(len(pairs), partial(self._get_sample, left, right, pairs))
@@ -0,0 +1,241 @@
+"""Operators for nearest neighbors search over embedding items."""
+
+import hashlib
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from pipewine._fingerprint import item_fingerprint
+from pipewine.dataset import Dataset, ListDataset
+from pipewine.grabber import Grabber
+from pipewine.item import Item, MemoryItem
+from pipewine.mappers import Mapper
+from pipewine.operators.base import DatasetOperator
+from pipewine.operators.functional import MapOp
+from pipewine.parsers import NumpyNpyParser, PickleParser
+from pipewine.sample import Sample, TypedSample, TypelessSample
+
+
+class NeighborsSample(TypedSample):
+    """Sample type to represent the nearest neighbors of a query sample."""
+
+    indices: Item[np.ndarray]
+    """The indices of the neighbors in the indexed dataset, sorted by distance."""
+    distances: Item[np.ndarray]
+    """The distances of the neighbors from the query sample, in ascending order."""
+
+
+class _EmbeddingMapper(Mapper[Sample, TypelessSample]):
+    def __init__(self, key: str) -> None:
+        super().__init__()
+        self._key = key
+
+    def __call__(self, idx: int, x: Sample) -> TypelessSample:
+        item = x[self._key]
+        embedding = np.asarray(item(), dtype=np.float32).ravel()
+        return TypelessSample(
+            embedding=MemoryItem(embedding, NumpyNpyParser()),
+            fingerprint=MemoryItem(item_fingerprint(item), PickleParser()),
+        )
+
+
+class NearestNeighborsOp(
+    DatasetOperator[tuple[Dataset, Dataset], Dataset[NeighborsSample]]
+):
+    """Operator that finds the k nearest neighbors of every sample of a query dataset
+    among the samples of an indexed dataset, comparing their embedding items.
+
+    Embeddings are read and flattened inside the grabber workers and stacked into a
+    matrix of float32, which can be memory-mapped to a `.npy` file to index datasets
+    that do not fit in memory. When the query dataset is the indexed dataset itself,
+    the embeddings are read only once and the (memory-mapped) index matrix is also used
+    for the queries. The search is exact: distances are computed with one
+    matrix multiplication for every pair of query and index blocks, keeping a running
+    top-k selection, so the memory used is bounded by the block size and no Python loop
+    runs over individual pairs of samples.
+
+    The input is a tuple with the indexed dataset and the query dataset, which can be
+    the same dataset. The output contains one `NeighborsSample` for every query sample.
+    """
+
+    def __init__(
+        self,
+        key: str = "embedding",
+        k: int = 5,
+        metric: Literal["euclidean", "cosine"] = "euclidean",
+        block_size: int = 4096,
+        path: Path | None = None,
+        grabber: Grabber | None = None,
+    ) -> None:
+        """
+        Args:
+            key (str, optional): Key of the embedding items, the same key is used for
+                both datasets. Defaults to "embedding".
+            k (int, optional): Number of neighbors to find for every query sample. If
+                the indexed dataset has fewer than `k` samples, all of them are
+                returned. Defaults to 5.
+            metric (Literal["euclidean", "cosine"], optional): Distance metric, either
+                "euclidean" or "cosine" (one minus the cosine similarity). Defaults to
+                "euclidean".
+            block_size (int, optional): Maximum number of embeddings multiplied at
+                once, both for the index and for the queries. Defaults to 4096.
+            path (Path | None, optional): Path to a `.npy` file where the embedding
+                matrix of the indexed dataset is memory-mapped. A fingerprint of the
+                key and of the files of the embedding items, i.e. their modification
+                time and size, is saved next to it with a ".fingerprint" suffix: if the
+                file already exists and the fingerprint matches, it is reused without
+                reading the embeddings, otherwise it is rebuilt. Embeddings that are
+                not stored in files cannot be checked, so their matrix is always
+                rebuilt. Defaults to None, in which case the matrix is kept in memory.
+            grabber (Grabber, optional): Grabber to use for grabbing samples. Defaults
+                to None.
+
+        Raises:
+            ValueError: If `k` or `block_size` are not positive or if the metric is
+                not valid.
+        """
+        super().__init__()
+        if k <= 0:
+            raise ValueError(f"k must be positive, got {k}")
+        if block_size <= 0:
+            raise ValueError(f"Block size must be positive, got {block_size}")
+        if metric not in ["euclidean", "cosine"]:
+            raise ValueError(f"Invalid metric: {metric}")
+        self._embedding_op = MapOp(_EmbeddingMapper(key))
+        self._key = key
+        self._k = k
+        self._metric = metric
+        self._block_size = block_size
+        self._path = path
+        self._grabber = grabber or Grabber()
+
+    def _fingerprint_path(self, path: Path) -> Path:
+        return path.with_name(path.name + ".fingerprint")
+
+    def _fingerprint(self, items: list[Hashable | None]) -> str | None:
+        if any(x is None for x in items):
+            return None
+        return hashlib.sha256(repr((self._key, items)).encode()).hexdigest()
+
+    def _load_matrix(
+        self, x: Dataset, name: str, path: Path | None = None
+    ) -> tuple[np.ndarray, list[Hashable | None]]:
+        matrix: np.ndarray | None = None
+        items: list[Hashable | None] = [None] * len(x)
+        for i, sample in self.loop(self._embedding_op(x), self._grabber, name=name):
+            embedding = sample["embedding"]()
+            if matrix is None:
+                shape = (len(x), len(embedding))
+                if path is None:
+                    matrix = np.empty(shape, dtype=np.float32)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    matrix = np.lib.format.open_memmap(
+                        path, mode="w+", dtype=np.float32, shape=shape
+                    )
+            if len(embedding) != matrix.shape[1]:
+                raise ValueError(
+                    f"Embedding of sample {i} has size {len(embedding)}, expected "
+                    f"{matrix.shape[1]}"
+                )
+            matrix[i] = embedding
+            items[i] = sample["fingerprint"]()
+        if matrix is None:
+            return np.empty((0, 0), dtype=np.float32), items
+        if isinstance(matrix, np.memmap):
+            matrix.flush()
+        return matrix, items
+
+    def _load_index(self, x: Dataset) -> np.ndarray:
+        if self._path is None:
+            return self._load_matrix(x, "Indexing")[0]
+        fingerprint_path = self._fingerprint_path(self._path)
+        if self._path.is_file() and fingerprint_path.is_file():
+            matrix = np.load(self._path, mmap_mode="r")
+            if matrix.ndim == 2 and matrix.shape[0] == len(x):
+                items: list[Hashable | None] = [None] * len(x)
+                for i, sample in self.loop(x, self._grabber, name="Checking index"):
+                    items[i] = item_fingerprint(sample[self._key])
+                if self._fingerprint(items) == fingerprint_path.read_text():
+                    return matrix
+
+        # The old fingerprint must not survive a partially rewritten matrix.
+        fingerprint_path.unlink(missing_ok=True)
+        matrix, items = self._load_matrix(x, "Indexing", path=self._path)
+        fingerprint = self._fingerprint(items)
+        if fingerprint is not None and self._path.is_file():
+            fingerprint_path.write_text(fingerprint)
+        return matrix
+
+    def _normalize(self, block: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        return block / np.maximum(norms, np.finfo(np.float32).tiny)
+
+    def _distances(self, queries: np.ndarray, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=np.float32)
+        if self._metric == "cosine":
+            return 1.0 - queries @ self._normalize(block).T
+        dists = (
+            (queries**2).sum(axis=1, keepdims=True)
+            - 2.0 * (queries @ block.T)
+            + (block**2).sum(axis=1)[None, :]
+        )
+        return np.sqrt(np.maximum(dists, 0.0))
+
+    def _search(
+        self, queries: np.ndarray, index: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        best_idx = np.empty((len(queries), 0), dtype=np.int64)
+        best_dist = np.empty((len(queries), 0), dtype=np.float32)
+        if len(index) == 0:
+            return best_idx, best_dist
+        if self._metric == "cosine":
+            queries = self._normalize(queries)
+        k = min(self._k, len(index))
+        for start in range(0, len(index), self._block_size):
+            block = index[start : start + self._block_size]
+            cand_dist = np.concatenate(
+                [best_dist, self._distances(queries, block)], axis=1
+            )
+            block_idx = np.arange(start, start + len(block))
+            cand_idx = np.concatenate(
+                [best_idx, np.broadcast_to(block_idx, (len(queries), len(block)))],
+                axis=1,
+            )
+            if cand_dist.shape[1] > k:
+                top = np.argpartition(cand_dist, k - 1, axis=1)[:, :k]
+                cand_dist = np.take_along_axis(cand_dist, top, axis=1)
+                cand_idx = np.take_along_axis(cand_idx, top, axis=1)
+            best_dist, best_idx = cand_dist, cand_idx
+        order = np.argsort(best_dist, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_idx, order, axis=1),
+            np.take_along_axis(best_dist, order, axis=1),
+        )
+
+    def __call__(self, x: tuple[Dataset, Dataset]) -> Dataset[NeighborsSample]:
+        index_dataset, query_dataset = x
+        index = self._load_index(index_dataset)
+        if query_dataset is index_dataset:
+            queries = index
+        else:
+            queries = self._load_matrix(query_dataset, "Querying")[0]
+        if len(index) > 0 and len(queries) > 0 and index.shape[1] != queries.shape[1]:
+            raise ValueError(
+                f"Query embeddings have size {queries.shape[1]}, expected "
+                f"{index.shape[1]}"
+            )
+        samples = []
+        for start in range(0, len(queries), self._block_size):
+            block = queries[start : start + self._block_size]
+            indices, distances = self._search(block, index)
+            for idx, dist in zip(indices, distances):
+                samples.append(
+                    NeighborsSample(
+                        indices=MemoryItem(idx, NumpyNpyParser()),
+                        distances=MemoryItem(dist, NumpyNpyParser()),
+                    )
+                )
+        return ListDataset(samples)
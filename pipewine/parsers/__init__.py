@@ -1,7 +1,12 @@
 """Package for all Pipewine built-in parsers."""
 
-from pipewine.parsers.base import Parser, ParserRegistry
-from pipewine.parsers.metadata_parser import JSONParser, YAMLParser
+from pipewine.parsers.base import ArrayInfo, Parser, ParserRegistry
+from pipewine.parsers.metadata_parser import (
+    JSONParser,
+    MetadataBackend,
+    MetadataBackendRegistry,
+    YAMLParser,
+)
 from pipewine.parsers.numpy_parser import NumpyNpyParser
 from pipewine.parsers.pickle_parser import PickleParser
 from pipewine.parsers.image_parser import (
@@ -10,4 +15,5 @@ from pipewine.parsers.image_parser import (
     JpegParser,
     PngParser,
     TiffParser,
+    box_reduce,
 )
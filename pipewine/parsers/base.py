@@ -1,8 +1,14 @@
 """Base classes for Pipewine parsers."""
 
+import io
+import math
+import os
 from abc import ABC, ABCMeta, abstractmethod
-from collections.abc import Iterable, KeysView
-from typing import Any
+from collections.abc import Buffer, Iterable, KeysView
+from dataclasses import dataclass
+from typing import Any, BinaryIO
+
+import numpy as np
 
 
 class ParserRegistry:
@@ -31,6 +37,67 @@ class ParserRegistry:
         return cls._registered_parsers.keys()
 
 
+@dataclass(frozen=True)
+class ArrayInfo:
+    """Description of array-like data, e.g. an image, that can often be obtained from
+    the headers of a file without decoding it.
+    """
+
+    shape: tuple[int, ...]
+    """Shape of the array."""
+    dtype: np.dtype
+    """Data type of the array elements."""
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of the decoded array in memory."""
+        return math.prod(self.shape) * self.dtype.itemsize
+
+    @classmethod
+    def of(cls, data: Any) -> "ArrayInfo | None":
+        """Describe already loaded data.
+
+        Args:
+            data (Any): The data to describe.
+
+        Returns:
+            ArrayInfo | None: The description of the data if it is a numpy array, None
+                otherwise.
+        """
+        if isinstance(data, np.ndarray):
+            return cls(tuple(data.shape), data.dtype)
+        return None
+
+
+class _BufferFile(io.RawIOBase):
+    # Read-only binary file over a buffer, reading only the requested bytes.
+    def __init__(self, data: Buffer) -> None:
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        target = memoryview(buffer).cast("B")
+        chunk = self._view[self._pos : self._pos + len(target)]
+        target[: len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        start = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: len(self._view)}
+        self._pos = max(0, start[whence] + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
 class _ParserMeta(ABCMeta):
     def __new__(
         cls,
@@ -75,6 +142,22 @@ class Parser[T: Any](ABC, metaclass=_ParserMeta):
         """Get the concrete type `T` of the parsed data, if known."""
         return self._type
 
+    @property
+    def zero_copy(self) -> bool:
+        """Whether the parser benefits from reading the data without copying it. If
+        True, stored items pass a memory-mapped buffer of the source to `parse_buffer`
+        instead of reading it into a byte string. Defaults to False.
+        """
+        return False
+
+    @property
+    def preserves_data(self) -> bool:
+        """Whether parsing preserves all the information of the source data. If False,
+        e.g., for parsers that decode images at a reduced resolution, sinks re-encode
+        the parsed data instead of copying the source file. Defaults to True.
+        """
+        return True
+
     @abstractmethod
     def parse(self, data: bytes) -> T:
         """Parse data from bytes. Implementations can access the `type_` attribute, if
@@ -88,6 +171,57 @@ class Parser[T: Any](ABC, metaclass=_ParserMeta):
         """
         pass
 
+    def parse_buffer(self, data: Buffer | BinaryIO) -> T:
+        """Parse data from any object supporting the buffer protocol, like `bytes`,
+        `memoryview` or `mmap`, or from a binary file-like object. Subclasses can
+        override it to avoid copying the data into a byte string, the default
+        implementation does it and calls `parse`.
+
+        Args:
+            data (Buffer | BinaryIO): The buffer or the file containing the data to
+                parse.
+
+        Returns:
+            T: The parsed data.
+        """
+        if isinstance(data, bytes):
+            return self.parse(data)
+        if isinstance(data, Buffer):
+            return self.parse(bytes(data))
+        return self.parse(data.read())
+
+    def parse_region(self, data: Buffer | BinaryIO, rows: slice, cols: slice) -> Any:
+        """Parse a rectangular region of image-like data, e.g. a crop of an image.
+        Subclasses can override it to decode only the requested region, the default
+        implementation parses the whole data and slices it.
+
+        Args:
+            data (Buffer | BinaryIO): The buffer or the file containing the data to
+                parse.
+            rows (slice): The rows of the region.
+            cols (slice): The columns of the region.
+
+        Returns:
+            Any: The parsed region.
+        """
+        return self.parse_buffer(data)[rows, cols]  # type: ignore
+
+    def probe(self, data: Buffer | BinaryIO) -> ArrayInfo | None:
+        """Get the shape and data type of array-like data, e.g. an image, ideally
+        reading only the headers of the data. Subclasses can override it to avoid
+        decoding the data, the default implementation parses it and describes the
+        result.
+
+        Args:
+            data (Buffer | BinaryIO): The buffer or the file containing the data to
+                probe.
+
+        Returns:
+            ArrayInfo | None: The description of the data, or None if the parsed data
+                is not an array.
+        """
+        return ArrayInfo.of(self.parse_buffer(data))
+
     @abstractmethod
     def dump(self, data: T) -> bytes:
         """Dump data to bytes.
@@ -1,14 +1,20 @@
 """Parsers for image data."""
 
+import copy
 import io
-from collections.abc import Iterable, Mapping
-from typing import Any
+import math
+import os
+import struct
+from collections.abc import Buffer, Iterable, Mapping
+from typing import Any, BinaryIO, Self
 
 import imageio.v3 as iio
 import numpy as np
 import tifffile
+from PIL import Image
 
-from pipewine.parsers.base import Parser
+from pipewine.parsers.base import ArrayInfo, Parser, _BufferFile
+from pipewine.parsers.numpy_parser import _into
 
 
 class ImageParser(Parser[np.ndarray]):
@@ -20,10 +26,125 @@ class ImageParser(Parser[np.ndarray]):
     Optionally, the `_save_options` method can be implemented to provide additional
     options to the `imwrite` function when dumping data, e.g., compression level for PNG
     files.
+
+    Images can be parsed from buffers and file-like objects without copying them into
+    a byte string, and decoded into a preallocated array with `parse_buffer`.
+
+    Subclasses can implement `_probe_header` to read the shape and the data type of
+    images from the file headers, making `probe` much cheaper than decoding them.
+
+    Images can also be decoded at a reduced resolution with the `reduce` option. Codecs
+    that support it (JPEG) decode directly at the reduced scale, which is much faster
+    than decoding the full image, the other formats are decoded and then downscaled by
+    averaging blocks of pixels.
     """
 
+    def __init__(self, type_: type[np.ndarray] | None = None, reduce: int = 1) -> None:
+        """
+        Args:
+            type_ (type[np.ndarray] | None, optional): Optional concrete type of the
+                returned data. Defaults to None.
+            reduce (int, optional): Integer factor by which the width and height of the
+                decoded images are divided, rounding up. Defaults to 1, in which case
+                images are decoded at full resolution.
+
+        Raises:
+            ValueError: If `reduce` is lower than 1.
+        """
+        super().__init__(type_=type_)
+        if reduce < 1:
+            raise ValueError(f"Reduce factor must be at least 1, got {reduce}")
+        self._reduce = reduce
+
+    @property
+    def reduce(self) -> int:
+        """The factor by which the resolution of the decoded images is reduced."""
+        return self._reduce
+
+    def with_reduce(self, reduce: int) -> Self:
+        """Create a copy of this parser with a different `reduce` factor, keeping all
+        its other options.
+
+        Args:
+            reduce (int): Integer factor by which the width and height of the decoded
+                images are divided, rounding up.
+
+        Raises:
+            ValueError: If `reduce` is lower than 1.
+
+        Returns:
+            Self: The new parser.
+        """
+        if reduce < 1:
+            raise ValueError(f"Reduce factor must be at least 1, got {reduce}")
+        parser = copy.copy(self)
+        parser._reduce = reduce
+        return parser
+
+    @property
+    def preserves_data(self) -> bool:
+        return self._reduce == 1
+
     def parse(self, data: bytes) -> np.ndarray:
-        return np.array(iio.imread(data, extension="." + next(iter(self.extensions()))))
+        return self.parse_buffer(data)
+
+    def _read(self, data: bytes | BinaryIO) -> np.ndarray:
+        return iio.imread(data, extension="." + next(iter(self.extensions())))
+
+    def _read_reduced(self, data: bytes | BinaryIO) -> np.ndarray:
+        return box_reduce(self._read(data), self._reduce)
+
+    def _decode(self, data: bytes | BinaryIO, out: np.ndarray | None) -> np.ndarray:
+        if self._reduce > 1:
+            return _into(self._read_reduced(data), out)
+        image = self._read(data)
+        if not image.flags.writeable:
+            image = image.copy()
+        return _into(image, out)
+
+    def parse_buffer(
+        self, data: Buffer | BinaryIO, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Parse an image from a buffer or a binary file-like object.
+
+        Args:
+            data (Buffer | BinaryIO): The buffer or the file containing the image.
+            out (np.ndarray | None, optional): Preallocated array where the image is
+                written, must have the same shape and dtype of the decoded image.
+                Defaults to None, in which case a new array is returned.
+
+        Raises:
+            ValueError: If `out` does not match the shape and dtype of the image.
+
+        Returns:
+            np.ndarray: The parsed image, or `out` if given.
+        """
+        if isinstance(data, Buffer) and not isinstance(data, bytes):
+            data = _BufferFile(data)
+        return self._decode(data, out)  # type: ignore
+
+    def _probe_header(self, fp: BinaryIO) -> tuple[tuple[int, ...], np.dtype] | None:
+        """Read the shape and the data type of the full resolution image from the
+        headers of a file, without decoding it.
+
+        Args:
+            fp (BinaryIO): The file, positioned at the start of the image.
+
+        Returns:
+            tuple[tuple[int, ...], np.dtype] | None: Shape and data type of the image,
+                or None if they cannot be known without decoding the image.
+        """
+        return None
+
+    def probe(self, data: Buffer | BinaryIO) -> ArrayInfo | None:
+        fp = _BufferFile(data) if isinstance(data, Buffer) else data
+        start = fp.tell()
+        header = self._probe_header(fp)
+        if header is None:
+            fp.seek(start)
+            return super().probe(fp)
+        shape, dtype = header
+        return ArrayInfo(_reduced_shape(shape, self._reduce), dtype)
 
     def dump(self, data: np.ndarray) -> bytes:
         ext = next(iter(self.extensions()))
@@ -47,6 +168,9 @@ class BmpParser(ImageParser):
         return ["bmp"]
 
 
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
 class PngParser(ImageParser):
     """Parser for PNG image data."""
 
@@ -57,20 +181,173 @@ class PngParser(ImageParser):
     def _save_options(self) -> Mapping[str, Any]:
         return {"compress_level": 4}
 
+    def _probe_header(self, fp: BinaryIO) -> tuple[tuple[int, ...], np.dtype] | None:
+        # Signature, length and type of the IHDR chunk, IHDR data and CRC.
+        head = fp.read(33)
+        if len(head) < 33 or head[:8] != _PNG_SIGNATURE or head[12:16] != b"IHDR":
+            return None
+        width, height, depth, color = struct.unpack(">IIBB", head[16:26])
+        if color == 0:  # Grayscale
+            dtype = bool if depth == 1 else np.uint16 if depth == 16 else np.uint8
+            return (height, width), np.dtype(dtype)
+        if color == 2:  # RGB, 16 bit images are decoded to 8 bit
+            return (height, width, 3), np.dtype(np.uint8)
+        if color == 3 and not _png_has_transparency(fp):  # Palette
+            return (height, width, 3), np.dtype(np.uint8)
+        if color == 4 and depth == 8:  # Grayscale and alpha
+            return (height, width, 2), np.dtype(np.uint8)
+        if color == 6:  # RGBA
+            return (height, width, 4), np.dtype(np.uint8)
+        return None
+
+
+def _png_has_transparency(fp: BinaryIO) -> bool:
+    # Look for a tRNS chunk among those preceding the image data.
+    while len(chunk := fp.read(8)) == 8:
+        length, type_ = struct.unpack(">I4s", chunk)
+        if type_ in (b"IDAT", b"IEND"):
+            return False
+        if type_ == b"tRNS":
+            return True
+        fp.seek(length + 4, os.SEEK_CUR)
+    return False
+
+
+# Start Of Frame markers, excluding DHT, JPG and DAC that share the same range.
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7}
+_JPEG_SOF |= {0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
 
 class JpegParser(ImageParser):
-    """Parser for JPEG image data."""
+    """Parser for JPEG image data.
+
+    When `reduce` is greater than 1, images are decoded with the DCT scaling of the
+    JPEG decoder, which natively supports factors of 2, 4 and 8. Other factors are
+    reached by downscaling the closest larger native scale.
+    """
 
     def _save_options(self) -> Mapping[str, Any]:
         return {"quality": 80}
 
+    def _probe_header(self, fp: BinaryIO) -> tuple[tuple[int, ...], np.dtype] | None:
+        if fp.read(2) != b"\xff\xd8":
+            return None
+        while len(marker := fp.read(2)) == 2 and marker[0] == 0xFF:
+            while marker[1] == 0xFF:  # Fill bytes
+                if not (byte := fp.read(1)):
+                    return None
+                marker = marker[1:] + byte
+            segment = fp.read(2)
+            if len(segment) < 2:
+                return None
+            length = struct.unpack(">H", segment)[0]
+            if length < 2:
+                return None
+            if marker[1] in _JPEG_SOF:
+                frame = fp.read(6)
+                if len(frame) < 6:
+                    return None
+                precision, height, width, components = struct.unpack(">BHHB", frame)
+                if precision != 8 or height == 0 or components not in (1, 3):
+                    return None
+                shape = (height, width) if components == 1 else (height, width, 3)
+                return shape, np.dtype(np.uint8)
+            fp.seek(length - 2, os.SEEK_CUR)
+        return None
+
+    def _read_reduced(self, data: bytes | BinaryIO) -> np.ndarray:
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        with Image.open(data) as image:
+            w, h = image.size
+            size = (-(-w // self._reduce), -(-h // self._reduce))
+            # The decoder picks the smallest scale that is at least as large as the
+            # requested size, flooring it ensures exact sizes for native factors.
+            draft = (max(1, w // self._reduce), max(1, h // self._reduce))
+            image.draft(image.mode, draft)
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.BOX)
+            return np.array(image)
+
     @classmethod
     def extensions(cls) -> Iterable[str]:
         return ["jpeg", "jpg", "jfif", "jpe"]
 
 
+def _reduced_shape(shape: tuple[int, ...], factor: int) -> tuple[int, ...]:
+    return (-(-shape[0] // factor), -(-shape[1] // factor), *shape[2:])
+
+
+def box_reduce(image: np.ndarray, factor: int) -> np.ndarray:
+    """Reduce the resolution of an image by an integer factor, averaging blocks of
+    `factor` x `factor` pixels. The blocks on the last rows and columns may be smaller,
+    so the reduced image has the size of the original one divided by the factor,
+    rounding up.
+
+    Args:
+        image (np.ndarray): The image, with the rows and the columns on the first two
+            axes.
+        factor (int): The reduction factor, at least 1.
+
+    Returns:
+        np.ndarray: The reduced image, with the same data type as the original one.
+            Integer and boolean averages are rounded to the nearest value.
+    """
+    if factor == 1:
+        return image
+    h, w = image.shape[:2]
+    rows, cols = np.arange(0, h, factor), np.arange(0, w, factor)
+    sums = np.add.reduceat(
+        np.add.reduceat(image.astype(np.float64), rows, axis=0), cols, axis=1
+    )
+    counts = np.outer(np.diff(rows, append=h), np.diff(cols, append=w))
+    reduced = sums / counts.reshape(counts.shape + (1,) * (image.ndim - 2))
+    if np.issubdtype(image.dtype, np.integer) or image.dtype == np.bool_:
+        reduced = np.rint(reduced)
+    return reduced.astype(image.dtype)
+
+
+def _read_window(
+    tif: tifffile.TiffFile, y0: int, y1: int, x0: int, x1: int
+) -> np.ndarray:
+    # Decode only the tiles (or strips) of the first page overlapping the window.
+    page = tif.pages.first
+    fh = tif.filehandle
+    out = np.zeros((y1 - y0, x1 - x0, *page.shape[2:]), dtype=page.dtype)
+    if page.is_contiguous:  # Uncompressed: read only the rows of the window.
+        row_size = page.imagewidth * math.prod(page.shape[2:])
+        dtype = page.dtype.newbyteorder(tif.byteorder)
+        fh.seek(page.dataoffsets[0] + y0 * row_size * dtype.itemsize)
+        data = fh.read((y1 - y0) * row_size * dtype.itemsize)
+        rows = np.frombuffer(data, dtype=dtype).reshape(out.shape[:1] + page.shape[1:])
+        out[:] = rows[:, x0:x1]
+        return out
+    tile_h, tile_w = page.chunks[:2]
+    tiles_x = -(-page.imagewidth // tile_w)
+    for ty in range(y0 // tile_h, -(-y1 // tile_h)):
+        for tx in range(x0 // tile_w, -(-x1 // tile_w)):
+            index = ty * tiles_x + tx
+            fh.seek(page.dataoffsets[index])
+            data = fh.read(page.databytecounts[index])
+            tile = page.decode(data, index, jpegtables=page.jpegtables)[0]
+            # The last strip may be shorter than the others.
+            tile = tile.reshape(-1, tile_w, *page.shape[2:])
+            ty0, tx0 = ty * tile_h, tx * tile_w
+            oy0, oy1 = max(y0, ty0), min(y1, ty0 + len(tile))
+            ox0, ox1 = max(x0, tx0), min(x1, tx0 + tile_w)
+            out[oy0 - y0 : oy1 - y0, ox0 - x0 : ox1 - x0] = tile[
+                oy0 - ty0 : oy1 - ty0, ox0 - tx0 : ox1 - tx0
+            ]
+    return out
+
+
 class TiffParser(ImageParser):
-    """Parser for TIFF image data."""
+    """Parser for TIFF image data.
+
+    Regions of single-page images are decoded lazily with `parse_region`: only the
+    tiles or strips that overlap the region are read and decoded, and uncompressed
+    images are read row by row without decoding.
+    """
 
     def _save_options(self) -> Mapping[str, Any]:
         return {"compression": "zlib", "photometric": True}
@@ -79,8 +356,59 @@ class TiffParser(ImageParser):
     def extensions(cls) -> Iterable[str]:
         return ["tiff", "tif"]
 
-    def parse(self, data: bytes) -> np.ndarray:
-        return np.array(tifffile.imread(io.BytesIO(data)))
+    def _read(self, data: bytes | BinaryIO) -> np.ndarray:
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        return tifffile.imread(data)
+
+    def _probe_header(self, fp: BinaryIO) -> tuple[tuple[int, ...], np.dtype] | None:
+        try:
+            with tifffile.TiffFile(fp) as tif:
+                # Truncated files are parsed leniently, skipping the missing tags and
+                # pages: check that the data of the first page is in the file, and
+                # that the series has the shape written in the metadata, if any.
+                page = tif.pages.first
+                chunks = zip(page.dataoffsets, page.databytecounts)
+                if max(x + n for x, n in chunks) > tif.filehandle.size:
+                    return None
+                series = tif.series[0]
+                metadata = tif.shaped_metadata
+                if metadata and tuple(metadata[0]["shape"]) != series.shape:
+                    return None
+                return tuple(series.shape), np.dtype(series.dtype)
+        except Exception:
+            # tifffile raises many kinds of errors on truncated or malformed headers.
+            return None
+
+    def _decode(self, data: bytes | BinaryIO, out: np.ndarray | None) -> np.ndarray:
+        if self._reduce > 1:
+            return super()._decode(data, out)
+        if isinstance(data, bytes):
+            data = io.BytesIO(data)
+        # Decoded directly into the output array, if any.
+        image = tifffile.imread(data, out=out)
+        return image if out is None else out
+
+    def parse_region(
+        self, data: Buffer | BinaryIO, rows: slice, cols: slice
+    ) -> np.ndarray:
+        if self._reduce > 1:  # Regions are in reduced coordinates.
+            return super().parse_region(data, rows, cols)
+        if isinstance(data, Buffer):
+            data = _BufferFile(data)
+        with tifffile.TiffFile(data) as tif:
+            page = tif.pages.first
+            y0, y1, y_step = rows.indices(page.imagelength)
+            x0, x1, x_step = cols.indices(page.imagewidth)
+            if (
+                len(tif.pages) > 1
+                or page.imagedepth > 1
+                or (page.planarconfig != 1 and page.samplesperpixel > 1)
+                or y_step != 1
+                or x_step != 1
+            ):
+                return tif.asarray()[rows, cols]
+            return _read_window(tif, y0, max(y0, y1), x0, max(x0, x1))
 
     def dump(self, data: np.ndarray) -> bytes:
         buffer = io.BytesIO()
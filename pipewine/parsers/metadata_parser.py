@@ -1,13 +1,25 @@
 """Parsers for metadata files."""
 
 import json
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import partial
 from typing import Any, Protocol, Self
 
 import yaml
 
 from pipewine.parsers.base import Parser
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore
+
 
 class PydanticLike(Protocol):
     """Protocol for classes that behave like Pydantic models."""
@@ -17,52 +29,229 @@ class PydanticLike(Protocol):
     def model_dump(self) -> dict: ...
 
 
-class JSONParser[T: str | int | float | bool | dict | list | PydanticLike](Parser[T]):
-    """Parser for JSON data. Can parse and dump basic types (str, int, float, bool,
-    dict, list) as well as Pydantic models.
+@dataclass(frozen=True)
+class MetadataBackend:
+    """Pair of functions used by a metadata parser to convert data from and to bytes.
+    Both functions must be picklable, e.g. module-level functions or partials of them,
+    because parsers are sent to worker processes together with the items.
     """
 
+    load: Callable[[bytes], Any]
+    """Function that parses bytes into Python objects."""
+    dump: Callable[[Any], bytes]
+    """Function that serializes Python objects into bytes."""
+
+
+class MetadataBackendRegistry:
+    """Container for the backends available to the metadata parsers, by format ("json"
+    or "yaml") and name.
+
+    The default backend of every format is the one registered with the highest
+    priority, built-in backends that need optional libraries are only registered if
+    the libraries are installed:
+
+    - "json": "stdlib" (priority 20), the standard library `json` module, "orjson"
+        (priority 10) and "ujson" (priority 0). The faster third-party backends are
+        opt-in, as their output differs from the standard one: `orjson` dumps NaN and
+        infinity as null, rejects integers larger than 64 bits and emits compact
+        output, `ujson` formats floats with a different precision and escapes
+        strings differently.
+    - "yaml": "libyaml" (priority 10), the C implementation of the PyYAML safe loader
+        and dumper, and "python" (priority 0), the pure Python one.
+    """
+
+    _backends: dict[str, dict[str, tuple[MetadataBackend, int]]] = {}
+
+    @classmethod
+    def register(
+        cls, format_: str, name: str, backend: MetadataBackend, priority: int = 0
+    ) -> None:
+        """Register a backend, replacing any backend with the same format and name.
+
+        Args:
+            format_ (str): Format of the data, e.g. "json" or "yaml".
+            name (str): Name of the backend.
+            backend (MetadataBackend): The backend.
+            priority (int, optional): Priority of the backend, the default backend of
+                a format is the one with the highest priority. Defaults to 0.
+        """
+        cls._backends.setdefault(format_, {})[name] = (backend, priority)
+
+    @classmethod
+    def get(cls, format_: str, name: str | None = None) -> MetadataBackend:
+        """Get a backend for a given format.
+
+        Args:
+            format_ (str): Format of the data, e.g. "json" or "yaml".
+            name (str | None, optional): Name of the backend. Defaults to None, in
+                which case the default backend of the format is returned.
+
+        Raises:
+            ValueError: If no backend is registered for the format, or if no backend
+                with the given name is registered for the format.
+
+        Returns:
+            MetadataBackend: The backend.
+        """
+        backends = cls._backends.get(format_, {})
+        if name is None:
+            if not backends:
+                raise ValueError(f"No backend registered for format {format_}")
+            return max(backends.values(), key=lambda x: x[1])[0]
+        if name not in backends:
+            raise ValueError(
+                f"Unknown {format_} backend: {name}, choices: {list(backends)}"
+            )
+        return backends[name][0]
+
+    @classmethod
+    def names(cls, format_: str) -> list[str]:
+        """Get the names of the backends registered for a given format, from the
+        highest to the lowest priority.
+        """
+        backends = cls._backends.get(format_, {})
+        return sorted(backends, key=lambda x: backends[x][1], reverse=True)
+
+
+def _json_load(data: bytes) -> Any:
+    return json.loads(data.decode())
+
+
+def _json_dump(data: Any) -> bytes:
+    return json.dumps(data).encode()
+
+
+def _ujson_load(data: bytes) -> Any:  # pragma: no cover
+    return ujson.loads(data)
+
+
+def _ujson_dump(data: Any) -> bytes:  # pragma: no cover
+    return ujson.dumps(data, escape_forward_slashes=False).encode()
+
+
+def _yaml_load(data: bytes, loader: type) -> Any:
+    return yaml.load(data.decode(), Loader=loader)
+
+
+def _yaml_dump(data: Any, dumper: type) -> bytes:
+    return yaml.dump(data, Dumper=dumper).encode()
+
+
+def _register_backends() -> None:
+    # Register the built-in backends whose libraries are installed.
+    MetadataBackendRegistry.register(
+        "json", "stdlib", MetadataBackend(_json_load, _json_dump), priority=20
+    )
+    if orjson is not None:  # pragma: no cover
+        MetadataBackendRegistry.register(
+            "json",
+            "orjson",
+            MetadataBackend(
+                orjson.loads, partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+            ),
+            priority=10,
+        )
+    if ujson is not None:  # pragma: no cover
+        MetadataBackendRegistry.register(
+            "json", "ujson", MetadataBackend(_ujson_load, _ujson_dump)
+        )
+    MetadataBackendRegistry.register(
+        "yaml",
+        "python",
+        MetadataBackend(
+            partial(_yaml_load, loader=yaml.SafeLoader),
+            partial(_yaml_dump, dumper=yaml.SafeDumper),
+        ),
+    )
+    if yaml.__with_libyaml__:
+        MetadataBackendRegistry.register(
+            "yaml",
+            "libyaml",
+            MetadataBackend(
+                partial(_yaml_load, loader=yaml.CSafeLoader),
+                partial(_yaml_dump, dumper=yaml.CSafeDumper),
+            ),
+            priority=10,
+        )
+
+
+_register_backends()
+
+
+class _MetadataParser[T](Parser[T]):
+    _format: str
+
+    def __init__(
+        self, type_: type[T] | None = None, backend: str | None = None
+    ) -> None:
+        """
+        Args:
+            type_ (type[T] | None, optional): Optional concrete type of the returned
+                data. Defaults to None.
+            backend (str | None, optional): Name of the backend used to load and dump
+                data, see `MetadataBackendRegistry`. Defaults to None, in which case
+                the default backend of the format is used.
+
+        Raises:
+            ValueError: If the backend is not registered.
+        """
+        super().__init__(type_=type_)
+        self._backend = MetadataBackendRegistry.get(self._format, backend)
+
+    @property
+    def backend(self) -> MetadataBackend:
+        """The backend used to load and dump data."""
+        return self._backend
+
     def parse(self, data: bytes) -> T:
-        json_data = json.loads(data.decode())
+        parsed = self._backend.load(data)
         if self._type is None:
-            return json_data
+            return parsed
         elif issubclass(self._type, (str, int, float, bool, dict, list)):
-            return self._type(json_data)  # type: ignore
+            return self._type(parsed)  # type: ignore
         else:
-            return self._type.model_validate(json_data)
+            return self._type.model_validate(parsed)  # type: ignore
 
     def dump(self, data: T) -> bytes:
         if isinstance(data, (str, int, float, bool, dict, list)):
-            json_data = data  # type: ignore
+            plain = data
         else:
-            json_data = data.model_dump()
-        return json.dumps(json_data).encode()
+            plain = data.model_dump()  # type: ignore
+        return self._backend.dump(plain)
+
+
+class JSONParser[T: str | int | float | bool | dict | list | PydanticLike](
+    _MetadataParser[T]
+):
+    """Parser for JSON data. Can parse and dump basic types (str, int, float, bool,
+    dict, list) as well as Pydantic models.
+
+    Data is loaded and dumped by the standard library `json` module by default. The
+    faster `orjson` and `ujson` backends, when installed, can be selected with the
+    `backend` argument, e.g. `JSONParser(backend="orjson")`, but they do not produce
+    the same output: `orjson` dumps NaN and infinity as null, rejects integers larger
+    than 64 bits and emits compact output, while `ujson` formats floats with a
+    different precision and escapes strings differently.
+    """
+
+    _format = "json"
 
     @classmethod
     def extensions(cls) -> Iterable[str]:
         return ["json"]
 
 
-class YAMLParser[T: str | int | float | bool | dict | list | PydanticLike](Parser[T]):
+class YAMLParser[T: str | int | float | bool | dict | list | PydanticLike](
+    _MetadataParser[T]
+):
     """Parser for YAML data. Can parse and dump basic types (str, int, float, bool,
     dict, list) as well as Pydantic models.
-    """
 
-    def parse(self, data: bytes) -> T:
-        yaml_data = yaml.safe_load(data.decode())
-        if self._type is None:
-            return yaml_data
-        elif issubclass(self._type, (str, int, float, bool, dict, list)):
-            return self._type(yaml_data)  # type: ignore
-        else:
-            return self._type.model_validate(yaml_data)
+    Data is loaded and dumped with the safe loader and dumper of PyYAML, using their
+    C implementation if PyYAML was built with `libyaml`, which is much faster.
+    """
 
-    def dump(self, data: T) -> bytes:
-        if isinstance(data, (str, int, float, bool, dict, list)):
-            yaml_data = data
-        else:
-            yaml_data = data.model_dump()
-        return yaml.safe_dump(yaml_data).encode()
+    _format = "yaml"
 
     @classmethod
     def extensions(cls) -> Iterable[str]:
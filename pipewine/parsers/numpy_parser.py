@@ -1,19 +1,130 @@
 """Parser for arbitrary NumPy arrays."""
 
 import io
-from collections.abc import Iterable
+import math
+from collections.abc import Buffer, Iterable
+from typing import BinaryIO
 
 import numpy as np
 
-from pipewine.parsers.base import Parser
+from pipewine.parsers.base import ArrayInfo, Parser, _BufferFile
+
+_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def _read_header(
+    fp: BinaryIO,
+) -> tuple[tuple[int, ...], bool, np.dtype] | None:
+    # Shape, Fortran order and dtype, or None if the format version is not supported.
+    version = np.lib.format.read_magic(fp)
+    if version not in _HEADER_READERS:
+        return None
+    return _HEADER_READERS[version](fp)
+
+
+def _into(array: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+    # Copy the array into the preallocated output, if any.
+    if out is None:
+        return array
+    if out.shape != array.shape or out.dtype != array.dtype:
+        raise ValueError(
+            f"Expected an output array with shape {array.shape} and dtype "
+            f"{array.dtype}, got {out.shape} and {out.dtype}"
+        )
+    np.copyto(out, array)
+    return out
 
 
 class NumpyNpyParser(Parser[np.ndarray]):
-    """Parser for NumPy arrays saved in the `.npy` format."""
+    """Parser for NumPy arrays saved in the `.npy` format.
+
+    In memory-mapped mode, parsed arrays are read-only views over the input buffer
+    instead of copies. Items stored in local files are then memory-mapped, so that
+    accessing a slice of a large array only reads the pages it needs from disk.
+    """
+
+    def __init__(self, type_: type[np.ndarray] | None = None, mmap: bool = False):
+        """
+        Args:
+            type_ (type[np.ndarray] | None, optional): Optional concrete type of the
+                returned data. Defaults to None.
+            mmap (bool, optional): Whether to return read-only views over the input
+                buffer instead of copies. Arrays of objects are always copied.
+                Defaults to False.
+        """
+        super().__init__(type_=type_)
+        self._mmap = mmap
+
+    @property
+    def mmap(self) -> bool:
+        """Whether parsed arrays are views over the input buffer."""
+        return self._mmap
+
+    @property
+    def zero_copy(self) -> bool:
+        return self._mmap
+
+    def _parse_view(self, data: Buffer) -> np.ndarray | None:
+        fp = _BufferFile(data)
+        header = _read_header(fp)
+        if header is None or header[2].hasobject:
+            return None
+        shape, fortran_order, dtype = header
+        count = math.prod(shape)
+        view = memoryview(data).cast("B")
+        array = np.frombuffer(view, dtype=dtype, count=count, offset=fp.tell())
+        return array.reshape(shape, order="F" if fortran_order else "C")
 
     def parse(self, data: bytes) -> np.ndarray:
-        buffer = io.BytesIO(data)
-        return np.load(buffer)
+        return self.parse_buffer(data)
+
+    def parse_buffer(
+        self, data: Buffer | BinaryIO, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Parse an array from a buffer or a binary file-like object.
+
+        Args:
+            data (Buffer | BinaryIO): The buffer or the file containing the array.
+            out (np.ndarray | None, optional): Preallocated array where the data is
+                written, must have the same shape and dtype of the parsed array.
+                Defaults to None, in which case a new array is returned (or a view, in
+                memory-mapped mode).
+
+        Raises:
+            ValueError: If `out` does not match the shape and dtype of the array.
+
+        Returns:
+            np.ndarray: The parsed array, or `out` if given.
+        """
+        if isinstance(data, Buffer):
+            array = self._parse_view(data)
+            if array is not None:
+                if out is None and not self._mmap:
+                    array = array.copy(order="K")
+                return _into(array, out)
+            data = _BufferFile(data)
+        return _into(np.load(data), out)
+
+    def parse_region(
+        self, data: Buffer | BinaryIO, rows: slice, cols: slice
+    ) -> np.ndarray:
+        # Only the pages of the region are accessed, when the buffer is mapped.
+        if isinstance(data, Buffer) and (array := self._parse_view(data)) is not None:
+            region = array[rows, cols]
+            return region if self._mmap else region.copy()
+        return super().parse_region(data, rows, cols)
+
+    def probe(self, data: Buffer | BinaryIO) -> ArrayInfo | None:
+        fp = _BufferFile(data) if isinstance(data, Buffer) else data
+        start = fp.tell()
+        header = _read_header(fp)
+        if header is None:
+            fp.seek(start)
+            return super().probe(fp)
+        return ArrayInfo(header[0], header[2])
 
     def dump(self, data: np.ndarray) -> bytes:
         buffer = io.BytesIO()
@@ -2,7 +2,10 @@
 data.
 """
 
+import mmap
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Buffer, Hashable
 from pathlib import Path
 
 
@@ -18,6 +21,19 @@ class Reader(ABC):
         """Read data from the source and return it as a byte string."""
         pass
 
+    def read_buffer(self) -> Buffer:
+        """Read data from the source and return it as an object supporting the buffer
+        protocol, possibly without copying it in memory. Defaults to `read`.
+        """
+        return self.read()
+
+    def fingerprint(self) -> Hashable | None:
+        """Return a cheap-to-compute value that changes whenever the data of the source
+        changes, used to detect stale cache entries. Defaults to None, meaning that the
+        reader cannot detect changes.
+        """
+        return None
+
 
 class LocalFileReader(Reader):
     """Reader implementation that reads data from a local file."""
@@ -34,6 +50,29 @@ class LocalFileReader(Reader):
             result = fp.read()
         return result
 
+    def read_buffer(self) -> Buffer:
+        """Memory-map the file in read-only mode, so that only the pages that are
+        actually accessed are loaded from disk.
+
+        Warning:
+            The content of the buffer is undefined if the file is modified while it is
+            mapped.
+        """
+        with open(self._path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return b""  # Empty files cannot be mapped.
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def fingerprint(self) -> Hashable | None:
+        """Return the modification time in nanoseconds and the size of the file, or
+        None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     @property
     def path(self) -> Path:
         """Return the path to the file being read."""
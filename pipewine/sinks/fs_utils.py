@@ -88,6 +88,7 @@ def write_item_to_file(
         isinstance(item, StoredItem)
         and isinstance(item.reader, LocalFileReader)
         and item.reader.path.is_file()
+        and item.parser.preserves_data
     ):
         src = item.reader.path
         if copy_policy == CopyPolicy.HARD_LINK:
@@ -2,9 +2,11 @@
 
 import os
 import warnings
+from collections.abc import Mapping
 from inspect import get_annotations
 from itertools import chain
 from pathlib import Path
+from typing import Any
 
 from pipewine._op_typing import origin_type
 from pipewine.dataset import Dataset, LazyDataset
@@ -18,15 +20,24 @@ from pipewine.sources.base import DatasetSource
 class UnderfolderSource[T: Sample](DatasetSource[Dataset[T]]):
     """Source that reads the dataset from file system using Pipewine "Underfolder" format."""
 
-    def __init__(self, folder: Path, sample_type: type[T] | None = None) -> None:
+    def __init__(
+        self,
+        folder: Path,
+        sample_type: type[T] | None = None,
+        parser_params: Mapping[str, Mapping[str, Any]] | None = None,
+    ) -> None:
         """
         Args:
             folder (Path): Path to the folder where the dataset is stored.
             sample_type (type[T] | None, optional): Type of the samples to produce.
                 Defaults to None (TypelessSample).
+            parser_params (Mapping[str, Mapping[str, Any]] | None, optional): Additional
+                parameters passed to the constructor of the parser of every file
+                extension, e.g. `{"npy": {"mmap": True}}`. Defaults to None.
         """
         super().__init__()
         self._folder = folder
+        self._parser_params = parser_params or {}
         self._root_files: dict[str, Path] = {}
         self._root_items: dict[str, StoredItem] = {}
         self._sample_files: list[dict[str, Path]] = []
@@ -37,6 +48,13 @@ class UnderfolderSource[T: Sample](DatasetSource[Dataset[T]]):
         """The path to the data folder inside the root folder."""
         return root_folder / "data"
 
+    @classmethod
+    def index_path(cls, root_folder: Path, name: str) -> Path:
+        """The path to a persisted index file (see `KeyIndexOp`) inside the root
+        folder. Index files are hidden, so they are never read as root items.
+        """
+        return root_folder / f".{name}.index.pkl"
+
     @property
     def sample_type(self) -> type[T] | type[TypelessSample]:
         """Type of the samples produced by this source."""
@@ -129,7 +147,7 @@ class UnderfolderSource[T: Sample](DatasetSource[Dataset[T]]):
                 and len(annotation.__args__) > 0
             ):
                 annotated_type = origin_type(annotation.__args__[0])
-        parser = parser_type(type_=annotated_type)
+        parser = parser_type(type_=annotated_type, **self._parser_params.get(ext, {}))
         if k in self._root_files:
             result = StoredItem(reader, parser, shared=True)
             self._root_items[k] = result
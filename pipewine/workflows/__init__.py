@@ -11,7 +11,13 @@ from pipewine.workflows.drawing import (
     ViewGraph,
     ViewNode,
 )
-from pipewine.workflows.events import Event, EventQueue, ProcessSharedEventQueue
+from pipewine.workflows.events import (
+    CacheChoiceEvent,
+    CacheStatsEvent,
+    Event,
+    EventQueue,
+    ProcessSharedEventQueue,
+)
 from pipewine.workflows.execution import SequentialWorkflowExecutor, WorkflowExecutor
 from pipewine.workflows.model import (
     AnyAction,
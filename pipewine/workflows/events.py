@@ -1,12 +1,14 @@
 """Workflow events and queues."""
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from multiprocessing import Queue, get_context
 from queue import Empty
 from typing import Any, cast
 from uuid import uuid1
 
 from pipewine.grabber import InheritedData
+from pipewine.operators.cache import CacheStats
 
 
 class Event:
@@ -15,6 +17,40 @@ class Event:
     pass
 
 
+@dataclass
+class CacheStatsEvent(Event):
+    """Event that reports the statistics of the cache of a node output, emitted by the
+    workflow executor at the end of the workflow. Caches that were sent to other
+    processes, e.g. the grabber workers, are not reported, since the accesses made by
+    those processes are not counted.
+    """
+
+    node: str
+    """The name of the node."""
+    socket: int | str | None
+    """The output socket of the node, or None if the node has a single output."""
+    stats: CacheStats
+    """The statistics of the cache."""
+
+
+@dataclass
+class CacheChoiceEvent(Event):
+    """Event that reports the cache chosen automatically for a node output, emitted by
+    the workflow executor when the node is executed.
+    """
+
+    node: str
+    """The name of the node."""
+    socket: int | str | None
+    """The output socket of the node, or None if the node has a single output."""
+    cache_type: str | None
+    """The name of the chosen cache type, or None if the output is not cached."""
+    cache_params: dict[str, Any]
+    """The parameters passed to the cache constructor."""
+    reason: str
+    """Human-readable explanation of the choice."""
+
+
 class EventQueue(ABC):
     """Base class for event queues, which are used to communicate events between
     the workflow executor and trackers.
@@ -4,27 +4,44 @@ import gc
 from abc import ABC, abstractmethod
 from collections.abc import Mapping, Sequence
 from functools import partial
-from typing import cast
+from typing import Any, cast
 from uuid import uuid1
 
 from pipewine._op_typing import AnyDataset
 from pipewine.bundle import Bundle
 from pipewine.dataset import Dataset
 from pipewine.grabber import Grabber
-from pipewine.operators import CacheOp, DatasetOperator
-from pipewine.operators.cache import LIFOCache
+from pipewine.operators import (
+    CacheOp,
+    CatOp,
+    CycleOp,
+    DatasetOperator,
+    FilterOp,
+    GroupByOp,
+    IndexOp,
+    JoinOp,
+    KeyIndexOp,
+    RepeatOp,
+    ReverseOp,
+    ShuffleOp,
+    SortOp,
+    ZipOp,
+)
+from pipewine.operators.cache import Cache, LIFOCache, LRUCache
 from pipewine.sinks import DatasetSink
 from pipewine.sources import DatasetSource
 from pipewine.workflows.model import (
     All,
     AnyAction,
     Default,
+    Edge,
     Node,
     Proxy,
     UnderfolderCheckpointFactory,
     WfOptions,
     Workflow,
 )
+from pipewine.workflows.events import CacheChoiceEvent, CacheStatsEvent
 from pipewine.workflows.tracking import (
     EventQueue,
     TaskCompleteEvent,
@@ -32,6 +49,24 @@ from pipewine.workflows.tracking import (
     TaskUpdateEvent,
 )
 
+_RANDOM_ACCESS_OPS = (
+    CatOp,
+    CycleOp,
+    FilterOp,
+    GroupByOp,
+    IndexOp,
+    JoinOp,
+    KeyIndexOp,
+    RepeatOp,
+    ReverseOp,
+    ShuffleOp,
+    SortOp,
+    ZipOp,
+)
+"""Operators that access their inputs out of order or more than once."""
+
+_ALL = All()
+
 
 def _on_enter_cb(
     queue: EventQueue | None, node: Node, loop_id: str, total: int
@@ -90,11 +125,49 @@ class WorkflowExecutor(ABC):
 class SequentialWorkflowExecutor(WorkflowExecutor):
     """A workflow executor that executes the actions in a workflow in a sequential
     manner, respecting the dependencies between the nodes.
+
+    When attached to an event queue, at the end of the workflow it emits a
+    `CacheStatsEvent` with the statistics of the cache of every node output. The caches
+    are not kept alive until then: the statistics of the caches garbage collected
+    earlier are a snapshot taken at that time. No event is emitted for the caches that
+    were sent to grabber workers, whose accesses are not counted by the cache of the
+    main process.
+
+    In automatic cache mode, the cache of every node output whose `cache_type` and
+    `cache_params` options are not set is chosen from the structure of the graph:
+
+    - Outputs that are not consumed by any node are not cached.
+    - Outputs consumed by a single node that reads them sequentially are cached with a
+        `LIFOCache` of size 1, like in the default mode.
+    - Outputs consumed by many nodes, or by operators that access them out of order or
+        more than once (e.g. `ZipOp`, `CatOp`, `ShuffleOp` or `SortOp`), are cached with
+        an `LRUCache`. When a memory budget is given, it is split among these caches
+        proportionally to their number of consumers.
+
+    Every choice is reported with a `CacheChoiceEvent` when the node is executed, and
+    the choices of the last execution are available in `cache_choices`.
     """
 
-    def __init__(self) -> None:
-        """Initializes the executor."""
+    def __init__(self, auto_cache: bool = False, memory_budget: int | None = None):
+        """
+        Args:
+            auto_cache (bool, optional): Whether to choose the cache of every node
+                output automatically. Defaults to False.
+            memory_budget (int | None, optional): Overall number of bytes of the caches
+                chosen automatically, only used when `auto_cache` is True. Defaults to
+                None, in which case the caches are bounded by their default number of
+                entries.
+
+        Raises:
+            ValueError: If `memory_budget` is negative.
+        """
         super().__init__()
+        if memory_budget is not None and memory_budget < 0:
+            raise ValueError(f"memory_budget must be non-negative, got {memory_budget}")
+        self._auto_cache = auto_cache
+        self._memory_budget = memory_budget
+        self._cache_weights: dict[Proxy, int] = {}
+        self._cache_choices: list[CacheChoiceEvent] = []
         self._eq: EventQueue | None = None
         self._def_cache = True
         self._def_cache_type = LIFOCache
@@ -104,6 +177,12 @@ class SequentialWorkflowExecutor(WorkflowExecutor):
         self._def_checkpoint_grabber = Grabber()
         self._def_collect_after_checkpoint = True
         self._def_destroy_checkpoints = True
+        self._caches: list[tuple[Proxy, CacheOp]] = []
+
+    @property
+    def cache_choices(self) -> list[CacheChoiceEvent]:
+        """The caches chosen automatically during the last execution, in order."""
+        return list(self._cache_choices)
 
     def attach(self, event_queue: EventQueue) -> None:
         if self._eq is not None:
@@ -169,26 +248,83 @@ class SequentialWorkflowExecutor(WorkflowExecutor):
         if output is None:
             return
         state[Proxy(node, All())] = output
+        outputs: Sequence[tuple[int | str | None, Dataset]]
         if isinstance(output, Dataset):
-            self._handle_output(state, Proxy(node, None), output, id_, wf_opts)
+            outputs = [(None, output)]
         elif isinstance(output, Sequence):
-            for i, dataset in enumerate(output):
-                self._handle_output(state, Proxy(node, i), dataset, id_, wf_opts)
+            outputs = list(enumerate(output))
         elif isinstance(output, Mapping):
-            for k, v in output.items():
-                self._handle_output(state, Proxy(node, k), v, id_, wf_opts)
+            outputs = list(output.items())
         else:
             assert isinstance(output, Bundle)
-            for k, v in output.as_dict().items():
-                self._handle_output(state, Proxy(node, k), v, id_, wf_opts)
+            outputs = list(output.as_dict().items())
+        for socket, dataset in outputs:
+            proxy = Proxy(node, socket)
+            self._handle_output(
+                workflow, state, proxy, dataset, id_, wf_opts, len(outputs)
+            )
+
+    def _consumers(self, workflow: Workflow, proxy: Proxy) -> list[Edge]:
+        return [
+            x
+            for x in workflow.get_outbound_edges(proxy.node)
+            if x.src.socket == proxy.socket or isinstance(x.src.socket, All)
+        ]
+
+    def _compute_cache_weights(self, workflow: Workflow) -> None:
+        # Weight of every output that needs a large cache: its number of consumers.
+        self._cache_weights.clear()
+        for node in workflow.get_nodes():
+            edges = workflow.get_outbound_edges(node)
+            # All() sentinels do not compare equal, use a single one as key.
+            srcs = {
+                _ALL if isinstance(x.src.socket, All) else x.src.socket for x in edges
+            }
+            for socket in srcs:
+                src = Proxy(node, socket)
+                consumers = self._consumers(workflow, src)
+                if len(consumers) > 1 or any(
+                    isinstance(x.dst.node.action, _RANDOM_ACCESS_OPS) for x in consumers
+                ):
+                    self._cache_weights[src] = len(consumers)
+
+    def _choose_cache(
+        self, workflow: Workflow, proxy: Proxy, siblings: int
+    ) -> tuple[type[Cache] | None, dict[str, Any], str]:
+        consumers = self._consumers(workflow, proxy)
+        if len(consumers) == 0:
+            return None, {}, "not consumed by any node"
+        random_access = [
+            type(x.dst.node.action).__name__
+            for x in consumers
+            if isinstance(x.dst.node.action, _RANDOM_ACCESS_OPS)
+        ]
+        if len(consumers) == 1 and not random_access:
+            return LIFOCache, {"maxsize": 1}, "single sequential consumer"
+        if random_access:
+            reason = f"random-access consumers: {', '.join(sorted(random_access))}"
+        else:
+            reason = f"{len(consumers)} consumers"
+        if self._memory_budget is None:
+            return LRUCache, {}, reason
+        weight = self._cache_weights.get(proxy)
+        if weight is None:  # Consumed through all the outputs of the node.
+            weight = self._cache_weights[Proxy(proxy.node, _ALL)]
+            weight /= siblings
+        total = sum(self._cache_weights.values())
+        maxbytes = int(self._memory_budget * weight / total)
+        reason += f", {weight / total:.0%} of the memory budget"
+        return LRUCache, {"maxsize": None, "maxbytes": maxbytes}, reason
 
     def _handle_output(
         self,
+        workflow: Workflow,
         state: dict[Proxy, AnyDataset],
         proxy: Proxy,
         dataset: Dataset,
         id_: str,
         wf_opts: WfOptions,
+        siblings: int,
     ) -> None:
         opts = proxy.node.options
         ckpt = Default.get(
@@ -229,15 +365,32 @@ class SequentialWorkflowExecutor(WorkflowExecutor):
             dataset = source()
 
         cache = Default.get(opts.cache, wf_opts.cache, default=self._def_cache)
-        if cache:
-            cache_type = Default.get(
-                opts.cache_type, wf_opts.cache_type, default=self._def_cache_type
+        cache_type = Default.get(
+            opts.cache_type, wf_opts.cache_type, default=self._def_cache_type
+        )
+        cache_params = Default.get(
+            opts.cache_params, wf_opts.cache_params, default=self._def_cache_params
+        )
+        explicit = [opts.cache_type, wf_opts.cache_type]
+        explicit += [opts.cache_params, wf_opts.cache_params]
+        if cache and self._auto_cache and all(isinstance(x, Default) for x in explicit):
+            auto_type, cache_params, reason = self._choose_cache(
+                workflow, proxy, siblings
             )
-            cache_params = Default.get(
-                opts.cache_params, wf_opts.cache_params, default=self._def_cache_params
+            socket = cast(int | str | None, proxy.socket)
+            name = None if auto_type is None else auto_type.__name__
+            choice = CacheChoiceEvent(
+                proxy.node.name, socket, name, cache_params, reason
             )
+            self._cache_choices.append(choice)
+            if self._eq is not None:
+                self._eq.emit(choice)
+            cache = auto_type is not None
+            cache_type = auto_type or cache_type
+        if cache:
             cache_op = CacheOp(cache_type=cache_type, **{**cache_params})
             dataset = cache_op(dataset)
+            self._caches.append((proxy, cache_op))
 
         state[proxy] = dataset
 
@@ -269,9 +422,21 @@ class SequentialWorkflowExecutor(WorkflowExecutor):
         wf_opts = workflow.options
         sorted_graph = self._topological_sort(workflow)
         state: dict[Proxy, AnyDataset] = {}
+        self._caches.clear()
+        self._cache_choices.clear()
+        if self._auto_cache:
+            self._compute_cache_weights(workflow)
         for node in sorted_graph:
             self._execute_node(workflow, node, state, id_.hex, wf_opts)
 
+        if self._eq is not None:
+            for proxy, cache_op in self._caches:
+                stats = cache_op.stats
+                if stats is not None:
+                    event = CacheStatsEvent(proxy.node.name, proxy.socket, stats)
+                    self._eq.emit(event)
+        self._caches.clear()
+
         for node in workflow.get_nodes():
             opts = node.options
             destroy = Default.get(
@@ -122,7 +122,8 @@ class WfOptions:
     """
     cache_params: dict[str, Any] | Default = field(default_factory=Default)
     """Additional parameters to pass to the cache constructor. This option is only 
-    relevant if `cache` is True.
+    relevant if `cache` is True. E.g. `{"maxbytes": 2**30}` bounds a cache inheriting
+    from `BoundedCache` to approximately 1GB of memory.
     """
     checkpoint: bool | Default = field(default_factory=Default)
     """Whether to create a checkpoint for the node, automatically writing the output
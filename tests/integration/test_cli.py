@@ -1,3 +1,4 @@
+import json
 import sys
 from collections.abc import Mapping, Sequence
 from pathlib import Path
@@ -710,5 +711,139 @@ def test_example_workflow_draw(
     assert result.exit_code == 0
 
 
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_op_join(tmp_path, underfolder, runner: CliRunner, how: str) -> None:
+    input_folder = str(underfolder.folder)
+    output_folder = str(tmp_path / "output")
+    op = MapOp(FormatKeysMapper("*_dup"))
+    input_folder_2 = str(tmp_path / "input_2")
+    UnderfolderSink(Path(input_folder_2))(op(UnderfolderSource(underfolder.folder)()))
+    result = runner.invoke(
+        pipewine_app,
+        [
+            "op",
+            "join",
+            "-i",
+            input_folder,
+            input_folder_2,
+            "-o",
+            output_folder,
+            "-k",
+            "metadata.color",
+            "-K",
+            "metadata_dup.color",
+            "--how",
+            how,
+        ],
+    )
+    assert Path(output_folder).is_dir()
+    assert result.exit_code == 0
+
+
+def test_op_dedup(tmp_path, underfolder, runner: CliRunner) -> None:
+    input_folder = str(underfolder.folder)
+    output_folder = str(tmp_path / "output")
+    duplicates_folder = str(tmp_path / "duplicates")
+    result = runner.invoke(
+        pipewine_app,
+        ["op", "dedup", "-i", input_folder, "-o", output_folder, duplicates_folder],
+    )
+    assert Path(output_folder).is_dir()
+    assert result.exit_code == 0
+
+
+def test_map_hash_raw(tmp_path, underfolder, runner: CliRunner) -> None:
+    input_folder = str(underfolder.folder)
+    output_folder = str(tmp_path / "output")
+    result = runner.invoke(
+        pipewine_app, ["map", "hash", "--raw", "-i", input_folder, "-o", output_folder]
+    )
+    assert Path(output_folder).is_dir()
+    assert result.exit_code == 0
+
+
+def test_op_near_dedup(tmp_path, underfolder, runner: CliRunner) -> None:
+    input_folder = str(underfolder.folder)
+    output_folder = str(tmp_path / "output")
+    duplicates_folder = str(tmp_path / "duplicates")
+    result = runner.invoke(
+        pipewine_app,
+        [
+            "op",
+            "near-dedup",
+            "-i",
+            input_folder,
+            "-o",
+            output_folder,
+            duplicates_folder,
+            "-t",
+            "10",
+            "-m",
+            "difference",
+            "-b",
+            "3",
+        ],
+    )
+    assert Path(output_folder).is_dir()
+    assert result.exit_code == 0
+
+
+def test_bench_cache(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "cache", "-o", str(output), "-n", "100", "-p", "LRU", "-p", "ARC"]
+    result = runner.invoke(pipewine_app, [*args, "-P", "zipfian", "-t", "2"])
+    assert result.exit_code == 0
+    data = json.loads(output.read_text())
+    assert data["metadata"]["accesses"] == 100
+    assert [x["policy"] for x in data["results"]] == ["LRU", "ARC"]
+
+
+def test_bench_cache_fail(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "cache", "-o", str(output), "-p", "LRU", "-P", "unknown"]
+    result = runner.invoke(pipewine_app, args)
+    assert result.exit_code != 0
+    assert not output.exists()
+
+
+def test_bench_contention(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "contention", "-o", str(output), "-p", "LRU", "-S", "1", "-S", "2"]
+    result = runner.invoke(pipewine_app, [*args, "-n", "100", "-t", "2"])
+    assert result.exit_code == 0
+    data = json.loads(output.read_text())
+    assert data["metadata"]["shards"] == [1, 2]
+    assert [x["shards"] for x in data["results"]] == [1, 2]
+
+
+def test_bench_contention_fail(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "contention", "-o", str(output), "-p", "unknown"]
+    result = runner.invoke(pipewine_app, args)
+    assert result.exit_code != 0
+    assert not output.exists()
+
+
+def test_bench_metadata(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "metadata", "-o", str(output), "-f", "json", "-n", "5", "-r", "2"]
+    result = runner.invoke(pipewine_app, args)
+    assert result.exit_code == 0
+    data = json.loads(output.read_text())
+    assert data["metadata"]["backends"]["json"][0] == "stdlib"
+    assert {x["format"] for x in data["results"]} == {"json"}
+    assert {x["backend"] for x in data["results"]} == set(
+        data["metadata"]["backends"]["json"]
+    )
+
+
+def test_bench_metadata_fail(tmp_path, runner: CliRunner) -> None:
+    output = tmp_path / "results.json"
+    args = ["bench", "metadata", "-o", str(output), "-f", "unknown"]
+    result = runner.invoke(pipewine_app, args)
+    assert result.exit_code != 0
+    assert not output.exists()
+
+
 if __name__ == "__main__":
     pipewine_app()
@@ -0,0 +1,168 @@
+import json
+import threading
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pipewine import ARCCache, FIFOCache, LRUCache, MemoCache
+from pipewine.benchmarks import (
+    ACCESS_PATTERNS,
+    CACHE_POLICIES,
+    LatencyStats,
+    benchmark_cache,
+    run_cache_benchmark,
+    run_contention_benchmark,
+    save_results,
+)
+from pipewine.benchmarks.cache import _TimedLock
+
+
+@pytest.mark.parametrize("name", list(ACCESS_PATTERNS))
+@pytest.mark.parametrize("keys", [1, 26])
+def test_access_patterns(name: str, keys: int) -> None:
+    pattern = ACCESS_PATTERNS[name](1000, keys, np.random.default_rng(0))
+    assert len(pattern) == 1000
+    assert all(isinstance(x, int) and 0 <= x < keys for x in pattern)
+    assert pattern == ACCESS_PATTERNS[name](1000, keys, np.random.default_rng(0))
+
+
+class TestLatencyStats:
+    def test_from_samples(self) -> None:
+        stats = LatencyStats.from_samples(list(range(1, 101)))
+        assert stats.count == 100
+        assert stats.mean == 50.5
+        assert stats.p50 == 50.5
+        assert 99 <= stats.p99 <= 100
+        assert stats.max == 100.0
+
+    def test_empty(self) -> None:
+        assert LatencyStats.from_samples([]) == LatencyStats(0, 0.0, 0.0, 0.0, 0.0)
+
+
+class TestTimedLock:
+    def test_contention(self) -> None:
+        lock = _TimedLock(threading.RLock())
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold() -> None:
+            with lock:
+                entered.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait()
+        threading.Timer(0.05, release.set).start()
+        with lock:
+            pass
+        thread.join()
+        assert lock.acquisitions == 2
+        assert lock.contended == 1
+        assert lock.wait_ns > 0
+
+
+class TestBenchmarkCache:
+    @pytest.mark.parametrize("threads", [0, 2])
+    def test_benchmark(self, threads: int) -> None:
+        pattern = [0, 1, 0, 2, 0, 1]
+        result = benchmark_cache(
+            "LRU", partial(LRUCache, maxsize=2), "custom", pattern, 100, threads
+        )
+        assert result.policy == "LRU"
+        assert result.pattern == "custom"
+        assert result.accesses == 6
+        assert result.hit_rate == 2 / 6
+        assert result.get_latency.count == 6
+        assert result.put_latency.count == 4
+        assert result.peak_memory >= 200
+        if threads == 0:
+            assert result.contention is None
+        else:
+            assert result.contention is not None
+            assert result.contention.threads == threads
+            assert result.contention.ops_per_second > 0
+            assert 0 <= result.contention.contended_fraction <= 1
+
+    def test_memory_tracing(self) -> None:
+        tracemalloc.start()
+        try:
+            benchmark_cache("Memo", MemoCache, "custom", list(range(10)), 1000, 0)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_empty_pattern(self) -> None:
+        result = benchmark_cache("Memo", MemoCache, "empty", [], 100, 0)
+        assert result.hit_rate == 0.0
+
+
+class TestRunCacheBenchmark:
+    def test_defaults(self) -> None:
+        results = run_cache_benchmark(accesses=50, threads=0)
+        assert len(results) == len(CACHE_POLICIES) * len(ACCESS_PATTERNS)
+        assert {x.policy for x in results} == set(CACHE_POLICIES)
+        assert {x.pattern for x in results} == set(ACCESS_PATTERNS)
+
+    def test_save_results(self, tmp_path: Path) -> None:
+        results = run_cache_benchmark(
+            policies={"Memo": MemoCache},
+            patterns={"zipfian": ACCESS_PATTERNS["zipfian"]},
+            accesses=100,
+            threads=2,
+        )
+        path = tmp_path / "results.json"
+        save_results(results, path, accesses=100)
+        data = json.loads(path.read_text())
+        assert data["metadata"] == {"accesses": 100}
+        assert len(data["results"]) == 1
+        result = data["results"][0]
+        assert result["policy"] == "Memo"
+        assert result["hit_rate"] == results[0].hit_rate
+        assert result["contention"]["threads"] == 2
+
+
+class TestRunContentionBenchmark:
+    def test_benchmark(self, tmp_path: Path) -> None:
+        results = run_contention_benchmark(
+            policies={"LRU": LRUCache, "ARC": ARCCache},
+            shards=[1, 4],
+            threads=2,
+            accesses=200,
+            keys=50,
+            maxsize=10,
+        )
+        assert [(x.policy, x.shards) for x in results] == [
+            ("LRU", 1),
+            ("LRU", 4),
+            ("ARC", 1),
+            ("ARC", 4),
+        ]
+        for result in results:
+            assert result.contention.threads == 2
+            assert result.contention.ops_per_second > 0
+        path = tmp_path / "results.json"
+        save_results(results, path)
+        data = json.loads(path.read_text())
+        assert data["results"][1]["shards"] == 4
+
+    def test_lock_acquisitions(self) -> None:
+        results = run_contention_benchmark(
+            policies={"LRU": LRUCache, "FIFO": FIFOCache},
+            shards=[1],
+            threads=2,
+            accesses=200,
+            keys=10,
+            maxsize=10,
+        )
+        # LRU acquires the lock on every get and put, FIFO only on the 10 puts.
+        lru, fifo = [x.contention for x in results]
+        assert lru.lock_acquisitions >= 2 * 200
+        assert fifo.lock_acquisitions <= 2 * 10
+
+    def test_defaults(self) -> None:
+        results = run_contention_benchmark(shards=[2], threads=2, accesses=20)
+        assert [x.policy for x in results] == list(CACHE_POLICIES)
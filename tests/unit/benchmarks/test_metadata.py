@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from pipewine import JSONParser, MetadataBackendRegistry
+from pipewine.benchmarks import (
+    METADATA_FORMATS,
+    benchmark_metadata_backend,
+    make_metadata,
+    run_metadata_benchmark,
+    save_results,
+)
+
+
+def test_make_metadata() -> None:
+    data = make_metadata(10, np.random.default_rng(0))
+    assert len(data["objects"]) == 10
+    assert data == make_metadata(10, np.random.default_rng(0))
+    assert JSONParser().parse(JSONParser().dump(data)) == data
+
+
+def test_benchmark_metadata_backend() -> None:
+    data = make_metadata(5, np.random.default_rng(0))
+    backend = MetadataBackendRegistry.get("yaml", "python")
+    result = benchmark_metadata_backend("yaml", "python", backend, data, repeats=7)
+    assert (result.format, result.backend) == ("yaml", "python")
+    assert result.nbytes == len(backend.dump(data))
+    assert result.load_latency.count == result.dump_latency.count == 7
+    assert result.load_latency.mean > 0
+
+
+class TestRunMetadataBenchmark:
+    def test_benchmark(self, tmp_path: Path) -> None:
+        results = run_metadata_benchmark(
+            backends={"json": ["stdlib"], "yaml": ["python"]}, objects=3, repeats=5
+        )
+        assert [(x.format, x.backend) for x in results] == [
+            ("json", "stdlib"),
+            ("yaml", "python"),
+        ]
+        path = tmp_path / "results.json"
+        save_results(results, path, objects=3)
+        data = json.loads(path.read_text())
+        assert data["metadata"] == {"objects": 3}
+        assert data["results"][1]["load_latency"]["count"] == 5
+
+    def test_defaults(self) -> None:
+        results = run_metadata_benchmark(objects=1, repeats=1)
+        assert [(x.format, x.backend) for x in results] == [
+            (k, x) for k in METADATA_FORMATS for x in MetadataBackendRegistry.names(k)
+        ]
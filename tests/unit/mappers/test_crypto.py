@@ -1,8 +1,18 @@
+from pathlib import Path
 from typing import Any
 
 import pytest
 
-from pipewine import HashedSample, HashMapper
+from pipewine import (
+    CachedItem,
+    HashedSample,
+    HashMapper,
+    LocalFileReader,
+    MemoryItem,
+    StoredItem,
+    TypelessSample,
+    YAMLParser,
+)
 
 
 class TestHashMapper:
@@ -46,3 +56,22 @@ class TestHashMapper:
     def test_init_fail(self, algo: str) -> None:
         with pytest.raises(ValueError):
             HashMapper(algorithm=algo)
+
+    @pytest.mark.parametrize("algo", ["sha256", "md5", "xxh64", "xxh3_128"])
+    def test_call_raw(self, tmp_path: Path, algo: str) -> None:
+        path_a, path_b = tmp_path / "a.txt", tmp_path / "b.txt"
+        path_a.write_text("hello")
+        path_b.write_text("world")
+        parser = YAMLParser(type_=str)
+        stored_a = StoredItem(LocalFileReader(path_a), parser)
+        stored_b = StoredItem(LocalFileReader(path_b), parser)
+        mapper = HashMapper(algorithm=algo, raw=True)
+        out_a = mapper(0, TypelessSample(a=stored_a, m=MemoryItem("m", parser)))
+        out_a2 = mapper(
+            0, TypelessSample(a=CachedItem(stored_a), m=MemoryItem("m", parser))
+        )
+        out_b = mapper(0, TypelessSample(a=stored_b, m=MemoryItem("m", parser)))
+        out_m = mapper(0, TypelessSample(a=stored_a, m=MemoryItem("n", parser)))
+        assert out_a.hash() == out_a2.hash()
+        assert out_a.hash() != out_b.hash()
+        assert out_a.hash() != out_m.hash()
@@ -1,14 +1,23 @@
+from collections.abc import Iterable
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pytest
 
 from pipewine import (
+    CachedItem,
     ConvertMapper,
+    JpegParser,
+    LocalFileReader,
     MemoryItem,
+    NumpyNpyParser,
     Parser,
     PickleParser,
     Sample,
     ShareMapper,
+    StoredItem,
+    ThumbnailMapper,
     TypelessSample,
     YAMLParser,
 )
@@ -96,3 +105,67 @@ class TestShareMapper:
     def test_raises(self) -> None:
         with pytest.raises(ValueError):
             ShareMapper(["a", "b", "c"], ["d", "b", "e"])
+
+
+class _QualityParser(JpegParser):
+    def __init__(self, quality: int, reduce: int = 1) -> None:
+        super().__init__(reduce=reduce)
+        self.quality = quality
+
+    @classmethod
+    def extensions(cls) -> Iterable[str]:
+        return []
+
+
+class TestThumbnailMapper:
+    def test_stored(self, tmp_path: Path) -> None:
+        path = tmp_path / "image.jpg"
+        path.write_bytes(JpegParser().dump(np.zeros((40, 70, 3), dtype=np.uint8)))
+        item = StoredItem(LocalFileReader(path), JpegParser(reduce=2), shared=True)
+        sample = TypelessSample(image=CachedItem(item), other=item)
+        re_sample = ThumbnailMapper(factor=4)(0, sample)
+        re_item = re_sample["image"]
+        assert isinstance(re_item, StoredItem)
+        assert isinstance(re_item.parser, JpegParser)
+        assert re_item.parser.reduce == 8
+        assert re_item.is_shared
+        assert re_item().shape == (5, 9, 3)
+        assert re_sample["other"] is item
+
+    def test_memory(self) -> None:
+        image = np.arange(5 * 6, dtype=np.float32).reshape(5, 6)
+        sample = TypelessSample(image=MemoryItem(image, NumpyNpyParser()))
+        re_item = ThumbnailMapper(factor=3)(0, sample)["image"]
+        assert isinstance(re_item, MemoryItem)
+        assert isinstance(re_item.parser, NumpyNpyParser)
+        assert np.allclose(re_item(), [[7.0, 10.0], [22.0, 25.0]])
+
+    def test_stored_not_image(self, tmp_path: Path) -> None:
+        image = np.arange(5 * 6, dtype=np.float32).reshape(5, 6)
+        path = tmp_path / "image.npy"
+        path.write_bytes(NumpyNpyParser().dump(image))
+        item = StoredItem(LocalFileReader(path), NumpyNpyParser())
+        re_sample = ThumbnailMapper(factor=3, keys=["image", "mask"])(
+            0, TypelessSample(image=item)
+        )
+        assert list(re_sample.keys()) == ["image"]
+        re_item = re_sample["image"]
+        assert isinstance(re_item, MemoryItem)
+        assert np.allclose(re_item(), [[7.0, 10.0], [22.0, 25.0]])
+
+    def test_stored_parser_options(self, tmp_path: Path) -> None:
+        path = tmp_path / "image.jpg"
+        path.write_bytes(JpegParser().dump(np.zeros((40, 70, 3), dtype=np.uint8)))
+        parser = _QualityParser(quality=50)
+        sample = TypelessSample(image=StoredItem(LocalFileReader(path), parser))
+        re_parser = ThumbnailMapper(factor=2)(0, sample)["image"].parser
+        assert isinstance(re_parser, _QualityParser)
+        assert (re_parser.quality, re_parser.reduce) == (50, 2)
+
+    def test_identity(self) -> None:
+        sample = TypelessSample(image=MemoryItem(np.zeros((3, 3)), NumpyNpyParser()))
+        assert ThumbnailMapper(factor=1)(0, sample) is sample
+
+    def test_raises(self) -> None:
+        with pytest.raises(ValueError):
+            ThumbnailMapper(factor=0)
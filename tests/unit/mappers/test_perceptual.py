@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from pipewine import (
+    MemoryItem,
+    NumpyNpyParser,
+    PerceptualHashedSample,
+    PerceptualHashMapper,
+    TypelessSample,
+)
+
+
+def _make_sample(image: np.ndarray) -> TypelessSample:
+    return TypelessSample(image=MemoryItem(image, NumpyNpyParser()))
+
+
+class TestPerceptualHashMapper:
+    @pytest.mark.parametrize("method", ["average", "difference"])
+    @pytest.mark.parametrize("size", [4, 8, 11])
+    @pytest.mark.parametrize("shape", [(64, 48, 3), (30, 50), (5, 7, 1)])
+    def test_call(self, method, size: int, shape: tuple[int, ...]) -> None:
+        rng = np.random.default_rng(42)
+        image = rng.integers(0, 256, shape, dtype=np.uint8)
+        mapper = PerceptualHashMapper(method=method, size=size)
+        out = mapper(0, _make_sample(image))
+        assert isinstance(out, PerceptualHashedSample)
+        assert len(bytes.fromhex(out.phash())) == -(-(size**2) // 8)
+
+        darker = image.astype(np.float32) * 0.5
+        assert mapper(0, _make_sample(darker)).phash() == out.phash()
+        assert mapper(0, _make_sample(255 - image)).phash() != out.phash()
+
+    def test_call_key(self) -> None:
+        image = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        sample = TypelessSample(other=MemoryItem(image, NumpyNpyParser()))
+        out = PerceptualHashMapper(key="other", size=2)(0, sample)
+        assert out.phash() == "30"
+
+    @pytest.mark.parametrize(
+        ["method", "size"], [("WRONG", 8), ("average", 0), ("difference", -1)]
+    )
+    def test_init_fail(self, method, size: int) -> None:
+        with pytest.raises(ValueError):
+            PerceptualHashMapper(method=method, size=size)
+
+    def test_call_fail(self) -> None:
+        mapper = PerceptualHashMapper()
+        with pytest.raises(ValueError):
+            mapper(0, _make_sample(np.zeros((4, 4, 3, 2))))
+
+    @pytest.mark.parametrize("method", ["average", "difference"])
+    def test_hash_batch(self, method) -> None:
+        rng = np.random.default_rng(42)
+        shapes = [(32, 32, 3), (20, 30), (32, 32, 3), (20, 30), (32, 32)]
+        images = [rng.integers(0, 256, shape, dtype=np.uint8) for shape in shapes]
+        mapper = PerceptualHashMapper(method=method)
+        expected = [mapper(0, _make_sample(image)).phash() for image in images]
+        assert mapper.hash_batch(images) == expected
+        assert mapper.hash_batch([]) == []
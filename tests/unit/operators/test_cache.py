@@ -1,24 +1,59 @@
+import gc
+import os
 import pickle
 import random
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+from collections.abc import Hashable
+from pathlib import Path
+from types import SimpleNamespace
 from typing import Any, Literal, NamedTuple
 
+import numpy as np
 import pytest
 
 from pipewine import (
+    ARCCache,
+    BoundedCache,
     Cache,
     CacheOp,
+    CacheStats,
+    ClockCache,
+    CompressedCache,
     Dataset,
+    DiskCache,
     FIFOCache,
+    Grabber,
+    GreedyDualSizeCache,
+    JSONParser,
+    LFUCache,
     LIFOCache,
+    ListDataset,
+    LocalFileReader,
     LRUCache,
     MemoCache,
     MRUCache,
     RRCache,
+    ShardedCache,
+    SharedCache,
+    TieredCache,
+    TwoQCache,
     TypelessSample,
+    WTinyLFUCache,
     ItemCacheOp,
     CachedItem,
     MemorizeEverythingOp,
+    MemoryItem,
+    PickleParser,
+    PrefetchOp,
+    Reader,
+    Sample,
+    StoredItem,
+    estimate_nbytes,
 )
+from pipewine.grabber import InheritedData
+from pipewine.operators import cache as cache_module
 
 
 class CacheCall(NamedTuple):
@@ -421,6 +456,584 @@ class TestMRUCache(TestCache):
         self._test_cache(cache, calls)
 
 
+class TestClockCache(TestCache):
+    @pytest.mark.parametrize(
+        ["maxlen", "calls"],
+        [
+            [
+                3,
+                [
+                    CacheCall("put", ["a", 10], None),
+                    CacheCall("put", ["b", 20], None),
+                    CacheCall("put", ["c", 30], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("put", ["d", 40], None),
+                    CacheCall("get", ["b"], None),
+                    CacheCall("put", ["e", 50], None),
+                    CacheCall("get", ["c"], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("get", ["d"], 40),
+                    CacheCall("put", ["d", 60], None),
+                    CacheCall("get", ["d"], 60),
+                    CacheCall("get", ["e"], 50),
+                    CacheCall("clear", [], None),
+                    CacheCall("get", ["a"], None),
+                    CacheCall("get", ["d"], None),
+                ],
+            ],
+        ],
+    )
+    def test_clock_cache(self, maxlen: int, calls: list[CacheCall]) -> None:
+        cache: ClockCache[str, int] = ClockCache(maxlen)
+        self._test_cache(cache, calls)
+
+
+class TestLFUCache(TestCache):
+    @pytest.mark.parametrize(
+        ["maxlen", "calls"],
+        [
+            [
+                3,
+                [
+                    CacheCall("put", ["a", 10], None),
+                    CacheCall("put", ["b", 20], None),
+                    CacheCall("put", ["c", 30], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("get", ["b"], 20),
+                    CacheCall("put", ["d", 40], None),
+                    CacheCall("get", ["c"], None),
+                    CacheCall("put", ["b", 50], None),
+                    CacheCall("put", ["e", 60], None),
+                    CacheCall("get", ["d"], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("get", ["b"], 50),
+                    CacheCall("get", ["e"], 60),
+                    CacheCall("clear", [], None),
+                    CacheCall("get", ["a"], None),
+                    CacheCall("get", ["e"], None),
+                ],
+            ],
+        ],
+    )
+    def test_lfu_cache(self, maxlen: int, calls: list[CacheCall]) -> None:
+        cache: LFUCache[str, int] = LFUCache(maxlen)
+        self._test_cache(cache, calls)
+
+    @pytest.mark.parametrize(["aging_period", "evicted"], [[4, True], [1000, False]])
+    def test_aging(self, aging_period: int, evicted: bool) -> None:
+        cache: LFUCache[str, int] = LFUCache(maxsize=2, aging_period=aging_period)
+        cache.put("a", 0)
+        for _ in range(20):
+            cache.get("a")
+        for i in range(20):
+            key = "bc"[i % 2]
+            if cache.get(key) is None:
+                cache.put(key, i)
+        assert (cache.get("a") is None) == evicted
+
+    def test_init_fail(self) -> None:
+        with pytest.raises(ValueError):
+            LFUCache(aging_period=0)
+
+
+class TestTwoQCache(TestCache):
+    @pytest.mark.parametrize(
+        ["maxlen", "calls"],
+        [
+            [
+                4,
+                [
+                    CacheCall("put", ["a", 10], None),
+                    CacheCall("put", ["b", 20], None),
+                    CacheCall("put", ["c", 30], None),
+                    CacheCall("put", ["d", 40], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("put", ["a", 50], None),
+                    CacheCall("put", ["e", 60], None),
+                    CacheCall("put", ["f", 70], None),
+                    CacheCall("put", ["g", 80], None),
+                    CacheCall("get", ["a"], None),
+                    CacheCall("get", ["b"], None),
+                    CacheCall("put", ["b", 90], None),
+                    CacheCall("put", ["h", 100], None),
+                    CacheCall("put", ["i", 110], None),
+                    CacheCall("put", ["j", 120], None),
+                    CacheCall("put", ["k", 130], None),
+                    CacheCall("get", ["b"], 90),
+                    CacheCall("put", ["b", 140], None),
+                    CacheCall("get", ["b"], 140),
+                    CacheCall("get", ["e"], None),
+                    CacheCall("clear", [], None),
+                    CacheCall("get", ["b"], None),
+                ],
+            ],
+        ],
+    )
+    def test_2q_cache(self, maxlen: int, calls: list[CacheCall]) -> None:
+        cache: TwoQCache[str, int] = TwoQCache(maxlen)
+        self._test_cache(cache, calls)
+
+
+class TestARCCache(TestCache):
+    @pytest.mark.parametrize(
+        ["maxlen", "calls"],
+        [
+            [
+                2,
+                [
+                    CacheCall("put", ["a", 10], None),
+                    CacheCall("put", ["b", 20], None),
+                    CacheCall("get", ["a"], 10),
+                    CacheCall("put", ["c", 30], None),
+                    CacheCall("get", ["b"], None),
+                    CacheCall("put", ["b", 40], None),
+                    CacheCall("get", ["a"], None),
+                    CacheCall("get", ["b"], 40),
+                    CacheCall("get", ["c"], 30),
+                    CacheCall("put", ["a", 50], None),
+                    CacheCall("get", ["b"], None),
+                    CacheCall("put", ["c", 60], None),
+                    CacheCall("get", ["c"], 60),
+                    CacheCall("get", ["a"], 50),
+                    CacheCall("put", ["d", 70], None),
+                    CacheCall("put", ["d", 80], None),
+                    CacheCall("get", ["d"], 80),
+                    CacheCall("clear", [], None),
+                    CacheCall("get", ["a"], None),
+                    CacheCall("get", ["d"], None),
+                ],
+            ],
+        ],
+    )
+    def test_arc_cache(self, maxlen: int, calls: list[CacheCall]) -> None:
+        cache: ARCCache[str, int] = ARCCache(maxlen)
+        self._test_cache(cache, calls)
+
+
+class TestWTinyLFUCache(TestCache):
+    @pytest.mark.parametrize(
+        ["maxlen", "calls"],
+        [
+            [
+                3,
+                [
+                    CacheCall("get", [0], None),
+                    CacheCall("put", [0, 10], None),
+                    CacheCall("get", [0], 10),
+                    CacheCall("get", [1], None),
+                    CacheCall("put", [1, 20], None),
+                    CacheCall("get", [0], 10),
+                    CacheCall("get", [2], None),
+                    CacheCall("put", [2, 30], None),
+                    CacheCall("get", [3], None),
+                    CacheCall("put", [3, 40], None),
+                    CacheCall("get", [2], None),
+                    CacheCall("get", [3], 40),
+                    CacheCall("put", [3, 50], None),
+                    CacheCall("get", [0], 10),
+                    CacheCall("get", [4], None),
+                    CacheCall("put", [4, 60], None),
+                    CacheCall("get", [1], None),
+                    CacheCall("get", [3], 50),
+                    CacheCall("get", [4], 60),
+                    CacheCall("get", [0], 10),
+                    CacheCall("clear", [], None),
+                    CacheCall("get", [0], None),
+                ],
+            ],
+        ],
+    )
+    def test_w_tinylfu_cache(self, maxlen: int, calls: list[CacheCall]) -> None:
+        cache: WTinyLFUCache[int, int] = WTinyLFUCache(maxlen)
+        self._test_cache(cache, calls)
+
+    def test_sketch_aging(self) -> None:
+        cache: WTinyLFUCache[int, int] = WTinyLFUCache(maxsize=2)
+        for _ in range(10):
+            cache.get(0)
+        assert cache._sketch.estimate(0) == 10
+        for i in range(1000):
+            cache.get(i + 1)
+        assert cache._sketch.estimate(0) < 10
+
+    @pytest.mark.parametrize("maxsize", [1, 2])
+    def test_small(self, maxsize: int) -> None:
+        cache: WTinyLFUCache[int, int] = WTinyLFUCache(maxsize=maxsize)
+        for i in range(10):
+            cache.put(i, i)
+            assert cache.get(i) == i
+        assert sum(cache.get(i) is not None for i in range(10)) == maxsize
+        assert cache.stats.evictions == 10 - maxsize
+
+
+class TestGreedyDualSizeCache(TestCache):
+    def _array(self, nbytes: int) -> np.ndarray:
+        return np.zeros(nbytes, dtype=np.uint8)
+
+    def test_cost(self) -> None:
+        cache: GreedyDualSizeCache[str, np.ndarray] = GreedyDualSizeCache(maxsize=2)
+        cache.put("a", self._array(100), cost=1)
+        cache.put("b", self._array(100), cost=10)
+        cache.put("c", self._array(100), cost=5)
+        assert cache.get("a") is None
+        cache.put("d", self._array(100), cost=5)
+        assert [k for k in "abcd" if cache.get(k) is not None] == ["b", "d"]
+        self._test_cache(cache, [CacheCall("clear", [], None)])
+        assert cache.get("b") is None
+
+    def test_size(self) -> None:
+        cache: GreedyDualSizeCache[str, np.ndarray] = GreedyDualSizeCache(maxsize=2)
+        cache.put("big", self._array(1000))
+        cache.put("a", self._array(10))
+        cache.put("b", self._array(10))
+        assert cache.get("big") is None
+        assert cache.get("a") is not None and cache.get("b") is not None
+
+    @pytest.mark.parametrize("access", [True, False])
+    def test_inflation(self, access: bool) -> None:
+        cache: GreedyDualSizeCache[int, np.ndarray] = GreedyDualSizeCache(maxsize=2)
+        cache.put(-1, self._array(100), cost=10)
+        for i in range(100):
+            cache.put(i, self._array(100), cost=1)
+            if access:
+                cache.get(-1)
+        assert (cache.get(-1) is not None) == access
+
+    def test_update(self) -> None:
+        cache: GreedyDualSizeCache[str, int] = GreedyDualSizeCache(maxsize=2)
+        cache.put("a", 10, cost=100)
+        cache.put("b", 20, cost=1)
+        cache.put("a", 30, cost=0.5)
+        cache.put("c", 40, cost=100)
+        assert [cache.get(k) for k in "abc"] == [None, 20, 40]
+
+    def test_many_accesses(self) -> None:
+        cache: GreedyDualSizeCache[int, int] = GreedyDualSizeCache(maxsize=3)
+        for i in range(3):
+            cache.put(i, i, cost=i + 1)
+        for _ in range(100):
+            assert [cache.get(i) for i in range(3)] == [0, 1, 2]
+        cache.put(3, 3)
+        assert cache.get(0) is None
+
+    def test_hit_size(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache: GreedyDualSizeCache[int, np.ndarray] = GreedyDualSizeCache(maxsize=2)
+        calls: list[Any] = []
+        estimate = cache_module.estimate_nbytes
+        monkeypatch.setattr(
+            cache_module, "estimate_nbytes", lambda x: calls.append(x) or estimate(x)
+        )
+        cache.put(0, self._array(100), cost=100)
+        cache.put(1, self._array(10))
+        for _ in range(10):
+            assert cache.get(0) is not None and cache.get(1) is not None
+        assert len(calls) == 2
+        cache.put(2, self._array(10))
+        assert cache.get(0) is not None and cache.get(1) is None
+
+    def test_maxbytes(self) -> None:
+        cache: GreedyDualSizeCache[str, np.ndarray] = GreedyDualSizeCache(
+            maxsize=None, maxbytes=250
+        )
+        cache.put("a", self._array(100), cost=10)
+        cache.put("b", self._array(100), cost=1)
+        cache.put("c", self._array(100), cost=5)
+        assert [k for k in "abc" if cache.get(k) is not None] == ["a", "c"]
+        assert cache.nbytes == 200
+
+
+class TestEvictionPolicies:
+    @pytest.mark.parametrize(
+        ["cache_type", "resistant"],
+        [
+            [LRUCache, False],
+            [LFUCache, True],
+            [TwoQCache, True],
+            [ARCCache, True],
+            [WTinyLFUCache, True],
+        ],
+    )
+    def test_hot_keys_survive_scans(
+        self, cache_type: type[BoundedCache], resistant: bool
+    ) -> None:
+        cache = cache_type(maxsize=10)
+        scan_key = 1000
+        for _ in range(50):
+            keys = list(range(5)) * 2 + list(range(scan_key, scan_key + 8))
+            scan_key += 8
+            for key in keys:
+                if cache.get(key) is None:
+                    cache.put(key, key)
+        hot = [key for key in range(5) if cache.get(key) is not None]
+        assert (len(hot) == 5) == resistant
+
+    @pytest.mark.parametrize(
+        "cache_type",
+        [
+            ClockCache,
+            LFUCache,
+            TwoQCache,
+            ARCCache,
+            WTinyLFUCache,
+            GreedyDualSizeCache,
+        ],
+    )
+    @pytest.mark.parametrize(
+        ["maxsize", "maxbytes"], [[8, None], [None, 800], [8, 500]]
+    )
+    def test_skewed_access(
+        self, cache_type: type[BoundedCache], maxsize: int | None, maxbytes: int | None
+    ) -> None:
+        rng = random.Random(42)
+        cache = cache_type(maxsize=maxsize, maxbytes=maxbytes)
+        for _ in range(2000):
+            key = min(int(rng.paretovariate(0.5)), 100)
+            value = cache.get(key)
+            if value is None:
+                cache.put(key, np.full(100, key, dtype=np.uint8))
+            else:
+                assert value[0] == key
+            assert cache.nbytes <= (100 * maxsize if maxbytes is None else maxbytes)
+        cached = [key for key in range(101) if cache.get(key) is not None]
+        assert 0 < len(cached) <= 8
+
+
+class _FakeReader(Reader):
+    def __init__(self, data: np.ndarray) -> None:
+        self._data = data
+
+    def read(self) -> bytes:
+        return pickle.dumps(self._data)
+
+
+def _stored_array(nbytes: int) -> StoredItem:
+    return StoredItem(_FakeReader(np.zeros(nbytes, dtype=np.uint8)), PickleParser())
+
+
+class TestEstimateNbytes:
+    def test_array(self) -> None:
+        assert estimate_nbytes(np.zeros((10, 10), dtype=np.float32)) == 400
+
+    def test_memoryview(self) -> None:
+        assert estimate_nbytes(memoryview(bytes(123))) == 123
+
+    def test_collections(self) -> None:
+        array = np.zeros(1000, dtype=np.uint8)
+        for obj in [[array], (array, 1), {array.tobytes()}, {"a": array}]:
+            assert estimate_nbytes(obj) >= 1000
+        assert estimate_nbytes([array, array]) < 2000
+
+    def test_items(self) -> None:
+        array = np.zeros(1000, dtype=np.uint8)
+        assert estimate_nbytes(MemoryItem(array, PickleParser())) == 1000
+        stored = _stored_array(1000)
+        assert estimate_nbytes(stored) == 0
+        cached = CachedItem(stored)
+        assert estimate_nbytes(cached) == 0
+        cached()
+        assert estimate_nbytes(cached) == 1000
+        assert estimate_nbytes(CachedItem(MemoryItem(array, PickleParser()))) == 1000
+
+    def test_sample(self) -> None:
+        array = np.zeros(1000, dtype=np.uint8)
+        sample = TypelessSample(
+            a=MemoryItem(array, PickleParser()),
+            b=MemoryItem(np.zeros(500, dtype=np.uint8), PickleParser()),
+            c=_stored_array(1000),
+        )
+        assert estimate_nbytes(sample) == 1500
+
+
+class TestBoundedCache:
+    @pytest.mark.parametrize(
+        ["cache_type", "expected"],
+        [
+            [FIFOCache, ["c", "d", "e"]],
+            [LIFOCache, ["a", "b", "e"]],
+            [LRUCache, ["a", "d", "e"]],
+            [MRUCache, ["b", "c", "e"]],
+        ],
+    )
+    @pytest.mark.parametrize("maxsize", [None, 3, 100])
+    def test_maxbytes(
+        self, cache_type: type[BoundedCache], expected: list[str], maxsize: int | None
+    ) -> None:
+        cache = cache_type(maxsize=maxsize, maxbytes=350)
+        for key in "abcd":
+            cache.put(key, np.zeros(100, dtype=np.uint8))
+            if key == "c":
+                cache.get("a")
+        cache.put("e", np.zeros(100, dtype=np.uint8))
+        assert [k for k in "abcde" if cache.get(k) is not None] == expected
+        assert cache.nbytes == 300
+        re_cache = pickle.loads(pickle.dumps(cache))
+        assert re_cache.nbytes == 300
+
+    def test_maxbytes_rr(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(random, "randint", _MockRandint())
+        cache: RRCache[str, np.ndarray] = RRCache(maxsize=None, maxbytes=350)
+        for key in "abcde":
+            cache.put(key, np.zeros(100, dtype=np.uint8))
+        assert [k for k in "abcde" if cache.get(k) is not None] == ["c", "d", "e"]
+        assert cache.nbytes == 300
+
+    @pytest.mark.parametrize(
+        "cache_type",
+        [
+            RRCache,
+            FIFOCache,
+            LIFOCache,
+            LRUCache,
+            MRUCache,
+            ClockCache,
+            LFUCache,
+            TwoQCache,
+            ARCCache,
+            WTinyLFUCache,
+            GreedyDualSizeCache,
+        ],
+    )
+    def test_maxbytes_variable_size(self, cache_type: type[BoundedCache]) -> None:
+        cache = cache_type(maxsize=None, maxbytes=1000)
+        cache.put("a", np.zeros(300, dtype=np.uint8))
+        cache.put("b", np.zeros(300, dtype=np.uint8))
+        cache.put("big", np.zeros(2000, dtype=np.uint8))
+        assert cache.get("big") is None
+        cache.put("c", np.zeros(900, dtype=np.uint8))
+        assert cache.get("c") is not None
+        assert cache.nbytes == 900
+        cache.put("c", np.zeros(100, dtype=np.uint8))
+        cache.put("d", np.zeros(800, dtype=np.uint8))
+        assert cache.nbytes == 900
+        assert cache.get("c") is not None and cache.get("d") is not None
+        cache.clear()
+        assert cache.nbytes == 0
+        assert cache.get("c") is None
+
+    @pytest.mark.parametrize(
+        "cache_type",
+        [
+            RRCache,
+            FIFOCache,
+            LIFOCache,
+            LRUCache,
+            MRUCache,
+            ClockCache,
+            LFUCache,
+            TwoQCache,
+            ARCCache,
+            WTinyLFUCache,
+            GreedyDualSizeCache,
+        ],
+    )
+    def test_maxsize(self, cache_type: type[BoundedCache]) -> None:
+        cache = cache_type(maxsize=2, maxbytes=1000)
+        for key in "abc":
+            cache.put(key, np.zeros(100, dtype=np.uint8))
+        assert len([k for k in "abc" if cache.get(k) is not None]) == 2
+        assert cache.nbytes == 200
+
+    def test_maxsize_none(self) -> None:
+        cache: FIFOCache[int, int] = FIFOCache(maxsize=None)
+        for i in range(100):
+            cache.put(i, i)
+        assert all(cache.get(i) == i for i in range(100))
+        assert cache.nbytes == sum(estimate_nbytes(i) for i in range(100))
+
+    def test_lazy_items(self) -> None:
+        cache: LRUCache[str, TypelessSample] = LRUCache(maxsize=None, maxbytes=1500)
+        samples = {k: TypelessSample(x=CachedItem(_stored_array(1000))) for k in "abc"}
+        cache.put("a", samples["a"])
+        cache.put("b", samples["b"])
+        assert cache.nbytes == 0
+        samples["b"]["x"]()
+        assert cache.nbytes == 1000
+        samples["a"]["x"]()
+        assert cache.get("a") is None
+        assert cache.get("b") is samples["b"]
+        assert cache.nbytes == 1000
+        cache.put("c", samples["c"])
+        assert cache.get("b") is samples["b"]
+        assert cache.get("c") is samples["c"]
+        assert cache.nbytes == 1000
+
+    @pytest.mark.parametrize("maxbytes", [None, 5000])
+    def test_lazy_items_partial(self, maxbytes: int | None) -> None:
+        cache: LRUCache[str, TypelessSample] = LRUCache(maxbytes=maxbytes)
+        sample = TypelessSample(
+            x=CachedItem(_stored_array(1000)), y=CachedItem(_stored_array(500))
+        )
+        cache.put("a", sample)
+        sample["x"]()
+        assert cache.nbytes == 1000
+        sample["y"]()
+        assert cache.nbytes == 1500
+
+    def test_lazy_items_replaced(self) -> None:
+        cache: LRUCache[str, TypelessSample] = LRUCache(maxsize=None, maxbytes=1500)
+        old = TypelessSample(x=CachedItem(_stored_array(1000)))
+        cache.put("a", old)
+        cache.put("a", TypelessSample(x=CachedItem(_stored_array(500))))
+        old["x"]()
+        assert cache.nbytes == 0
+
+    def test_lazy_items_pickle(self) -> None:
+        cache: LRUCache[str, TypelessSample] = LRUCache(maxsize=None, maxbytes=1500)
+        cache.put("a", TypelessSample(x=CachedItem(_stored_array(1000))))
+        re_cache = pickle.loads(pickle.dumps(cache))
+        re_cache.get("a")["x"]()
+        assert re_cache.nbytes == 1000
+        assert cache.nbytes == 0
+
+    @pytest.mark.parametrize(
+        ["cache_type", "lock_free"],
+        [
+            [RRCache, True],
+            [FIFOCache, True],
+            [LIFOCache, True],
+            [LRUCache, False],
+            [ClockCache, False],
+            [LFUCache, False],
+        ],
+    )
+    def test_lock_free_get(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        cache_type: type[BoundedCache],
+        lock_free: bool,
+    ) -> None:
+        cache = cache_type(maxsize=2)
+        cache.put(0, 10)
+        held = []
+        get = cache._get
+
+        def _get(key: int) -> int | None:
+            held.append(locks[0].depth > 0)
+            return get(key)
+
+        monkeypatch.setattr(cache, "_get", _get)
+        with cache.instrument_locks(_CountingLock) as locks:
+            assert cache.get(0) == 10 and cache.get(1) is None
+        assert held == [not lock_free] * 2
+        assert locks[0].acquisitions == (0 if lock_free else 2)
+        assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+    def test_init_fail(self) -> None:
+        with pytest.raises(ValueError):
+            LRUCache(maxbytes=-1)
+
+
+class _CountingFileReader(LocalFileReader):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.fingerprint_called = 0
+
+    def fingerprint(self) -> Hashable | None:
+        self.fingerprint_called += 1
+        return super().fingerprint()
+
+
 class MyDataset(Dataset[TypelessSample]):
     def __init__(self) -> None:
         super().__init__()
@@ -437,6 +1050,548 @@ class MyDataset(Dataset[TypelessSample]):
         return 10
 
 
+class SlowDataset(MyDataset):
+    def get_sample(self, idx: int) -> TypelessSample:
+        if idx == 0:
+            time.sleep(0.05)
+        return super().get_sample(idx)
+
+
+class _SlowReader(Reader):
+    def __init__(self, delay: float) -> None:
+        self._delay = delay
+
+    def read(self) -> bytes:
+        time.sleep(self._delay)
+        return pickle.dumps(np.zeros(10))
+
+
+class SlowItemDataset(MyDataset):
+    def get_sample(self, idx: int) -> TypelessSample:
+        super().get_sample(idx)
+        reader = _SlowReader(0.05 if idx == 0 else 0.0)
+        return TypelessSample(x=StoredItem(reader, PickleParser()))
+
+
+class _CostCache(MemoCache):
+    def __init__(self) -> None:
+        super().__init__()
+        self.costs: list[tuple[float | None, bool]] = []
+
+    @property
+    def uses_cost(self) -> bool:
+        return True
+
+    def put(self, key: Any, value: Any, cost: float | None = None) -> None:
+        loaded = isinstance(value, Sample) and all(
+            not isinstance(x, CachedItem) or x.is_cached for x in value.values()
+        )
+        self.costs.append((cost, loaded))
+        super().put(key, value, cost=cost)
+
+
+def _failing(get_sample: Any) -> Any:
+    def fn(idx: int) -> TypelessSample:
+        get_sample(idx)
+        raise RuntimeError(f"Failed at {idx}")
+
+    return fn
+
+
+class PidDataset(Dataset[TypelessSample]):
+    def get_sample(self, idx: int) -> TypelessSample:
+        return TypelessSample(pid=MemoryItem(os.getpid(), PickleParser()))
+
+    def get_slice(self, idx: slice) -> Dataset[TypelessSample]:
+        raise NotImplementedError()
+
+    def size(self) -> int:
+        return 20
+
+
+def _segment_exists(name: str) -> bool:
+    return Path("/dev/shm", name).exists()
+
+
+class TestSharedIndex:
+    # The index normally lives in the manager process, test it in-process.
+    def _segment(self, size: int) -> str:
+        shm = cache_module._create_segment(size)
+        shm.close()
+        return shm.name
+
+    def test_maxsize(self) -> None:
+        index = cache_module._SharedIndex(maxsize=2, maxbytes=None)
+        names = [self._segment(10) for _ in range(3)]
+        assert [index.put(i, x, 10) for i, x in enumerate(names)] == [0, 0, 1]
+        assert index.get(0) is None and index.get(2) == (names[2], 10)
+        assert index.segments() == names[1:] and index.nbytes() == 20
+        assert not _segment_exists(names[0])
+        index.clear()
+        assert index.segments() == [] and index.nbytes() == 0
+        assert not any(_segment_exists(x) for x in names)
+
+    def test_maxbytes(self) -> None:
+        index = cache_module._SharedIndex(maxsize=None, maxbytes=25)
+        names = [self._segment(10) for _ in range(4)]
+        assert index.put(0, names[0], 10) == 0
+        assert index.put(1, names[1], 10) == 0
+        assert index.put(0, names[2], 10) == 0
+        assert not _segment_exists(names[0])
+        assert index.put(2, names[3], 10) == 1
+        assert index.segments() == [names[2], names[3]] and index.nbytes() == 20
+        index.clear()
+
+    def test_unlink_missing(self) -> None:
+        name = self._segment(10)
+        cache_module._unlink_segment(name)
+        cache_module._unlink_segment(name)
+        assert not _segment_exists(name)
+
+
+class TestSharedCache:
+    def test_get_put_clear(self) -> None:
+        cache: SharedCache[str, Any] = SharedCache()
+        assert cache.get("a") is None
+        cache.put("a", 10)
+        cache.put("b", np.ones(10))
+        assert cache.get("a") == 10
+        assert np.array_equal(cache.get("b"), np.ones(10))
+        cache.put("a", 20)
+        assert cache.get("a") == 20
+        names = cache._index.segments()
+        assert all(_segment_exists(x) for x in names)
+        cache.clear()
+        assert cache.get("a") is None
+        assert not any(_segment_exists(x) for x in names)
+
+    def test_max_segments(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache: SharedCache[int, int] = SharedCache()
+        monkeypatch.setattr(cache, "_max_segments", 2)
+        for i in range(4):
+            cache.put(i, i)
+        assert list(cache._segments) == [2, 3]
+        # Forgotten segments are looked up in the index again.
+        assert [cache.get(i) for i in range(2)] == [0, 1]
+        assert list(cache._segments) == [0, 1]
+
+    def test_maxsize(self) -> None:
+        cache: SharedCache[int, int] = SharedCache(maxsize=3)
+        for i in range(5):
+            cache.put(i, i)
+        assert [cache.get(i) for i in range(5)] == [None, None, 2, 3, 4]
+
+    def test_maxbytes(self) -> None:
+        value = np.zeros(1000, dtype=np.uint8)
+        cache: SharedCache[int, np.ndarray] = SharedCache(maxbytes=3500)
+        for i in range(5):
+            cache.put(i, value)
+        cache.put(5, np.zeros(5000, dtype=np.uint8))
+        stored = [cache.get(i) is not None for i in range(6)]
+        assert stored == [False, False, True, True, True, False]
+
+    def test_pickle(self) -> None:
+        cache: SharedCache[str, int] = SharedCache()
+        cache.put("a", 10)
+        re_cache = pickle.loads(pickle.dumps(cache))
+        assert re_cache.get("a") == 10
+        re_cache.put("b", 20)
+        assert cache.get("b") == 20
+        names = cache._index.segments()
+        del re_cache
+        gc.collect()
+        assert all(_segment_exists(x) for x in names)
+        del cache
+        gc.collect()
+        assert not any(_segment_exists(x) for x in names)
+
+    def test_evicted_segment(self) -> None:
+        cache: SharedCache[str, int] = SharedCache()
+        cache.put("a", 10)
+        name, _ = cache._index.get("a")
+        SharedMemory(name=name).unlink()
+        assert cache.get("a") is None
+
+    def test_outdated_segment(self) -> None:
+        cache: SharedCache[str, int] = SharedCache(maxsize=2)
+        cache.put("a", 10)
+        assert cache.get("a") == 10
+        re_cache = pickle.loads(pickle.dumps(cache))
+        re_cache.put("a", 20)
+        assert cache.get("a") == 20
+        re_cache.put("b", 30)
+        re_cache.put("c", 40)
+        assert cache.get("a") is None
+        assert cache.nbytes == sum(
+            len(pickle.dumps(x, protocol=pickle.HIGHEST_PROTOCOL)) for x in [30, 40]
+        )
+        assert cache.stats.evictions == 0 and re_cache.stats.evictions == 1
+
+    def test_loads_items(self) -> None:
+        cache: SharedCache[str, TypelessSample] = SharedCache()
+        item = CachedItem(_stored_array(100))
+        cache.put("a", TypelessSample(x=item))
+        assert item.is_cached
+        re_cache = pickle.loads(pickle.dumps(cache))
+        shared = re_cache.get("a")["x"]
+        assert isinstance(shared, CachedItem) and shared.is_cached
+
+    def test_cache_op_grabber(self) -> None:
+        dataset = CacheOp(SharedCache)(PidDataset())
+        grabber = Grabber(num_workers=2)
+        with grabber(dataset) as ctx:
+            pids = {i: sample["pid"]() for i, sample in ctx}
+        assert os.getpid() not in pids.values()
+        for i, sample in enumerate(dataset):
+            assert sample["pid"]() == pids[i]
+
+
+class TestDiskCache:
+    def test_get_put_clear(self, tmp_path: Path) -> None:
+        cache: DiskCache[Any, Any] = DiskCache(tmp_path / "cache")
+        assert cache.get("a") is None
+        cache.put("a", 10)
+        cache.put(("b", 1), np.ones(10))
+        assert cache.get("a") == 10
+        assert np.array_equal(cache.get(("b", 1)), np.ones(10))
+        cache.put("a", 20)
+        assert cache.get("a") == 20
+        cache.clear()
+        assert cache.get("a") is None
+        assert len(list((tmp_path / "cache").iterdir())) == 0
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        DiskCache(tmp_path).put("a", {"value": 10})
+        cache: DiskCache[str, Any] = DiskCache(tmp_path)
+        assert cache.get("a") == {"value": 10}
+        re_cache = pickle.loads(pickle.dumps(cache))
+        assert re_cache.get("a") == {"value": 10}
+
+    def test_maxbytes(self, tmp_path: Path) -> None:
+        value = np.zeros(1000, dtype=np.uint8)
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        cache: DiskCache[int, np.ndarray] = DiskCache(tmp_path, maxbytes=3 * size)
+        for i in range(3):
+            cache.put(i, value)
+            os.utime(cache._file(i), ns=(i * 10**9, i * 10**9))
+        assert cache.get(0) is not None  # 0 becomes the most recently used
+        cache.put(3, value)
+        assert [cache.get(i) is not None for i in range(4)] == [True, False, True, True]
+        cache.put(4, np.zeros(10000, dtype=np.uint8))
+        assert cache.get(4) is None
+
+        cache = DiskCache(tmp_path, maxbytes=size)
+        cache.put(5, value)
+        assert [cache.get(i) is not None for i in range(6)] == [False] * 5 + [True]
+
+    def test_nbytes(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        value = np.zeros(1000, dtype=np.uint8)
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        cache: DiskCache[int, np.ndarray] = DiskCache(tmp_path, maxbytes=3 * size)
+        for _ in range(3):
+            cache.put(0, value)
+        assert cache.nbytes == size
+        other: DiskCache[int, np.ndarray] = DiskCache(tmp_path, maxbytes=3 * size)
+        other.put(1, value)
+        assert cache.nbytes == size
+        assert cache.get(1) is not None
+        assert cache.nbytes == 2 * size
+
+        globs: list[str] = []
+        glob = Path.glob
+        monkeypatch.setattr(Path, "glob", lambda p, x: globs.append(x) or glob(p, x))
+        for i in range(2, 10):
+            cache.put(i, value)
+        assert cache.nbytes == 3 * size
+        assert cache.stats.evictions == 7
+        assert globs == []
+
+        other.put(10, value)
+        cache._rescan_period = 0.0
+        cache.put(11, value)
+        assert len(globs) == 1
+        assert cache.nbytes == 3 * size
+        assert len(list(tmp_path.iterdir())) == 3
+
+    def test_corrupted(self, tmp_path: Path) -> None:
+        cache: DiskCache[str, int] = DiskCache(tmp_path)
+        cache.put("a", 10)
+        cache._file("a").write_bytes(b"")
+        assert cache.get("a") is None
+        assert not cache._file("a").exists()
+
+    def test_cache_op(self, tmp_path: Path) -> None:
+        op = CacheOp(DiskCache, path=tmp_path)
+        dataset = MyDataset()
+        cached = op(dataset)
+        for _ in range(5):
+            cached[0]
+        assert dataset.getitem_called == 1
+
+
+class TestTieredCache:
+    def test_get_put_clear(self, tmp_path: Path) -> None:
+        cache: TieredCache[str, np.ndarray] = TieredCache(250, path=tmp_path)
+        for i, key in enumerate("abcd"):
+            cache.put(key, np.full(100, i, dtype=np.uint8))
+        assert len(cache._hot) == 2 and cache.nbytes == 200
+        for i, key in enumerate("abcd"):
+            value = cache.get(key)
+            assert value is not None and value[0] == i
+        assert cache.get("e") is None
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions) == (4, 1, 6)
+        assert len(cache._index) == 4
+        assert len(list(tmp_path.iterdir())) == 1
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.nbytes == 0
+        assert len(list(tmp_path.iterdir())) == 0
+
+    def test_put_replace(self, tmp_path: Path) -> None:
+        cache: TieredCache[str, int] = TieredCache(30, path=tmp_path)
+        cache.put("a", 10)
+        cache.put("b", 20)
+        cache.put("a", 30)
+        cache.put("a", 40)
+        assert cache.get("a") == 40
+        assert cache.get("b") == 20
+        assert cache.get("a") == 40
+
+    def test_too_large(self, tmp_path: Path) -> None:
+        cache: TieredCache[str, np.ndarray] = TieredCache(50, path=tmp_path)
+        cache.put("a", np.zeros(10, dtype=np.uint8))
+        cache.put("b", np.ones(100, dtype=np.uint8))
+        assert list(cache._hot) == ["a"]
+        value = cache.get("b")
+        assert value is not None and np.array_equal(value, np.ones(100))
+        assert list(cache._hot) == ["a"]
+
+    def test_sample(self, tmp_path: Path) -> None:
+        cache: TieredCache[int, TypelessSample] = TieredCache(0, path=tmp_path)
+        item = CachedItem(_stored_array(100))
+        cache.put(0, TypelessSample(a=item))
+        assert item.is_cached
+        sample = cache.get(0)
+        assert sample is not None and sample["a"].is_cached  # type: ignore
+
+    def test_pickle(self, tmp_path: Path) -> None:
+        cache: TieredCache[str, int] = TieredCache(30, path=tmp_path)
+        for i, key in enumerate("abc"):
+            cache.put(key, i)
+        re_cache = pickle.loads(pickle.dumps(cache))
+        assert [re_cache.get(key) for key in "abc"] == [0, 1, 2]
+        re_cache.put("d", 3)
+        re_cache.put("e", 4)
+        assert [re_cache.get(key) for key in "abcde"] == [0, 1, 2, 3, 4]
+        assert len(list(tmp_path.iterdir())) == 2
+        del re_cache
+        gc.collect()
+        assert len(list(tmp_path.iterdir())) == 1
+        assert [cache.get(key) for key in "abc"] == [0, 1, 2]
+        del cache
+        gc.collect()
+        assert len(list(tmp_path.iterdir())) == 0
+
+    def test_default_path(self) -> None:
+        cache: TieredCache[str, int] = TieredCache(0)
+        cache.put("a", 10)
+        assert cache.get("a") == 10
+
+    def test_init_fail(self) -> None:
+        with pytest.raises(ValueError):
+            TieredCache(-1)
+
+
+class TestShardedCache(TestCache):
+    @pytest.mark.parametrize(
+        "calls",
+        [
+            [
+                CacheCall("put", [0, 10], None),
+                CacheCall("put", [1, 20], None),
+                CacheCall("put", [2, 30], None),
+                CacheCall("get", [0], 10),
+                CacheCall("put", [4, 40], None),
+                CacheCall("get", [2], None),
+                CacheCall("get", [1], 20),
+                CacheCall("get", [0], 10),
+                CacheCall("clear", [], None),
+                CacheCall("get", [0], None),
+            ],
+        ],
+    )
+    def test_sharded_cache(self, calls: list[CacheCall]) -> None:
+        cache: ShardedCache[int, int] = ShardedCache(LRUCache, shards=2, maxsize=4)
+        self._test_cache(cache, calls)
+
+    def test_limits(self) -> None:
+        cache: ShardedCache[int, Any] = ShardedCache(
+            FIFOCache, shards=4, maxsize=10, maxbytes=None
+        )
+        for shard in cache._shards:
+            assert isinstance(shard, FIFOCache)
+            assert shard._maxsize == 3 and shard._maxbytes is None
+        cache = ShardedCache(shards=2, maxsize=None, maxbytes=1000)
+        for shard in cache._shards:
+            assert isinstance(shard, LRUCache) and shard._maxbytes == 500
+
+    def test_stats(self) -> None:
+        cache: ShardedCache[int, np.ndarray] = ShardedCache(
+            LRUCache, shards=2, maxsize=2, maxbytes=10**6
+        )
+        for i in range(4):
+            cache.put(i, np.zeros(100, dtype=np.uint8))
+        cache.get(0)
+        cache.get(3)
+        assert cache.stats == CacheStats(hits=1, misses=1, evictions=2, nbytes=200)
+        assert cache.nbytes == 200
+
+    def test_instrument_locks(self) -> None:
+        cache: ShardedCache[int, int] = ShardedCache(LRUCache, shards=3, maxsize=6)
+        originals = [shard._lock for shard in cache._shards]
+        with cache.instrument_locks(_CountingLock) as locks:
+            assert len(locks) == 3
+            for i in range(6):
+                cache.put(i, i)
+                cache.get(i)
+        assert sum(x.acquisitions for x in locks) == 12
+        assert [shard._lock for shard in cache._shards] == originals
+
+    def test_init_fail(self) -> None:
+        with pytest.raises(ValueError):
+            ShardedCache(shards=0)
+
+
+class TestCompressedCache(TestCache):
+    @pytest.mark.parametrize(
+        "calls",
+        [
+            [
+                CacheCall("put", ["a", 10], None),
+                CacheCall("put", ["b", [1, 2, 3]], None),
+                CacheCall("get", ["a"], 10),
+                CacheCall("get", ["b"], [1, 2, 3]),
+                CacheCall("get", ["c"], None),
+                CacheCall("put", ["c", 30], None),
+                CacheCall("get", ["a"], None),
+                CacheCall("clear", [], None),
+                CacheCall("get", ["b"], None),
+            ],
+        ],
+    )
+    def test_compressed_cache(self, calls: list[CacheCall]) -> None:
+        cache: CompressedCache[str, Any] = CompressedCache(LRUCache, maxsize=2)
+        self._test_cache(cache, calls)
+
+    def test_compression(self) -> None:
+        cache: CompressedCache[str, np.ndarray] = CompressedCache(
+            LRUCache, maxsize=None, maxbytes=10**6
+        )
+        cache.put("a", np.zeros((100, 100), dtype=np.uint8))
+        value = cache.get("a")
+        assert value is not None and np.array_equal(value, np.zeros((100, 100)))
+        assert cache.get("a") is not value
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions) == (2, 0, 0)
+        assert 0 < stats.nbytes == cache.nbytes < 1000
+
+    def test_sample(self) -> None:
+        item = CachedItem(_stored_array(100))
+        cache: CompressedCache[int, TypelessSample] = CompressedCache()
+        cache.put(0, TypelessSample(a=item, b=_stored_array(10)))
+        assert item.is_cached
+        sample = cache.get(0)
+        assert sample is not None
+        assert isinstance(sample["a"], CachedItem) and sample["a"].is_cached
+        assert np.array_equal(sample["a"](), item())
+
+    @pytest.mark.parametrize("level", [-1, 10])
+    def test_init_fail(self, level: int) -> None:
+        with pytest.raises(ValueError):
+            CompressedCache(level=level)
+
+
+class _CountingLock:
+    def __init__(self, lock: Any) -> None:
+        self.lock = lock
+        self.acquisitions = 0
+        self.depth = 0
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        self.acquisitions += 1
+        self.depth += 1
+
+    def __exit__(self, *args: Any) -> None:
+        self.depth -= 1
+        self.lock.release()
+
+
+class TestCacheStats:
+    def test_counters(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        assert cache.stats == CacheStats(hits=0, misses=0, evictions=0, nbytes=0)
+        assert cache.stats.hit_rate == 0.0
+        for key in "abac":
+            if cache.get(key) is None:
+                cache.put(key, 0)
+        cache.put("c", 1)
+        cache.clear()
+        stats = cache.stats
+        assert stats == CacheStats(hits=1, misses=3, evictions=1, nbytes=0)
+        assert stats.hit_rate == 0.25
+        assert cache.is_local
+        re_cache = pickle.loads(pickle.dumps(cache))
+        assert re_cache.stats == stats
+        assert not cache.is_local and not re_cache.is_local
+
+    def test_maxbytes(self) -> None:
+        cache: FIFOCache[str, np.ndarray] = FIFOCache(maxsize=None, maxbytes=250)
+        for key in "abc":
+            cache.put(key, np.zeros(100, dtype=np.uint8))
+        cache.put("c", np.zeros(50, dtype=np.uint8))
+        assert cache.stats == CacheStats(hits=0, misses=0, evictions=1, nbytes=150)
+
+    def test_instrument_locks(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        lock = cache._lock
+        with pytest.raises(RuntimeError):
+            with cache.instrument_locks(_CountingLock) as locks:
+                cache.put("a", 1)
+                cache.get("a")
+                raise RuntimeError()
+        assert [x.acquisitions for x in locks] == [2]
+        assert cache._lock is lock
+
+    def test_memo(self) -> None:
+        cache: MemoCache[str, int] = MemoCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        assert cache.stats == CacheStats(hits=1, misses=1, evictions=0, nbytes=0)
+
+    def test_shared(self) -> None:
+        cache: SharedCache[str, bytes] = SharedCache(maxsize=2)
+        for key in "abc":
+            cache.put(key, b"x" * 100)
+        cache.get("a")
+        cache.get("c")
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 1)
+        assert stats.nbytes == 2 * len(pickle.dumps(b"x" * 100, protocol=5))
+
+    def test_disk(self, tmp_path: Path) -> None:
+        cache: DiskCache[str, bytes] = DiskCache(tmp_path, maxbytes=300)
+        for key in "abc":
+            cache.put(key, b"x" * 100)
+            time.sleep(0.01)
+        cache.get("a")
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions) == (0, 1, 1)
+        assert stats.nbytes == sum(x.stat().st_size for x in tmp_path.iterdir())
+
+
 class TestCacheOp:
     def test_call(self) -> None:
         op = CacheOp(MemoCache)
@@ -447,6 +1602,314 @@ class TestCacheOp:
             cached[0]
         assert dataset.getitem_called == 1
 
+    def test_call_keyword(self) -> None:
+        op = CacheOp(cache_type=LRUCache, maxsize=2)
+        cached = op(MyDataset())
+        assert isinstance(op.cache, LRUCache) and op.cache._maxsize == 2
+        op = CacheOp(cache_type=ShardedCache, inner_type=FIFOCache, shards=2)
+        cached = op(MyDataset())
+        assert isinstance(op.cache, ShardedCache)
+        assert all(isinstance(x, FIFOCache) for x in op.cache._shards)
+
+    def test_call_maxbytes(self) -> None:
+        op = CacheOp(LRUCache, maxsize=None, maxbytes=10)
+        dataset = MyDataset()
+        cached = op(dataset)
+        for _ in range(5):
+            cached[0]
+        assert dataset.getitem_called == 1
+
+    @pytest.mark.parametrize(
+        ["cache_type", "expected"], [[LRUCache, 12], [GreedyDualSizeCache, 11]]
+    )
+    def test_call_cost(self, cache_type: type[Cache], expected: int) -> None:
+        dataset = SlowDataset()
+        cached = CacheOp(cache_type, maxsize=2)(dataset)
+        for idx in [*range(10), 0, 1]:
+            cached[idx]
+        assert dataset.getitem_called == expected
+
+    @pytest.mark.parametrize(
+        ["cache_type", "params", "expected"],
+        [
+            [LRUCache, {}, 12],
+            [GreedyDualSizeCache, {}, 11],
+            [ShardedCache, {"inner_type": GreedyDualSizeCache, "shards": 1}, 11],
+            [CompressedCache, {"inner_type": GreedyDualSizeCache}, 11],
+        ],
+    )
+    def test_call_cost_decode(
+        self, cache_type: type[Cache], params: dict, expected: int
+    ) -> None:
+        dataset = SlowItemDataset()
+        cached = CacheOp(cache_type, maxsize=2, **params)(dataset)
+        for idx in [*range(10), 0, 1]:
+            cached[idx]["x"]()
+        assert dataset.getitem_called == expected
+
+    def test_call_cost_protocol(self) -> None:
+        cache = _CostCache()
+        assert ShardedCache(_CostCache, shards=2).uses_cost
+        assert CompressedCache(_CostCache).uses_cost
+        assert ShardedCache(GreedyDualSizeCache).uses_cost
+        assert not LRUCache().uses_cost
+        cache.put(0, 0, cost=2.0)
+        assert cache.costs == [(2.0, False)]
+
+        op = CacheOp(_CostCache)
+        cached = op(SlowItemDataset())
+        cached[0]
+        cached[1]
+        assert isinstance(op.cache, _CostCache)
+        (cost_0, loaded_0), (cost_1, loaded_1) = op.cache.costs
+        assert loaded_0 and loaded_1
+        assert cost_0 >= 0.05 > cost_1
+
+    @pytest.mark.parametrize("fail", [False, True])
+    def test_call_concurrent(self, fail: bool) -> None:
+        dataset = SlowDataset()
+        if fail:
+            dataset.get_sample = _failing(dataset.get_sample)  # type: ignore
+        cached = CacheOp(LRUCache, maxsize=2)(dataset)
+        results: list[Any] = []
+
+        def get() -> None:
+            try:
+                results.append(cached[0])
+            except RuntimeError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert dataset.getitem_called == 1
+        assert len(results) == 8
+        assert all(isinstance(x, RuntimeError) == fail for x in results)
+        if fail:
+            with pytest.raises(RuntimeError):
+                cached[0]
+            assert dataset.getitem_called == 2
+
+    def test_call_flights(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        flights = []
+
+        class _CountingFlight(cache_module._SingleFlight):
+            def __init__(self) -> None:
+                super().__init__()
+                flights.append(self)
+
+        monkeypatch.setattr(cache_module, "_SingleFlight", _CountingFlight)
+        op = CacheOp(LRUCache, maxsize=2)
+        cached = op(MyDataset())
+        for idx in [0, 0, 1, 2, 1]:
+            cached[idx]
+        assert len(flights) == 1
+
+    @pytest.mark.parametrize(
+        ["cache_type", "cache_params"],
+        [
+            [LRUCache, {"maxsize": 2}],
+            [ShardedCache, {"shards": 2}],
+            [CompressedCache, {}],
+        ],
+    )
+    @pytest.mark.parametrize("validate", [False, True])
+    def test_call_recheck(
+        self, cache_type: type[Cache], cache_params: dict[str, Any], validate: bool
+    ) -> None:
+        dataset = MyDataset()
+        op = CacheOp(cache_type, validate=validate, **cache_params)
+        cached = op(dataset)
+        flight = op._flight
+
+        def _flight(cache_id: str) -> Any:
+            # Another thread computes the sample between the miss and the flight.
+            assert op.cache is not None
+            op.cache.put(0, TypelessSample(x=MemoryItem(1, PickleParser())))
+            return flight(cache_id)
+
+        op._flight = _flight  # type: ignore
+        assert cached[0]["x"]() == 1
+        assert dataset.getitem_called == 0
+        assert op.cache is not None
+        nbytes = op.cache.nbytes
+        assert op.stats == CacheStats(hits=0, misses=1, evictions=0, nbytes=nbytes)
+
+    def test_cache(self) -> None:
+        op = CacheOp(LRUCache, maxsize=2)
+        assert op.cache is None
+        cached = op(MyDataset())
+        cached[0]
+        cached[0]
+        assert op.cache is not None
+        assert op.cache.stats.hits == 1 and op.cache.stats.misses == 1
+        assert pickle.loads(pickle.dumps(op)).cache is None
+        del cached
+        gc.collect()
+        assert op.cache is None
+
+    def test_stats(self) -> None:
+        op = CacheOp(LRUCache, maxsize=2)
+        assert op.stats is None
+        cached = op(MyDataset())
+        cached[0]
+        cached[0]
+        assert op.stats == CacheStats(hits=1, misses=1, evictions=0, nbytes=0)
+        del cached
+        gc.collect()
+        assert op.cache is None
+        assert op.stats == CacheStats(hits=1, misses=1, evictions=0, nbytes=0)
+        op(MyDataset())
+        assert op.stats == CacheStats(hits=0, misses=0, evictions=0, nbytes=0)
+
+    def test_stats_previous_cache(self) -> None:
+        op = CacheOp(LRUCache, maxsize=2)
+        first = op(MyDataset())
+        first[0]
+        second = op(MyDataset())
+        # Collecting the dataset of a previous call does not affect the stats.
+        del first
+        gc.collect()
+        assert op.stats == CacheStats(hits=0, misses=0, evictions=0, nbytes=0)
+        second[0]
+        assert op.stats == CacheStats(hits=0, misses=1, evictions=0, nbytes=0)
+
+    def test_stats_workers(self) -> None:
+        op = CacheOp(MemoCache)
+        cached = op(PidDataset())
+        with Grabber(num_workers=2)(cached) as ctx:
+            for _ in ctx:
+                pass
+        assert op.cache is not None and not op.cache.is_local
+        assert op.stats is None
+        del cached
+        gc.collect()
+        assert op.stats is None
+
+    def test_validate_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            CacheOp(MemoCache, validate=True, validate_interval=-1)
+
+    @pytest.mark.parametrize(
+        ["validate", "interval", "expected"],
+        [[False, 0.0, 1], [True, 0.0, 22], [True, 3600.0, 1]],
+    )
+    def test_call_validate(
+        self, tmp_path: Path, validate: bool, interval: float, expected: int
+    ) -> None:
+        path = tmp_path / "value.json"
+        path.write_text("1")
+        dataset = ListDataset(
+            [
+                TypelessSample(
+                    value=StoredItem(LocalFileReader(path), JSONParser()),
+                    other=MemoryItem(0, PickleParser()),
+                )
+            ]
+        )
+        op = CacheOp(MemoCache, validate=validate, validate_interval=interval)
+        cached = op(dataset)
+        assert cached[0]["value"]() == 1
+        assert cached[0]["value"]() == 1
+        path.write_text("22")
+        assert cached[0]["value"]() == expected
+
+    def test_call_validate_batched(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clock = [100.0]
+        fake_time = SimpleNamespace(
+            monotonic=lambda: clock[0], perf_counter=time.perf_counter
+        )
+        monkeypatch.setattr(cache_module, "time", fake_time)
+        (tmp_path / "shared.json").write_text("0")
+        shared = StoredItem(_CountingFileReader(tmp_path / "shared.json"), JSONParser())
+        samples = []
+        for i in range(5):
+            (tmp_path / f"{i}.json").write_text(str(i))
+            item = StoredItem(_CountingFileReader(tmp_path / f"{i}.json"), JSONParser())
+            samples.append(TypelessSample(value=item, shared=shared))
+        op = CacheOp(MemoCache, validate=True, validate_interval=10.0)
+        cached = op(ListDataset(samples))
+        for _ in range(2):
+            assert [cached[i]["value"]() for i in range(5)] == list(range(5))
+        assert shared.reader.fingerprint_called == 1  # type: ignore
+        clock[0] += 10.0
+        (tmp_path / "shared.json").unlink()
+        (tmp_path / "shared.json").write_text("10")
+        assert [cached[i]["shared"]() for i in range(5)] == [10] * 5
+        assert shared.reader.fingerprint_called == 2  # type: ignore
+        for sample in samples:
+            assert sample["value"].reader.fingerprint_called == 2  # type: ignore
+
+    def test_call_validate_default_interval(self, tmp_path: Path) -> None:
+        (tmp_path / "shared.json").write_text("0")
+        shared = StoredItem(_CountingFileReader(tmp_path / "shared.json"), JSONParser())
+        samples = []
+        for i in range(5):
+            (tmp_path / f"{i}.json").write_text(str(i))
+            item = StoredItem(_CountingFileReader(tmp_path / f"{i}.json"), JSONParser())
+            samples.append(TypelessSample(value=item, shared=shared))
+        cached = CacheOp(MemoCache, validate=True)(ListDataset(samples))
+        for _ in range(2):
+            assert [cached[i]["value"]() for i in range(5)] == list(range(5))
+        # Without an interval, every access to a cached sample takes the fingerprints
+        # of all its readers, even the shared ones.
+        assert shared.reader.fingerprint_called == 10  # type: ignore
+        for sample in samples:
+            assert sample["value"].reader.fingerprint_called == 2  # type: ignore
+
+    def test_call_validate_unhashable_reader(self, tmp_path: Path) -> None:
+        class _UnhashableReader(_CountingFileReader):
+            __hash__ = None  # type: ignore
+
+        path = tmp_path / "value.json"
+        path.write_text("1")
+        item = StoredItem(_UnhashableReader(path), JSONParser())
+        cached = CacheOp(MemoCache, validate=True)(
+            ListDataset([TypelessSample(x=item)])
+        )
+        assert cached[0]["x"]() == 1
+        path.write_text("22")
+        assert cached[0]["x"]() == 22
+
+    def test_validator_recheck(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        clock = [100.0]
+        fake_time = SimpleNamespace(monotonic=lambda: clock[0])
+        monkeypatch.setattr(cache_module, "time", fake_time)
+        validator = cache_module._Validator(10.0)
+        sample = TypelessSample(x=MemoryItem(1, PickleParser()))
+        validator.track(0, sample)
+        lock = validator._lock
+
+        class _RefreshingLock:
+            # Another thread validates the sample while this one waits for the lock.
+            def __enter__(self) -> None:
+                lock.acquire()
+                validator._samples[0] = ((), clock[0])
+
+            def __exit__(self, *args: Any) -> None:
+                lock.release()
+
+        validator._lock = _RefreshingLock()  # type: ignore
+        clock[0] += 10.0
+        assert not validator.is_stale(0, sample)
+
+    def test_call_validate_other_process(self, tmp_path: Path) -> None:
+        path = tmp_path / "value.json"
+        path.write_text("1")
+        item = StoredItem(LocalFileReader(path), JSONParser())
+        op = CacheOp(MemoCache, validate=True)
+        cached = op(ListDataset([TypelessSample(value=item)]))
+        assert cached[0]["value"]() == 1
+        # Samples cached by another process have no fingerprint in this one.
+        op._validators.clear()
+        assert cached[0]["value"]() == 1
+        path.write_text("22")
+        assert cached[0]["value"]() == 22
+
     def test_input_type(self) -> None:
         assert issubclass(CacheOp(MemoCache).input_type, Dataset)
 
@@ -454,6 +1917,129 @@ class TestCacheOp:
         assert issubclass(CacheOp(MemoCache).output_type, Dataset)
 
 
+class ThreadDataset(Dataset[TypelessSample]):
+    def __init__(self, delay: float = 0.0, fail_at: int | None = None) -> None:
+        super().__init__()
+        self.background: dict[int, bool] = {}
+        self._delay = delay
+        self._fail_at = fail_at
+
+    def get_sample(self, idx: int) -> TypelessSample:
+        time.sleep(self._delay)
+        if idx == self._fail_at:
+            raise RuntimeError(f"Failed at {idx}")
+        self.background[idx] = threading.current_thread() is not threading.main_thread()
+        return TypelessSample(value=MemoryItem(np.full(100, idx), PickleParser()))
+
+    def get_slice(self, idx: slice) -> Dataset[TypelessSample]:
+        raise NotImplementedError()
+
+    def size(self) -> int:
+        return 20
+
+
+class TestPrefetchOp:
+    @pytest.mark.parametrize(
+        ["order", "prefetched"],
+        [
+            [list(range(20)), set(range(3, 20))],
+            [list(range(0, 20, 3)), set(range(9, 20, 3))],
+            [list(range(19, -1, -1)), set(range(16, -1, -1))],
+            [[5, 1, 8, 2, 9, 0, 12, 3], set()],
+            [[0, 0, 1, 1, 2, 2, 3, 4], {3, 4}],
+            [[0, 1, 2, 15, 14, 13, 12], {12}],
+        ],
+    )
+    def test_call(self, order: list[int], prefetched: set[int]) -> None:
+        dataset = ThreadDataset()
+        prefetching = PrefetchOp(depth=4)(dataset)
+        for idx in order:
+            assert prefetching[idx]["value"]()[0] == idx
+        assert {idx for idx in order if dataset.background[idx]} == prefetched
+
+    def test_call_maxbytes(self) -> None:
+        dataset = ThreadDataset()
+        prefetching = PrefetchOp(maxbytes=0)(dataset)
+        for idx in range(20):
+            prefetching[idx]
+        assert not any(dataset.background.values())
+
+    def test_call_maxbytes_pending(self) -> None:
+        sample = cache_module._Prefetcher(1, 1, None)._load(ThreadDataset(), 0)
+        maxbytes = int(2.5 * estimate_nbytes(sample))
+        dataset = ThreadDataset(delay=0.05)
+        prefetching = PrefetchOp(depth=8, workers=8, maxbytes=maxbytes)(dataset)
+        id_ = prefetching._get_sample_fn.args[1]  # type: ignore
+        prefetcher = InheritedData.data[id_]
+        for idx in range(3):
+            prefetching[idx]
+        # The size of the samples is unknown, a single sample is prefetched.
+        assert list(prefetcher._futures) == [3]
+        while prefetcher._estimate is None:
+            time.sleep(0.01)
+        prefetching[3]
+        # Pending samples reserve their estimated size.
+        assert sorted(prefetcher._futures) == [4, 5, 6]
+        for idx in range(4, 20):
+            assert prefetching[idx]["value"]()[0] == idx
+        assert all(dataset.background[idx] for idx in range(3, 20))
+
+    def test_call_pattern_change(self) -> None:
+        dataset = ThreadDataset(delay=0.01)
+        prefetching = PrefetchOp(depth=8, workers=1)(dataset)
+        for idx in [0, 1, 2, 19]:
+            assert prefetching[idx]["value"]()[0] == idx
+
+    def test_call_fail(self) -> None:
+        prefetching = PrefetchOp()(ThreadDataset(fail_at=5))
+        for idx in range(5):
+            prefetching[idx]
+        with pytest.raises(RuntimeError):
+            prefetching[5]
+
+    @pytest.mark.parametrize("kwargs", [{"depth": 0}, {"workers": 0}, {"maxbytes": -1}])
+    def test_init_fail(self, kwargs: dict[str, Any]) -> None:
+        with pytest.raises(ValueError):
+            PrefetchOp(**kwargs)
+
+    def test_grabber(self) -> None:
+        prefetching = PrefetchOp()(ThreadDataset())
+        grabber = Grabber(num_workers=2)
+        with grabber(prefetching) as ctx:
+            for idx, sample in ctx:
+                assert sample["value"]()[0] == idx
+
+    def test_pickle(self) -> None:
+        prefetching = PrefetchOp()(ThreadDataset())
+        for idx in range(5):
+            prefetching[idx]
+        id_ = prefetching._get_sample_fn.args[1]  # type: ignore
+        prefetcher = pickle.loads(pickle.dumps(InheritedData.data[id_]))
+        assert prefetcher._last is None and not prefetcher._futures
+        InheritedData.data[id_] = prefetcher
+        for idx in range(5, 20):
+            assert prefetching[idx]["value"]()[0] == idx
+        assert prefetcher._last == 19
+
+    @pytest.mark.parametrize("read", [True, False])
+    def test_finalize(self, read: bool) -> None:
+        prefetching = PrefetchOp()(ThreadDataset())
+        if read:
+            for idx in range(5):
+                prefetching[idx]
+        id_ = prefetching._get_sample_fn.args[1]  # type: ignore
+        assert id_ in InheritedData.data
+        del prefetching
+        gc.collect()
+        assert id_ not in InheritedData.data
+
+    def test_input_type(self) -> None:
+        assert issubclass(PrefetchOp().input_type, Dataset)
+
+    def test_output_type(self) -> None:
+        assert issubclass(PrefetchOp().output_type, Dataset)
+
+
 class TestItemCacheOp:
     def test_cal(self) -> None:
         op = ItemCacheOp()
@@ -463,6 +2049,20 @@ class TestItemCacheOp:
             for item in sample.values():
                 assert isinstance(item, CachedItem)
 
+    def test_call_validate(self, tmp_path: Path) -> None:
+        path = tmp_path / "value.json"
+        path.write_text("1")
+        item = StoredItem(LocalFileReader(path), JSONParser())
+        cached = ItemCacheOp(validate=True)(ListDataset([TypelessSample(value=item)]))
+        value = cached[0]["value"]
+        assert isinstance(value, CachedItem) and value() == 1
+        path.write_text("22")
+        assert value() == 22
+
+    def test_init_fail(self) -> None:
+        with pytest.raises(ValueError):
+            ItemCacheOp(validate=True, validate_interval=-1)
+
 
 class TestMemorizeEverythingOp:
     def test_call(self) -> None:
@@ -474,3 +2074,22 @@ class TestMemorizeEverythingOp:
         for _ in range(5):
             cached[0]
         assert dataset.getitem_called == len(dataset)
+
+    def test_call_compression(self) -> None:
+        op = MemorizeEverythingOp(compression=1)
+        dataset = PidDataset()
+        cached = op(dataset)
+        for i in range(len(dataset)):
+            assert cached[i]["pid"]() == os.getpid()
+
+    @pytest.mark.parametrize("compression", [None, 1])
+    def test_call_maxbytes(self, tmp_path: Path, compression: int | None) -> None:
+        op = MemorizeEverythingOp(
+            Grabber(num_workers=2), compression, maxbytes=200, spill_path=tmp_path
+        )
+        cached = op(PidDataset())
+        assert len(list(tmp_path.iterdir())) == 1
+        pids = [sample["pid"]() for sample in cached]
+        with Grabber(num_workers=2)(cached) as ctx:
+            for i, sample in ctx:
+                assert sample["pid"]() == pids[i]
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from pipewine import (
+    CatOp,
+    Dataset,
+    DedupOp,
+    DuplicatesSample,
+    Grabber,
+    ListDataset,
+    MemoryItem,
+    NearDuplicatesOp,
+    NumpyNpyParser,
+    PerceptualHashMapper,
+    TypelessSample,
+)
+from pipewine.operators import dedup
+
+
+class TestDedupOp:
+    @pytest.mark.parametrize("grabber", [None, Grabber(num_workers=2)])
+    @pytest.mark.parametrize("algorithm", ["sha256", "xxh3_128"])
+    def test_call(self, letter_dataset: Dataset, grabber, algorithm: str) -> None:
+        data = CatOp()([letter_dataset, letter_dataset[3:6], letter_dataset[:2]])
+        op = DedupOp(algorithm=algorithm, grabber=grabber)
+        unique, groups = op(data)
+        n = len(letter_dataset)
+        assert len(unique) == n
+        for i in range(n):
+            assert unique[i]["metadata"]() == letter_dataset[i]["metadata"]()
+        assert len(groups) == 5
+        indices = sorted(sample.indices() for sample in groups)
+        assert indices == [[0, n + 3], [1, n + 4], [3, n], [4, n + 1], [5, n + 2]]
+        for sample in groups:
+            assert isinstance(sample, DuplicatesSample)
+            assert isinstance(sample.hash(), str)
+
+    def test_call_no_duplicates(self, letter_dataset: Dataset) -> None:
+        unique, groups = DedupOp()(letter_dataset)
+        assert len(unique) == len(letter_dataset)
+        assert len(groups) == 0
+
+    def test_call_keys(self, letter_dataset: Dataset) -> None:
+        unique, groups = DedupOp(keys=["shared"])(letter_dataset)
+        assert len(unique) == 1
+        assert len(groups) == 1
+        assert groups[0].indices() == list(range(len(letter_dataset)))
+
+
+class TestNearDuplicatesOp:
+    @pytest.mark.parametrize("grabber", [None, Grabber(num_workers=2)])
+    @pytest.mark.parametrize("method", ["average", "difference"])
+    def test_call(self, letter_dataset: Dataset, grabber, method) -> None:
+        data = CatOp()([letter_dataset, letter_dataset[3:6], letter_dataset[:2]])
+        op = NearDuplicatesOp(threshold=0, method=method, grabber=grabber)
+        unique, groups = op(data)
+        n = len(letter_dataset)
+        assert len(unique) == n - sum(len(x.indices()) - 2 for x in groups)
+        indices = [sample.indices() for sample in groups]
+        for expected in [[0, n + 3], [1, n + 4], [3, n], [4, n + 1], [5, n + 2]]:
+            assert any(set(expected) <= set(x) for x in indices)
+        for sample in groups:
+            assert isinstance(sample, DuplicatesSample)
+            assert unique[0]["image"]() is not None
+
+    def test_call_threshold(self, letter_dataset: Dataset) -> None:
+        unique, groups = NearDuplicatesOp(threshold=63)(letter_dataset)
+        assert len(unique) == 1
+        assert len(groups) == 1
+        assert groups[0].indices() == list(range(len(letter_dataset)))
+
+    def test_call_empty(self, letter_dataset: Dataset) -> None:
+        unique, groups = NearDuplicatesOp()(letter_dataset[:0])
+        assert len(unique) == 0
+        assert len(groups) == 0
+
+    def test_call_empty_workers(self, letter_dataset: Dataset) -> None:
+        op = NearDuplicatesOp(grabber=Grabber(num_workers=2))
+        unique, groups = op(letter_dataset[:0])
+        assert len(unique) == 0
+        assert len(groups) == 0
+
+    @pytest.mark.parametrize(
+        ["threshold", "max_bucket"], [(0, 256), (8, 2), (12, 256), (63, 16)]
+    )
+    def test_call_buckets(self, monkeypatch, threshold: int, max_bucket: int) -> None:
+        monkeypatch.setattr(dedup, "_MAX_BUCKET", max_bucket)
+        rng = np.random.default_rng(42)
+        base = rng.integers(0, 256, (100, 8, 8), dtype=np.uint8)
+        noise = rng.integers(0, 2, (100, 8, 8), dtype=np.uint8)
+        images = np.concatenate([base, base, base + noise, base[:50]])
+        data = ListDataset(
+            [TypelessSample(image=MemoryItem(x, NumpyNpyParser())) for x in images]
+        )
+        unique, groups = NearDuplicatesOp(threshold=threshold, batch_size=7)(data)
+
+        hashes = PerceptualHashMapper().hash_batch(list(images))
+        bits = np.unpackbits(
+            np.array([list(bytes.fromhex(h)) for h in hashes], np.uint8), axis=1
+        )
+        close = (bits[:, None] != bits[None]).sum(axis=2) <= threshold
+        parent = list(range(len(images)))
+        for i, j in zip(*np.nonzero(close)):
+            while parent[i] != i:
+                i = parent[i]
+            while parent[j] != j:
+                j = parent[j]
+            parent[max(i, j)] = min(i, j)
+        roots = []
+        for i in range(len(images)):
+            while parent[i] != i:
+                i = parent[i]
+            roots.append(i)
+        expected = sorted(
+            [i for i in range(len(images)) if roots[i] == r] for r in set(roots)
+        )
+        assert len(unique) == len(expected)
+        assert sorted(x.indices() for x in groups) == [
+            x for x in expected if len(x) > 1
+        ]
+
+    @pytest.mark.parametrize(
+        ["threshold", "size", "batch_size"],
+        [(-1, 8, 1), (64, 8, 1), (16, 4, 1), (4, 8, 0)],
+    )
+    def test_init_fail(self, threshold: int, size: int, batch_size: int) -> None:
+        with pytest.raises(ValueError):
+            NearDuplicatesOp(threshold=threshold, size=size, batch_size=batch_size)
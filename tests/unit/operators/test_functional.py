@@ -1,8 +1,32 @@
 import numpy as np
 from pydantic import BaseModel
 
-from pipewine import Dataset, FilterOp, GroupByOp, Item, MapOp, SortOp, TypedSample
+from pipewine import (
+    CatOp,
+    Dataset,
+    DiskCache,
+    FilterOp,
+    GroupByOp,
+    IndexedDataset,
+    Item,
+    JSONParser,
+    KeyIndexOp,
+    ListDataset,
+    LocalFileReader,
+    MapOp,
+    Mapper,
+    MemoCache,
+    MemoryItem,
+    PickleParser,
+    SortOp,
+    StoredItem,
+    TypedSample,
+    TypelessSample,
+    UnderfolderSink,
+    UnderfolderSource,
+)
 from collections.abc import Callable
+from pathlib import Path
 import pytest
 
 
@@ -134,3 +158,165 @@ class TestSortOp:
         assert len(out) == len(expected_letters)
         for x, exp in zip(out, expected_letters):
             assert x.metadata().letter == exp
+
+
+class TestKeyIndexOp:
+    @staticmethod
+    def _index_color(idx: int, sample: LetterSample) -> str:
+        return sample.metadata().color
+
+    def test_call(self, letter_dataset: Dataset[LetterSample]) -> None:
+        op = KeyIndexOp(self._index_color)
+        out = op(letter_dataset)
+        assert isinstance(out, IndexedDataset)
+        assert len(out) == len(letter_dataset)
+        assert [x.metadata().letter for x in out.lookup("cyan")] == ["d", "q"]
+        assert len(out.lookup("magenta")) == 0
+        letters = [x.metadata().letter for x in out.lookup_range("blue", "cyan")]
+        assert letters == ["b", "l", "o", "k", "t", "u", "z"]
+
+    def test_persist(
+        self,
+        letter_dataset: Dataset[LetterSample],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        path = UnderfolderSource.index_path(tmp_path, "color")
+        out = KeyIndexOp(self._index_color, path=path)(letter_dataset)
+        assert path.is_file()
+
+        op = KeyIndexOp(self._index_color, path=path)
+        monkeypatch.setattr(op, "_fn", None)
+        re_out = op(letter_dataset)
+        assert re_out.index == out.index
+
+        re_out = KeyIndexOp(self._index_color, path=path)(letter_dataset[:10])
+        assert len(re_out) == 10
+        assert sum(len(x) for x in re_out.index.values()) == 10
+
+    def test_persist_stale(
+        self, letter_dataset: Dataset[LetterSample], tmp_path: Path
+    ) -> None:
+        folder = tmp_path / "dataset"
+        UnderfolderSink(folder)(letter_dataset)
+        dataset = UnderfolderSource(folder, sample_type=LetterSample)()
+        path = UnderfolderSource.index_path(folder, "color")
+        KeyIndexOp(self._index_color, path=path)(dataset)
+
+        # A different key function invalidates the index.
+        out = KeyIndexOp(lambda i, x: x.metadata().letter, path=path)(dataset)
+        assert [x.metadata().letter for x in out.lookup("d")] == ["d"]
+        out = KeyIndexOp(self._index_color, path=path)(dataset)
+        assert [x.metadata().letter for x in out.lookup("cyan")] == ["d", "q"]
+
+        # Modified files invalidate the index, even if the length does not change.
+        metadata = dataset[0].metadata().model_copy(update={"color": "cyan"})
+        item = dataset[0]["metadata"]
+        file = item.reader.path  # type: ignore
+        file.unlink()  # The sink may have hard-linked the file.
+        file.write_bytes(item.parser.dump(metadata))
+        dataset = UnderfolderSource(folder, sample_type=LetterSample)()
+        out = KeyIndexOp(self._index_color, path=path)(dataset)
+        assert [x.metadata().letter for x in out.lookup("cyan")] == ["a", "d", "q"]
+
+    def test_persist_memory(self, tmp_path: Path) -> None:
+        path = tmp_path / "index.pkl"
+        dataset = ListDataset(
+            [TypelessSample(a=MemoryItem(i % 2, PickleParser())) for i in range(4)]
+        )
+        KeyIndexOp(lambda i, x: x["a"](), path=path)(dataset)
+        op = KeyIndexOp(lambda i, x: x["a"](), path=path)
+        assert op(dataset).index == {0: [0, 2], 1: [1, 3]}
+        assert op._load_index(dataset) is None
+
+
+class _CountingMapper(Mapper[LetterSample, LetterSample]):
+    def __init__(self, color: str) -> None:
+        self.color = color
+        self.calls = 0
+
+    def __call__(self, idx: int, x: LetterSample) -> LetterSample:
+        self.calls += 1
+        metadata = x.metadata().model_copy(update={"color": self.color})
+        return x.with_values(metadata=metadata)
+
+
+class TestMapOp:
+    def test_call(self, letter_dataset: Dataset[LetterSample]) -> None:
+        mapper = _CountingMapper("red")
+        out = MapOp(mapper)(letter_dataset)
+        for _ in range(2):
+            for sample in out:
+                assert sample.metadata().color == "red"
+        assert mapper.calls == 2 * len(letter_dataset)
+
+    def test_call_cache(
+        self, tmp_path: Path, letter_dataset: Dataset[LetterSample]
+    ) -> None:
+        n = len(letter_dataset)
+        for _ in range(2):
+            mapper = _CountingMapper("red")
+            out = MapOp(mapper, cache=DiskCache(tmp_path))(letter_dataset)
+            for sample in out:
+                assert sample.metadata().color == "red"
+        assert mapper.calls == 0
+
+        mapper = _CountingMapper("green")
+        out = MapOp(mapper, cache=DiskCache(tmp_path))(letter_dataset)
+        assert [x.metadata().color for x in out] == ["green"] * n
+        assert mapper.calls == n
+
+        cache = MemoCache()
+        mapper = _CountingMapper("red")
+        out = MapOp(mapper, cache=cache)(CatOp()([letter_dataset, letter_dataset]))
+        for sample in out:
+            assert sample.metadata().color == "red"
+        assert mapper.calls == n
+
+    def test_call_cache_stale(self, tmp_path: Path) -> None:
+        files = [tmp_path / f"{i}.json" for i in range(3)]
+        for i, file in enumerate(files):
+            file.write_text(str(i))
+        dataset = ListDataset(
+            [
+                TypelessSample(value=StoredItem(LocalFileReader(f), JSONParser()))
+                for f in files
+            ]
+        )
+        calls: list[int] = []
+
+        def fn(idx: int, x: TypelessSample) -> TypelessSample:
+            calls.append(idx)
+            return TypelessSample(value=MemoryItem(x["value"]() * 2, PickleParser()))
+
+        op = MapOp(fn, cache=DiskCache(tmp_path / "cache"))
+        assert [x["value"]() for x in op(dataset)] == [0, 2, 4]
+        files[1].write_text("10")
+        assert [x["value"]() for x in op(dataset)] == [0, 20, 4]
+        assert calls == [0, 1, 2, 1]
+
+    def test_call_cache_code(self) -> None:
+        def make_mapper(offset: int) -> Mapper:
+            class _Mapper(Mapper[TypelessSample, TypelessSample]):
+                def __init__(self) -> None:
+                    self.keys = {"a", "b", "c", "d"}
+
+                if offset == 0:
+
+                    def __call__(self, idx: int, x: TypelessSample) -> TypelessSample:
+                        return TypelessSample(a=MemoryItem(x["a"](), PickleParser()))
+
+                else:
+
+                    def __call__(self, idx: int, x: TypelessSample) -> TypelessSample:
+                        value = x["a"]() + 1
+                        return TypelessSample(a=MemoryItem(value, PickleParser()))
+
+            return _Mapper()
+
+        dataset = ListDataset([TypelessSample(a=MemoryItem(1, PickleParser()))])
+        cache = MemoCache()
+        assert MapOp(make_mapper(0), cache=cache)(dataset)[0]["a"]() == 1
+        assert MapOp(make_mapper(1), cache=cache)(dataset)[0]["a"]() == 2
+        keys = [MapOp(make_mapper(0), cache=cache)._fingerprint for _ in range(2)]
+        assert keys[0] == keys[1]
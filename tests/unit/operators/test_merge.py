@@ -1,5 +1,6 @@
 from pipewine import (
     CatOp,
+    JoinOp,
     ZipOp,
     LazyDataset,
     MemoryItem,
@@ -12,6 +13,7 @@ from pipewine import (
     Sample,
 )
 import pytest
+from typing import Literal
 
 
 class NumberSample(TypedSample):
@@ -55,3 +57,57 @@ class TestZipOp:
         out = op((dataset, dataset_b))
         for x in out:
             assert x["number"]() == x["other"]()
+
+
+class TestJoinOp:
+    @staticmethod
+    def _key_mod_3(idx: int, sample: Sample) -> int:
+        return sample["number"]() % 3
+
+    @staticmethod
+    def _key_mod_4(idx: int, sample: Sample) -> int:
+        return sample["number"]() % 4
+
+    @staticmethod
+    def _key_other(idx: int, sample: Sample) -> int:
+        return sample["other"]()
+
+    @pytest.mark.parametrize(
+        ["how", "expected"],
+        [
+            ["inner", [(0, 0), (0, 0), (1, 1), (2, 2), (4, 0), (4, 0), (5, 1)]],
+            [
+                "left",
+                [(0, 0), (0, 0), (1, 1), (2, 2), (3, None), (4, 0), (4, 0), (5, 1)],
+            ],
+        ],
+    )
+    def test_call(
+        self, how: Literal["inner", "left"], expected: list[tuple[int, int | None]]
+    ) -> None:
+        left = RangeDataset(0, 6)
+        rename = MapOp(RenameMapper({"number": "other"}))
+        right = CatOp()([rename(RangeDataset(0, 3)), rename(RangeDataset(0, 1))])
+        op: JoinOp[Sample] = JoinOp(self._key_mod_4, right_fn=self._key_other, how=how)
+        out = op((left, right))
+        assert len(out) == len(expected)
+        for sample, (number, other) in zip(out, expected):
+            assert sample["number"]() == number
+            if other is None:
+                assert "other" not in sample
+            else:
+                assert sample["other"]() == other
+
+    def test_same_key(self) -> None:
+        dataset = RangeDataset(10, 20)
+        op: JoinOp[NumberSample] = JoinOp(self._key_mod_3, out_type=NumberSample)
+        out = op((dataset, dataset[:3]))
+        assert len(out) == 10
+        for i, sample in enumerate(out):
+            assert isinstance(sample, NumberSample)
+            assert sample.number() in (10, 11, 12)
+            assert sample.number() % 3 == (i + 10) % 3
+
+    def test_invalid_how(self) -> None:
+        with pytest.raises(ValueError):
+            JoinOp(self._key_mod_3, how="outer")  # type: ignore
@@ -0,0 +1,162 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pipewine import (
+    Dataset,
+    Grabber,
+    ListDataset,
+    LocalFileReader,
+    MemoryItem,
+    NearestNeighborsOp,
+    NeighborsSample,
+    NumpyNpyParser,
+    StoredItem,
+    TypelessSample,
+)
+
+
+def _make_dataset(embeddings: np.ndarray) -> Dataset:
+    return ListDataset(
+        [TypelessSample(embedding=MemoryItem(e, NumpyNpyParser())) for e in embeddings]
+    )
+
+
+def _make_stored_dataset(files: list[Path]) -> Dataset:
+    return ListDataset(
+        [
+            TypelessSample(embedding=StoredItem(LocalFileReader(f), NumpyNpyParser()))
+            for f in files
+        ]
+    )
+
+
+def _brute_force(index: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+    if metric == "cosine":
+        index = index / np.linalg.norm(index, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        return 1.0 - queries @ index.T
+    return np.linalg.norm(queries[:, None, :] - index[None, :, :], axis=2)
+
+
+class TestNearestNeighborsOp:
+    @pytest.mark.parametrize("metric", ["euclidean", "cosine"])
+    @pytest.mark.parametrize("k", [1, 3, 50])
+    @pytest.mark.parametrize("block_size", [1, 7, 4096])
+    @pytest.mark.parametrize("grabber", [None, Grabber(num_workers=2)])
+    def test_call(self, metric, k: int, block_size: int, grabber) -> None:
+        rng = np.random.default_rng(42)
+        index = rng.normal(size=(40, 2, 4)).astype(np.float32)
+        queries = rng.normal(size=(9, 8)).astype(np.float32)
+        op = NearestNeighborsOp(
+            k=k, metric=metric, block_size=block_size, grabber=grabber
+        )
+        out = op((_make_dataset(index), _make_dataset(queries)))
+        expected = _brute_force(index.reshape(40, -1), queries, metric)
+        assert len(out) == len(queries)
+        for i, sample in enumerate(out):
+            assert isinstance(sample, NeighborsSample)
+            indices, distances = sample.indices(), sample.distances()
+            assert len(indices) == min(k, len(index))
+            assert np.all(np.diff(distances) >= 0)
+            assert np.allclose(
+                distances, np.sort(expected[i])[: len(indices)], atol=1e-4
+            )
+            assert np.allclose(expected[i][indices], distances, atol=1e-4)
+
+    def test_call_self(self) -> None:
+        data = _make_dataset(np.arange(10, dtype=np.float32).reshape(10, 1) ** 2)
+        out = NearestNeighborsOp(k=2)((data, data))
+        assert [x.indices()[0] for x in out] == list(range(10))
+        assert out[3].indices().tolist() == [3, 2]
+
+    def test_call_path(self, tmp_path: Path) -> None:
+        rng = np.random.default_rng(42)
+        index = rng.normal(size=(20, 6)).astype(np.float32)
+        files = []
+        for i, embedding in enumerate(index):
+            files.append(tmp_path / "data" / f"{i}.npy")
+            files[-1].parent.mkdir(exist_ok=True)
+            np.save(files[-1], embedding)
+        stored = _make_stored_dataset(files)
+        path = tmp_path / "sub" / "index.npy"
+        fingerprint_path = tmp_path / "sub" / "index.npy.fingerprint"
+        op = NearestNeighborsOp(k=3, path=path)
+        out = op((stored, _make_dataset(index[:5])))
+        assert path.is_file()
+        assert fingerprint_path.is_file()
+        assert np.allclose(np.load(path), index)
+
+        mtime = path.stat().st_mtime_ns
+        out2 = op((_make_stored_dataset(files), _make_dataset(index[:5])))
+        assert path.stat().st_mtime_ns == mtime
+        for a, b in zip(out, out2):
+            assert np.array_equal(a.indices(), b.indices())
+
+        files[0].unlink()
+        np.save(files[0], np.full(6, 100.0, dtype=np.float32))
+        op((_make_stored_dataset(files), _make_dataset(index[:5])))
+        assert np.allclose(np.load(path)[0], 100.0)
+        assert np.allclose(np.load(path)[1:], index[1:])
+
+        other = NearestNeighborsOp(key="other", k=3, path=path)
+        renamed = ListDataset(
+            [TypelessSample(other=x["embedding"]) for x in _make_stored_dataset(files)]
+        )
+        fingerprint = fingerprint_path.read_text()
+        other((renamed, renamed))
+        assert fingerprint_path.read_text() != fingerprint
+
+        out3 = op((_make_dataset(index[:10]), _make_dataset(index[:5])))
+        assert np.allclose(np.load(path), index[:10])
+        assert not fingerprint_path.exists()
+        assert all(x.indices().max() < 10 for x in out3)
+        op((_make_dataset(np.zeros((10, 6), dtype=np.float32)), _make_dataset(index)))
+        assert np.allclose(np.load(path), 0.0)
+
+    def test_call_path_self(self, tmp_path: Path, monkeypatch) -> None:
+        rng = np.random.default_rng(42)
+        matrix = rng.normal(size=(20, 6)).astype(np.float32)
+        data = _make_dataset(matrix)
+        op = NearestNeighborsOp(k=3, path=tmp_path / "index.npy")
+        expected = NearestNeighborsOp(k=3)((data, _make_dataset(matrix)))
+        searched = []
+        search = op._search
+        monkeypatch.setattr(
+            op, "_search", lambda q, i: searched.append(q) or search(q, i)
+        )
+        out = op((data, data))
+        assert len(searched) == 1 and isinstance(searched[0], np.memmap)
+        for a, b in zip(out, expected):
+            assert np.array_equal(a.indices(), b.indices())
+
+    @pytest.mark.parametrize(["n_index", "n_query"], [(0, 3), (3, 0), (0, 0)])
+    def test_call_empty(self, n_index: int, n_query: int) -> None:
+        index = _make_dataset(np.ones((n_index, 4), dtype=np.float32))
+        queries = _make_dataset(np.ones((n_query, 4), dtype=np.float32))
+        out = NearestNeighborsOp()((index, queries))
+        assert len(out) == n_query
+        for sample in out:
+            assert len(sample.indices()) == 0
+
+    def test_call_fail(self) -> None:
+        index = _make_dataset(np.ones((5, 4), dtype=np.float32))
+        with pytest.raises(ValueError):
+            NearestNeighborsOp()((index, _make_dataset(np.ones((2, 3)))))
+        mixed = ListDataset(
+            [
+                TypelessSample(embedding=MemoryItem(np.ones(4), NumpyNpyParser())),
+                TypelessSample(embedding=MemoryItem(np.ones(3), NumpyNpyParser())),
+            ]
+        )
+        with pytest.raises(ValueError):
+            NearestNeighborsOp()((index, mixed))
+
+    @pytest.mark.parametrize(
+        ["k", "block_size", "metric"],
+        [(0, 10, "euclidean"), (5, 0, "cosine"), (5, 10, "WRONG")],
+    )
+    def test_init_fail(self, k: int, block_size: int, metric) -> None:
+        with pytest.raises(ValueError):
+            NearestNeighborsOp(k=k, block_size=block_size, metric=metric)
@@ -1,6 +1,11 @@
+import io
 from collections.abc import Iterable
+from typing import Any
 
-from pipewine import Parser, ParserRegistry
+import numpy as np
+
+from pipewine import ArrayInfo, Parser, ParserRegistry
+from pipewine.parsers.base import _BufferFile
 
 
 class TestParserRegistry:
@@ -45,3 +50,68 @@ class TestParser:
         assert MyParser().type_ is None
         assert MyParser(int).type_ is int
         assert MyParser(MyInteger).type_ is MyInteger
+        assert not MyParser().zero_copy
+
+    def test_parse_buffer(self) -> None:
+        class MyParser(Parser[bytes]):
+            def parse(self, data: bytes) -> bytes:
+                assert isinstance(data, bytes)
+                return data
+
+            def dump(self, data: bytes) -> bytes:
+                return data
+
+            @classmethod
+            def extensions(cls) -> Iterable[str]:
+                return []
+
+        parser = MyParser()
+        for data in [b"10", bytearray(b"10"), memoryview(b"10"), io.BytesIO(b"10")]:
+            assert parser.parse_buffer(data) == b"10"
+
+    def test_parse_region(self) -> None:
+        class MyParser(Parser[np.ndarray]):
+            def parse(self, data: bytes) -> np.ndarray:
+                return np.arange(6).reshape(2, 3)
+
+            def dump(self, data: np.ndarray) -> bytes:
+                return b""
+
+            @classmethod
+            def extensions(cls) -> Iterable[str]:
+                return []
+
+        region = MyParser().parse_region(b"", slice(1, 2), slice(0, 2))
+        assert np.array_equal(region, [[3, 4]])
+
+    def test_probe(self) -> None:
+        class MyParser(Parser[Any]):
+            def parse(self, data: bytes) -> Any:
+                return np.zeros((2, 3)) if data else "not an array"
+
+            def dump(self, data: Any) -> bytes:
+                return b""
+
+            @classmethod
+            def extensions(cls) -> Iterable[str]:
+                return []
+
+        info = MyParser().probe(b"1")
+        assert info == ArrayInfo((2, 3), np.dtype(np.float64))
+        assert info is not None and info.nbytes == 48
+        assert MyParser().probe(b"") is None
+
+
+class TestBufferFile:
+    def test_read(self) -> None:
+        fp = _BufferFile(memoryview(b"0123456789"))
+        assert fp.readable() and fp.seekable()
+        assert fp.read(3) == b"012"
+        assert fp.tell() == 3
+        assert fp.seek(2, io.SEEK_CUR) == 5
+        assert fp.read() == b"56789"
+        assert fp.read(1) == b""
+        assert fp.seek(-2, io.SEEK_END) == 8
+        assert fp.read() == b"89"
+        assert fp.seek(-20, io.SEEK_CUR) == 0
+        assert io.BufferedReader(fp).read() == b"0123456789"
@@ -1,7 +1,22 @@
+import io
+import math
+from collections.abc import Iterable
+from typing import Any
+
+import imageio.v3 as iio
 import numpy as np
 import pytest
+import tifffile
+from PIL import Image
 
-from pipewine import BmpParser, ImageParser, JpegParser, PngParser, TiffParser
+from pipewine import (
+    BmpParser,
+    ImageParser,
+    JpegParser,
+    PngParser,
+    TiffParser,
+    box_reduce,
+)
 
 
 class TestImageParser:
@@ -15,6 +30,22 @@ class TestImageParser:
         assert array.shape == re_array.shape
         if not lossy:
             assert np.allclose(array, re_array)
+        for data in [memoryview(bytes_), io.BytesIO(bytes_)]:
+            assert np.array_equal(parser.parse_buffer(data), re_array)
+        out = np.empty_like(re_array)
+        assert parser.parse_buffer(bytearray(bytes_), out=out) is out
+        assert np.array_equal(out, re_array)
+        with pytest.raises(ValueError):
+            parser.parse_buffer(bytes_, out=np.empty((1, 1), dtype=re_array.dtype))
+
+
+def test_parse_read_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    image = np.zeros((10, 10), dtype=np.uint8)
+    image.flags.writeable = False
+    monkeypatch.setattr(iio, "imread", lambda *args, **kwargs: image)
+    re_image = PngParser().parse(b"")
+    assert re_image.flags.writeable
+    assert np.array_equal(image, re_image)
 
 
 class TestBmpParser(TestImageParser):
@@ -74,3 +105,230 @@ class TestTiffParser(TestImageParser):
     )
     def test_parse(self, image: np.ndarray) -> None:
         self._test_parse(image, TiffParser())
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"tile": (32, 32)},
+            {"tile": (32, 32), "compression": "zlib"},
+            {"rowsperstrip": 16, "compression": "zlib", "predictor": True},
+            {"planarconfig": "separate"},
+        ],
+    )
+    @pytest.mark.parametrize("channels", [None, 3])
+    @pytest.mark.parametrize(
+        "region",
+        [
+            (slice(10, 60), slice(5, 90)),
+            (slice(None), slice(None)),
+            (slice(-3, None), slice(95, 200)),
+            (slice(5, 5), slice(0, 3)),
+            (slice(None, None, 2), slice(3, 9)),
+        ],
+    )
+    def test_parse_region(
+        self,
+        options: dict[str, Any],
+        channels: int | None,
+        region: tuple[slice, slice],
+    ) -> None:
+        shape = (70, 100) if channels is None else (70, 100, channels)
+        image = np.arange(math.prod(shape), dtype=np.uint16).reshape(shape)
+        buffer = io.BytesIO()
+        tifffile.imwrite(buffer, image, **options)
+        for data in [buffer.getvalue(), io.BytesIO(buffer.getvalue())]:
+            re_image = TiffParser().parse_region(data, *region)
+            assert re_image.dtype == image.dtype
+            assert np.array_equal(re_image, image[region])
+
+    def test_parse_region_multipage(self) -> None:
+        image = np.arange(2 * 10 * 20, dtype=np.uint8).reshape(2, 10, 20)
+        data = TiffParser().dump(image)
+        re_image = TiffParser().parse_region(data, slice(1, 2), slice(2, 5))
+        assert np.array_equal(re_image, image[1:2, 2:5])
+
+
+@pytest.mark.parametrize("parser_type", [BmpParser, PngParser, JpegParser, TiffParser])
+@pytest.mark.parametrize("shape", [(61, 83, 3), (64, 48), (5, 7, 3)])
+@pytest.mark.parametrize("reduce", [1, 2, 3, 8, 16])
+def test_parse_reduced(
+    parser_type: type[ImageParser], shape: tuple[int, ...], reduce: int
+) -> None:
+    image = np.full(shape, 120, dtype=np.uint8)
+    parser = parser_type(reduce=reduce)
+    assert parser.reduce == reduce
+    assert parser.preserves_data == (reduce == 1)
+    data = parser_type().dump(image)
+    re_image = parser.parse(data)
+    exp_shape = (math.ceil(shape[0] / reduce), math.ceil(shape[1] / reduce), *shape[2:])
+    assert re_image.shape == exp_shape
+    assert re_image.dtype == np.uint8
+    assert np.abs(re_image.astype(int) - 120).max() <= 2
+    assert np.array_equal(parser.parse_buffer(io.BytesIO(data)), re_image)
+
+
+def test_parse_reduced_average() -> None:
+    image = np.array([[0, 10, 20], [30, 40, 50], [60, 70, 80]], dtype=np.uint8)
+    re_image = PngParser(reduce=2).parse(PngParser().dump(image))
+    assert np.array_equal(re_image, [[20, 35], [65, 80]])
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_box_reduce(dtype: type) -> None:
+    image = np.array([[0, 4, 8], [4, 4, 0]], dtype=dtype)
+    reduced = box_reduce(image, 2)
+    assert reduced.dtype == dtype
+    assert np.array_equal(reduced, [[3, 4]])
+    assert box_reduce(image, 1) is image
+    mask = np.array([[False, True, False], [True, True, False]])
+    assert np.array_equal(box_reduce(mask, 2), [[True, False]])
+
+
+def test_parse_reduced_region() -> None:
+    image = np.arange(64 * 64, dtype=np.uint16).reshape(64, 64)
+    parser = TiffParser(reduce=2)
+    data = TiffParser().dump(image)
+    region = parser.parse_region(data, slice(4, 8), slice(2, 10))
+    assert np.array_equal(region, parser.parse(data)[4:8, 2:10])
+
+
+def test_invalid_reduce() -> None:
+    with pytest.raises(ValueError):
+        JpegParser(reduce=0)
+    with pytest.raises(ValueError):
+        JpegParser().with_reduce(0)
+
+
+class _QualityParser(JpegParser):
+    def __init__(self, quality: int, reduce: int = 1) -> None:
+        super().__init__(reduce=reduce)
+        self.quality = quality
+
+    @classmethod
+    def extensions(cls) -> Iterable[str]:
+        return []
+
+
+def test_with_reduce() -> None:
+    parser = _QualityParser(quality=50, reduce=2)
+    reduced = parser.with_reduce(6)
+    assert isinstance(reduced, _QualityParser)
+    assert (reduced.quality, reduced.reduce) == (50, 6)
+    assert parser.reduce == 2
+
+
+@pytest.mark.parametrize(
+    ["parser_type", "image"],
+    [
+        [PngParser, np.zeros((31, 45), dtype=np.uint8)],
+        [PngParser, np.zeros((31, 45), dtype=np.uint16)],
+        [PngParser, np.zeros((31, 45, 2), dtype=np.uint8)],
+        [PngParser, np.zeros((31, 45, 3), dtype=np.uint8)],
+        [PngParser, np.zeros((31, 45, 4), dtype=np.uint8)],
+        [JpegParser, np.zeros((31, 45), dtype=np.uint8)],
+        [JpegParser, np.zeros((31, 45, 3), dtype=np.uint8)],
+        [TiffParser, np.zeros((31, 45, 3), dtype=np.float32)],
+        [TiffParser, np.zeros((3, 31, 45), dtype=np.uint16)],
+        [BmpParser, np.zeros((31, 45, 3), dtype=np.uint8)],
+    ],
+)
+@pytest.mark.parametrize("reduce", [1, 3])
+def test_probe(
+    monkeypatch: pytest.MonkeyPatch,
+    parser_type: type[ImageParser],
+    image: np.ndarray,
+    reduce: int,
+) -> None:
+    parser = parser_type(reduce=reduce)
+    data = parser_type().dump(image)
+    re_image = parser.parse(data)
+    if parser_type is not BmpParser:
+        # Only the headers are read.
+        monkeypatch.setattr(parser_type, "_decode", None)
+    for buffer in [data, memoryview(data), io.BytesIO(data)]:
+        info = parser.probe(buffer)
+        assert info is not None
+        assert info.shape == re_image.shape
+        assert info.dtype == re_image.dtype
+
+
+@pytest.mark.parametrize(
+    ["mode", "options"],
+    [["P", {}], ["P", {"transparency": 0}], ["1", {}], ["LA", {}]],
+)
+def test_probe_png_modes(mode: str, options: dict[str, Any]) -> None:
+    buffer = io.BytesIO()
+    Image.new(mode, (5, 4)).save(buffer, format="PNG", **options)
+    image = PngParser().parse(buffer.getvalue())
+    info = PngParser().probe(buffer.getvalue())
+    assert info is not None
+    assert (info.shape, info.dtype) == (image.shape, image.dtype)
+
+
+@pytest.mark.parametrize("options", [{"progressive": True}, {"mode": "CMYK"}])
+def test_probe_jpeg_variants(options: dict[str, Any]) -> None:
+    buffer = io.BytesIO()
+    image = Image.new(options.pop("mode", "RGB"), (5, 4))
+    image.save(buffer, format="JPEG", **options)
+    re_image = JpegParser().parse(buffer.getvalue())
+    info = JpegParser().probe(buffer.getvalue())
+    assert info is not None
+    assert (info.shape, info.dtype) == (re_image.shape, re_image.dtype)
+
+
+@pytest.mark.parametrize("parser_type", [PngParser, JpegParser])
+def test_probe_invalid(parser_type: type[ImageParser]) -> None:
+    with pytest.raises(Exception):
+        parser_type().probe(b"not an image")
+
+
+@pytest.mark.parametrize(
+    ["parser_type", "image"],
+    [
+        [PngParser, np.zeros((31, 45, 3), dtype=np.uint8)],
+        [JpegParser, np.zeros((31, 45, 3), dtype=np.uint8)],
+        [TiffParser, np.zeros((31, 45, 3), dtype=np.float32)],
+        [TiffParser, np.zeros((3, 31, 45), dtype=np.uint16)],
+    ],
+)
+def test_probe_truncated(parser_type: type[ImageParser], image: np.ndarray) -> None:
+    data = parser_type().dump(image)
+    header = parser_type()._probe_header(io.BytesIO(data))
+    assert header is not None
+    for n in range(len(data)):
+        re_header = parser_type()._probe_header(io.BytesIO(data[:n]))
+        assert re_header is None or re_header == header
+        if n < 16:
+            assert re_header is None
+
+
+def test_probe_png_truncated_palette() -> None:
+    buffer = io.BytesIO()
+    Image.new("P", (5, 4)).save(buffer, format="PNG", transparency=0)
+    data = buffer.getvalue()
+    # The tRNS chunk is missing, the palette is assumed to be opaque.
+    header = PngParser()._probe_header(io.BytesIO(data[: data.index(b"tRNS") - 4]))
+    assert header == ((4, 5, 3), np.dtype(np.uint8))
+
+
+@pytest.mark.parametrize(
+    ["segments", "valid"],
+    [
+        [b"\xff\xff", True],  # Fill bytes
+        [b"", True],
+        [b"\x00\x00", False],  # Not a marker
+        [b"\xff\xe0\x00\x01", False],  # Segment length smaller than its own size
+    ],
+)
+def test_probe_jpeg_markers(segments: bytes, valid: bool) -> None:
+    data = JpegParser().dump(np.zeros((31, 45), dtype=np.uint8))
+    data = data[:2] + segments + data[2:]
+    header = JpegParser()._probe_header(io.BytesIO(data))
+    assert header == (((31, 45), np.dtype(np.uint8)) if valid else None)
+    assert JpegParser()._probe_header(io.BytesIO(data[:2] + segments)) is None
+
+
+@pytest.mark.parametrize("parser_type", [PngParser, JpegParser, TiffParser])
+def test_probe_header_invalid(parser_type: type[ImageParser]) -> None:
+    assert parser_type()._probe_header(io.BytesIO(b"not an image")) is None
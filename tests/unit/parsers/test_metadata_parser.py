@@ -1,10 +1,14 @@
+import json
+import pickle
 from datetime import datetime
 from typing import Any
 
 import pytest
+import yaml
 from pydantic import BaseModel
 
-from pipewine import JSONParser, YAMLParser
+from pipewine import JSONParser, MetadataBackend, MetadataBackendRegistry, YAMLParser
+from pipewine.parsers import metadata_parser
 
 
 class Entry(BaseModel):
@@ -171,3 +175,56 @@ class TestYAMLParser:
         re_data = parser.parse(parser.dump(data))
         assert isinstance(re_data, type(data))
         assert re_data == data
+
+
+class TestMetadataBackends:
+    @pytest.mark.parametrize(
+        "parser_type, format_", [[JSONParser, "json"], [YAMLParser, "yaml"]]
+    )
+    def test_backends(self, parser_type: type, format_: str) -> None:
+        data = {"a": [1, 2.5, "x"], "b": {"c": None, "d": True}}
+        names = MetadataBackendRegistry.names(format_)
+        assert parser_type().backend is MetadataBackendRegistry.get(format_, names[0])
+        for name in names:
+            parser = parser_type(backend=name)
+            assert parser.backend is MetadataBackendRegistry.get(format_, name)
+            re_parser = pickle.loads(pickle.dumps(parser))
+            for other in names:
+                assert parser_type(backend=other).parse(re_parser.dump(data)) == data
+
+    def test_json_default(self) -> None:
+        assert MetadataBackendRegistry.names("json")[0] == "stdlib"
+        assert JSONParser().backend is MetadataBackendRegistry.get("json", "stdlib")
+        data = {"a": [1, 2.5], "b": float("nan"), "c": 2**70}
+        dumped = JSONParser().dump(data)
+        assert dumped == json.dumps(data).encode()
+        assert JSONParser().parse(dumped)["c"] == 2**70
+
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason="libyaml not available")
+    def test_libyaml_default(self) -> None:
+        assert MetadataBackendRegistry.names("yaml") == ["libyaml", "python"]
+        assert YAMLParser().dump({"b": 1}) == YAMLParser(backend="python").dump(
+            {"b": 1}
+        )
+
+    def test_register_fallback(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(MetadataBackendRegistry, "_backends", {})
+        monkeypatch.setattr(yaml, "__with_libyaml__", False)
+        metadata_parser._register_backends()
+        assert MetadataBackendRegistry.names("yaml") == ["python"]
+        assert MetadataBackendRegistry.names("json")[0] == "stdlib"
+        assert YAMLParser().parse(YAMLParser().dump({"a": [1]})) == {"a": [1]}
+
+    def test_register(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(MetadataBackendRegistry, "_backends", {})
+        with pytest.raises(ValueError):
+            MetadataBackendRegistry.get("json")
+        slow = MetadataBackend(lambda x: "slow", lambda x: b"slow")
+        fast = MetadataBackend(lambda x: "fast", lambda x: b"fast")
+        MetadataBackendRegistry.register("json", "slow", slow)
+        MetadataBackendRegistry.register("json", "fast", fast, priority=5)
+        assert MetadataBackendRegistry.names("json") == ["fast", "slow"]
+        assert JSONParser().parse(b"{}") == "fast"
+        assert JSONParser(backend="slow").dump("x") == b"slow"
+        with pytest.raises(ValueError):
+            JSONParser(backend="missing")
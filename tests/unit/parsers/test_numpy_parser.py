@@ -1,3 +1,5 @@
+import io
+
 import numpy as np
 import pytest
 import math
@@ -35,3 +37,76 @@ class TestNumpyNpyParser:
         assert array.dtype == re_array.dtype
         assert array.shape == re_array.shape
         assert np.allclose(array, re_array)
+
+    @pytest.mark.parametrize("dtype", [np.uint8, np.float32, np.dtype(">i4")])
+    @pytest.mark.parametrize("shape", [[], [10, 0], [10, 3, 4]])
+    @pytest.mark.parametrize("order", ["C", "F"])
+    def test_parse_mmap(self, shape: list[int], dtype: np.dtype, order: str) -> None:
+        array = np.arange(math.prod(shape), dtype=dtype).reshape(shape, order=order)
+        parser = NumpyNpyParser(mmap=True)
+        assert parser.mmap and parser.zero_copy
+        buffer = bytearray(parser.dump(array))
+        re_array = parser.parse(buffer)  # type: ignore
+        assert array.dtype == re_array.dtype
+        assert array.shape == re_array.shape
+        assert np.array_equal(array, re_array)
+        if re_array.size > 0:
+            buffer[-1] ^= 0xFF
+            assert not np.array_equal(array, re_array)
+
+    def test_parse_mmap_copy(self) -> None:
+        parser = NumpyNpyParser(mmap=True)
+        array = np.array([["a", 1]], dtype=object)
+        with pytest.raises(ValueError):
+            parser.parse(parser.dump(array))
+        array = np.arange(3)
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, array, version=(3, 0))
+        re_array = parser.parse(buffer.getvalue())
+        assert re_array.flags.writeable
+        assert np.array_equal(array, re_array)
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    @pytest.mark.parametrize("order", ["C", "F"])
+    def test_parse_buffer(self, mmap: bool, order: str) -> None:
+        array = np.arange(12, dtype=np.int32).reshape((3, 4), order=order)
+        parser = NumpyNpyParser(mmap=mmap)
+        bytes_ = parser.dump(array)
+        for data in [bytes_, memoryview(bytes_), io.BytesIO(bytes_)]:
+            re_array = parser.parse_buffer(data)
+            assert np.array_equal(array, re_array)
+            assert re_array.flags.f_contiguous == (order == "F")
+        assert parser.parse_buffer(bytes_).flags.writeable != mmap
+        out = np.empty_like(array)
+        for data in [bytes_, io.BytesIO(bytes_)]:
+            out[:] = 0
+            assert parser.parse_buffer(data, out=out) is out
+            assert np.array_equal(array, out)
+        with pytest.raises(ValueError):
+            parser.parse_buffer(bytes_, out=np.empty((3, 4), dtype=np.float32))
+        with pytest.raises(ValueError):
+            parser.parse_buffer(bytes_, out=np.empty((4, 3), dtype=np.int32))
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_parse_region(self, mmap: bool) -> None:
+        array = np.arange(60).reshape(6, 10)
+        parser = NumpyNpyParser(mmap=mmap)
+        bytes_ = parser.dump(array)
+        for data in [bytes_, io.BytesIO(bytes_)]:
+            region = parser.parse_region(data, slice(1, 3), slice(2, 8))
+            assert np.array_equal(region, array[1:3, 2:8])
+        region = parser.parse_region(bytes_, slice(1, 3), slice(2, 8))
+        assert region.flags.writeable != mmap
+
+    @pytest.mark.parametrize("version", [(1, 0), (2, 0), (3, 0)])
+    def test_probe(self, version: tuple[int, int]) -> None:
+        array = np.zeros((4, 3), dtype=np.int32)
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, array, version=version)
+        bytes_ = buffer.getvalue()
+        for data in [bytes_, memoryview(bytes_), io.BytesIO(bytes_)]:
+            info = NumpyNpyParser().probe(data)
+            assert info is not None
+            assert info.shape == (4, 3)
+            assert info.dtype == np.int32
+            assert info.nbytes == 48
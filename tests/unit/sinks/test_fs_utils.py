@@ -4,6 +4,7 @@ from collections.abc import Iterable
 from contextlib import nullcontext
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from pipewine import (
@@ -13,6 +14,7 @@ from pipewine import (
     LocalFileReader,
     MemoryItem,
     Parser,
+    PngParser,
     StoredItem,
     write_item_to_file,
 )
@@ -213,3 +215,12 @@ def test_write_item_to_file(
             assert fp.read() == a_string
     elif actual_policy == CopyPolicy.SYMBOLIC_LINK:
         assert dst.is_symlink()
+
+
+def test_write_item_reduced(tmp_path: Path) -> None:
+    src, dst = tmp_path / "src.png", tmp_path / "dst.png"
+    src.write_bytes(PngParser().dump(np.zeros((20, 30), dtype=np.uint8)))
+    item = StoredItem(LocalFileReader(src), PngParser(reduce=2))
+    write_item_to_file(item, dst, CopyPolicy.HARD_LINK)
+    assert not dst.samefile(src)
+    assert PngParser().parse(dst.read_bytes()).shape == (10, 15)
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from pipewine import (
@@ -30,6 +31,13 @@ class TestUnderfolderSource:
         source: UnderfolderSource = UnderfolderSource(underfolder.folder)
         assert source.data_folder == underfolder.folder / "data"
 
+    def test_index_path(self, clone_uf) -> None:
+        path = UnderfolderSource.index_path(clone_uf.folder, "my_key")
+        assert path.parent == clone_uf.folder
+        path.write_bytes(b"index")
+        dataset = UnderfolderSource(clone_uf.folder)()
+        assert set(dataset[0].keys()) == {"image", "metadata", "shared"}
+
     @pytest.mark.parametrize("pass_type", [True, False])
     def test_sample_type(self, underfolder, pass_type: bool) -> None:
         type_ = underfolder.type_ if pass_type else None
@@ -104,6 +112,20 @@ class TestUnderfolderSource:
         )
         assert isinstance(source(), Dataset)
 
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_parser_params(self, tmp_path: Path, mmap: bool) -> None:
+        array = np.arange(100).reshape(10, 10)
+        data_folder = UnderfolderSource.data_path(tmp_path)
+        data_folder.mkdir()
+        np.save(data_folder / "0_array.npy", array)
+        params = {"npy": {"mmap": mmap}}
+        dataset = UnderfolderSource(tmp_path, parser_params=params)()
+        item = dataset[0]["array"]
+        value = item()
+        assert item.parser.zero_copy == mmap
+        assert np.array_equal(value, array)
+        assert value.flags.writeable != mmap
+
     def test_len(self, underfolder) -> None:
         source: UnderfolderSource = UnderfolderSource(underfolder.folder)
         assert len(source()) == underfolder.size
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 
 from pipewine import (
     Dataset,
+    IndexedDataset,
     Item,
     JSONParser,
     LazyDataset,
@@ -166,3 +167,64 @@ class TestListDataset(TestDataset):
         dataset = ListDataset(samples)
         samples = samples[slice_]
         return self._test_getitem_slice(dataset, slice_, samples)
+
+
+class TestIndexedDataset(TestDataset):
+    @pytest.fixture
+    def samples(self) -> list[MySample]:
+        return [MySample.generate() for _ in range(6)]
+
+    @pytest.fixture
+    def indexed(self, samples: list[MySample]) -> IndexedDataset[MySample]:
+        index = {3: [0, 4], 1: [1], 7: [2, 3], 5: [5]}
+        return IndexedDataset(ListDataset(samples), index)
+
+    def test_size(self, indexed: IndexedDataset) -> None:
+        self._test_size(indexed, 6)
+
+    def test_getitem(self, indexed: IndexedDataset, samples: list[MySample]) -> None:
+        for i in range(8):
+            self._test_getitem_single(indexed, i, samples[i] if i < 6 else None)
+        self._test_getitem_slice(indexed, slice(1, 5, 2), samples[1:5:2])
+
+    def test_index(self, indexed: IndexedDataset) -> None:
+        assert set(indexed.keys()) == {1, 3, 5, 7}
+        assert indexed.index[7] == [2, 3]
+        assert list(indexed.positions(3)) == [0, 4]
+        assert list(indexed.positions(2)) == []
+
+    @pytest.mark.parametrize(
+        ["key", "expected"], [[3, [0, 4]], [1, [1]], [7, [2, 3]], [2, []]]
+    )
+    def test_lookup(
+        self,
+        indexed: IndexedDataset,
+        samples: list[MySample],
+        key: int,
+        expected: list[int],
+    ) -> None:
+        result = indexed.lookup(key)
+        assert list(result) == [samples[i] for i in expected]
+
+    @pytest.mark.parametrize(
+        ["start", "stop", "expected"],
+        [
+            [None, None, [1, 0, 4, 5, 2, 3]],
+            [3, 7, [0, 4, 5]],
+            [2, 6, [0, 4, 5]],
+            [None, 3, [1]],
+            [6, None, [2, 3]],
+            [8, None, []],
+        ],
+    )
+    def test_lookup_range(
+        self,
+        indexed: IndexedDataset,
+        samples: list[MySample],
+        start: int | None,
+        stop: int | None,
+        expected: list[int],
+    ) -> None:
+        for _ in range(2):
+            result = indexed.lookup_range(start, stop)
+            assert list(result) == [samples[i] for i in expected]
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+from functools import partial
+
+import numpy as np
+
+from pipewine import (
+    CachedItem,
+    HashMapper,
+    JSONParser,
+    LocalFileReader,
+    MemoryItem,
+    PickleParser,
+    StoredItem,
+)
+from pipewine._fingerprint import item_fingerprint, item_key, stable_digest
+
+
+def _add(x: int, y: int) -> int:
+    return x + y
+
+
+class _Stateful:
+    def __init__(self, values: set[str]) -> None:
+        self.values = values
+        self.array = np.arange(3)
+
+    def __call__(self, x: int) -> int:
+        return x
+
+
+def test_stable_digest_code() -> None:
+    assert stable_digest(lambda x: x + 1) == stable_digest(lambda x: x + 1)
+    assert stable_digest(lambda x: x + 1) != stable_digest(lambda x: x + 2)
+    assert stable_digest(partial(_add, 1)) != stable_digest(partial(_add, 2))
+    assert stable_digest(HashMapper()) == stable_digest(HashMapper())
+    assert stable_digest(HashMapper()) != stable_digest(HashMapper("md5"))
+
+    class Other(_Stateful):
+        def __call__(self, x: int) -> int:
+            return x + 1
+
+    assert stable_digest(_Stateful({"a"})) != stable_digest(Other({"a"}))
+
+
+class _Unpicklable:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __getstate__(self) -> dict:
+        raise TypeError("Cannot pickle")
+
+    def __repr__(self) -> str:
+        return f"_Unpicklable({self.value})"
+
+
+def test_stable_digest_fallbacks() -> None:
+    method = _Stateful({"a"}).__call__
+    assert stable_digest(method) == stable_digest(_Stateful({"a"}).__call__)
+    assert stable_digest(method) != stable_digest(_Stateful({"b"}).__call__)
+    assert stable_digest(len) == stable_digest(len)
+    assert stable_digest(len) != stable_digest(abs)
+    assert stable_digest(os) != stable_digest(sys)
+    assert stable_digest(int) != stable_digest(str)
+    assert stable_digest(_Unpicklable(1)) == stable_digest(_Unpicklable(1))
+    assert stable_digest(_Unpicklable(1)) != stable_digest(_Unpicklable(2))
+
+
+def test_stable_digest_across_runs() -> None:
+    code = (
+        "from pipewine._fingerprint import stable_digest;"
+        "print(stable_digest({'a', 'b', 'c', 1.5, ('x', None)}))"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+            check=True,
+        ).stdout
+        for seed in range(3)
+    }
+    assert len(digests) == 1
+
+
+def test_stable_digest_cycle() -> None:
+    data: list = [1]
+    data.append(data)
+    assert stable_digest(data) == stable_digest(data)
+    state = _Stateful({"b", "a"})
+    state.values.add("c")
+    assert stable_digest(state) != stable_digest(_Stateful({"a", "b"}))
+
+
+def test_item_fingerprint(tmp_path) -> None:
+    path = tmp_path / "file.pkl"
+    path.write_bytes(PickleParser().dump(10))
+    item = StoredItem(LocalFileReader(path), PickleParser())
+    fingerprint = item_fingerprint(item)
+    assert fingerprint is not None
+    assert item_fingerprint(CachedItem(CachedItem(item))) == fingerprint
+    assert item_fingerprint(MemoryItem(10, PickleParser())) is None
+    path.write_bytes(PickleParser().dump(1000))
+    assert item_fingerprint(item) != fingerprint
+
+
+def test_item_key(tmp_path) -> None:
+    files = [tmp_path / "a.pkl", tmp_path / "b.pkl"]
+    for file in files:
+        file.write_bytes(b"data")
+    items = [StoredItem(LocalFileReader(f), PickleParser()) for f in files]
+    keys = [item_key(x) for x in items]
+    assert keys[0] is not None and keys[0] != keys[1]
+    assert item_key(CachedItem(items[0])) == keys[0]
+    assert item_key(StoredItem(LocalFileReader(files[0]), JSONParser())) != keys[0]
+    assert item_key(MemoryItem(1, PickleParser())) is None
+    missing = StoredItem(LocalFileReader(tmp_path / "missing.pkl"), PickleParser())
+    assert item_key(missing) is None
@@ -1,15 +1,24 @@
 import json
+import pickle
+import threading
+import time
+from collections.abc import Hashable
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
+import numpy as np
 import pytest
 
 from pipewine import (
+    ArrayInfo,
     CachedItem,
     Item,
     Reader,
     JSONParser,
+    LocalFileReader,
     MemoryItem,
+    NumpyNpyParser,
     PickleParser,
     Parser,
     StoredItem,
@@ -67,6 +76,16 @@ class MockReader(Reader):
         return self._bytes
 
 
+class CountingFileReader(LocalFileReader):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.fingerprint_called = 0
+
+    def fingerprint(self) -> Hashable | None:
+        self.fingerprint_called += 1
+        return super().fingerprint()
+
+
 class TestStoredItem:
     def test_get(self) -> None:
         parser: JSONParser = JSONParser()
@@ -81,6 +100,15 @@ class TestStoredItem:
         assert item() == value
         assert reader.read_called == 3
 
+    def test_get_zero_copy(self) -> None:
+        parser = NumpyNpyParser(mmap=True)
+        reader = MockReader(parser.dump(np.arange(10)))
+        item = StoredItem(reader, parser)
+        value = item()
+        assert np.array_equal(value, np.arange(10))
+        assert not value.flags.writeable
+        assert reader.read_called == 1
+
     def test_reader(self) -> None:
         parser: JSONParser = JSONParser()
         value = {"a": 10, "b": "hello", "c": [10, 20, 30]}
@@ -107,12 +135,16 @@ class TestStoredItem:
 
 
 class MockItem(MemoryItem):
-    def __init__(self, value: Any, parser: Parser, shared: bool = False) -> None:
+    def __init__(
+        self, value: Any, parser: Parser, shared: bool = False, delay: float = 0.0
+    ) -> None:
         super().__init__(value, parser, shared)
         self.get_called = 0
+        self._delay = delay
 
     def _get(self) -> Any:
         self.get_called += 1
+        time.sleep(self._delay)
         return super()._get()
 
 
@@ -158,3 +190,145 @@ class TestCachedItem:
         item = CachedItem(MockItem(10, JSONParser()))
         new_item = item.with_sharedness(sharedness)
         assert new_item.is_shared == sharedness
+
+    def test_get_none(self) -> None:
+        source_item = MockItem(None, PickleParser())
+        item = CachedItem(source_item)
+        assert not item.is_cached
+        assert item() is None
+        assert item() is None
+        assert item.is_cached
+        assert source_item.get_called == 1
+
+    def test_get_concurrent(self) -> None:
+        source_item = MockItem(10, JSONParser(), delay=0.05)
+        item = CachedItem(source_item)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(item())) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [10] * 8
+        assert source_item.get_called == 1
+
+    @pytest.mark.parametrize("load", [True, False])
+    def test_pickle(self, load: bool) -> None:
+        item = CachedItem(MemoryItem(None, PickleParser()))
+        if load:
+            item()
+        re_item = pickle.loads(pickle.dumps(item))
+        assert re_item.is_cached == load
+        assert re_item() is None
+
+    @pytest.mark.parametrize("validate", [True, False])
+    def test_validate(self, tmp_path: Path, validate: bool) -> None:
+        path = tmp_path / "value.json"
+        path.write_text("10")
+        item = CachedItem(
+            StoredItem(LocalFileReader(path), JSONParser()), validate=validate
+        )
+        assert item() == 10
+        path.write_text("200")
+        assert item() == (200 if validate else 10)
+        new_item = item.with_sharedness(True)
+        assert new_item() == 200
+        path.write_text("3000")
+        assert new_item() == (3000 if validate else 200)
+
+    def test_validate_interval(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clock = [100.0]
+        monkeypatch.setattr(
+            "pipewine.item.time", SimpleNamespace(monotonic=lambda: clock[0])
+        )
+        path = tmp_path / "value.json"
+        path.write_text("10")
+        reader = CountingFileReader(path)
+        item = CachedItem(
+            StoredItem(reader, JSONParser()), validate=True, validate_interval=5.0
+        )
+        assert item() == 10
+        path.write_text("200")
+        clock[0] += 4.0
+        assert item() == 10 and item() == 10
+        assert reader.fingerprint_called == 1
+        clock[0] += 1.0
+        assert item() == 200 and item() == 200
+        assert reader.fingerprint_called == 2
+        assert item.with_sharedness(True)._validate_interval == 5.0
+
+    def test_validate_interval_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            CachedItem(MemoryItem(1, PickleParser()), validate_interval=-1)
+
+    def test_validate_no_fingerprint(self) -> None:
+        reader = MockReader(b"10")
+        item = CachedItem(StoredItem(reader, JSONParser()), validate=True)
+        assert reader.fingerprint() is None
+        assert item() == 10
+        assert item() == 10
+        assert reader.read_called == 1
+
+    def test_on_load(self) -> None:
+        item = CachedItem(MockItem(10, JSONParser(), shared=False))
+        calls: list[bool] = []
+        item.on_load(lambda: calls.append(item.is_cached))
+        item.on_load(lambda: calls.append(item() == 10))
+        assert calls == []
+        re_item = pickle.loads(pickle.dumps(item))
+        assert item() == 10
+        assert calls == [True, True]
+        item()
+        item.on_load(lambda: calls.append(False))
+        assert calls == [True, True, False]
+        assert re_item() == 10
+        assert len(calls) == 3
+
+
+class TestItemRegion:
+    def test_memory(self) -> None:
+        item = MemoryItem(np.arange(12).reshape(3, 4), NumpyNpyParser())
+        assert np.array_equal(item.region(slice(1, 3), slice(0, 2)), [[4, 5], [8, 9]])
+
+    def test_stored(self) -> None:
+        parser = NumpyNpyParser()
+        reader = MockReader(parser.dump(np.arange(12).reshape(3, 4)))
+        item = StoredItem(reader, parser)
+        assert np.array_equal(item.region(slice(1, 3), slice(0, 2)), [[4, 5], [8, 9]])
+
+    def test_cached(self) -> None:
+        source = MockItem(np.arange(12).reshape(3, 4), NumpyNpyParser())
+        item = CachedItem(source)
+        assert np.array_equal(item.region(slice(0, 1), slice(1, 3)), [[1, 2]])
+        assert not item.is_cached
+        item()
+        assert np.array_equal(item.region(slice(0, 1), slice(1, 3)), [[1, 2]])
+        assert source.get_called == 2
+
+
+class TestItemProbe:
+    def test_memory(self) -> None:
+        item = MemoryItem(np.zeros((3, 4), dtype=np.uint16), NumpyNpyParser())
+        info = item.probe()
+        assert info == ArrayInfo((3, 4), np.dtype(np.uint16))
+        assert info is not None and info.nbytes == 24
+        assert MemoryItem({"a": 10}, JSONParser()).probe() is None
+
+    def test_stored(self) -> None:
+        parser = NumpyNpyParser()
+        reader = MockReader(parser.dump(np.zeros((5, 2), dtype=np.float32)))
+        item = StoredItem(reader, parser)
+        assert item.probe() == ArrayInfo((5, 2), np.dtype(np.float32))
+
+    def test_cached(self) -> None:
+        source = MockItem(np.zeros((2, 3)), NumpyNpyParser())
+        item = CachedItem(source)
+        assert item.probe() == ArrayInfo((2, 3), np.dtype(np.float64))
+        assert not item.is_cached
+        item()
+        assert item.probe() == ArrayInfo((2, 3), np.dtype(np.float64))
+        assert source.get_called == 2
@@ -1,3 +1,4 @@
+import mmap
 from pathlib import Path
 
 import pytest
@@ -24,3 +25,23 @@ class TestLocalFileReader:
         fs = LocalFileReader(path)
         with pytest.raises(Exception):
             fs.read()
+
+    def test_fingerprint(self, tmp_path: Path) -> None:
+        path = tmp_path / "a_file"
+        fs = LocalFileReader(path)
+        assert fs.fingerprint() is None
+        path.write_bytes(b"some bytes")
+        fingerprint = fs.fingerprint()
+        assert fingerprint is not None
+        assert fs.fingerprint() == fingerprint
+        path.write_bytes(b"some other bytes")
+        assert fs.fingerprint() != fingerprint
+
+    def test_read_buffer(self, tmp_path: Path) -> None:
+        path = tmp_path / "a_file"
+        path.write_bytes(b"")
+        assert bytes(LocalFileReader(path).read_buffer()) == b""
+        path.write_bytes(b"some bytes")
+        buffer = LocalFileReader(path).read_buffer()
+        assert isinstance(buffer, mmap.mmap)
+        assert bytes(buffer) == b"some bytes"
@@ -1,3 +1,4 @@
+import pickle
 import time
 from collections import deque
 from collections.abc import Callable, Mapping, Sequence
@@ -12,11 +13,19 @@ from pipewine import (
     DatasetSink,
     DatasetSource,
     ListDataset,
+    CacheStats,
+    LRUCache,
+    MemoCache,
     MemoryItem,
     PickleParser,
     TypelessSample,
+    ZipOp,
+    estimate_nbytes,
 )
+from pipewine.grabber import InheritedData
 from pipewine.workflows import (
+    CacheChoiceEvent,
+    CacheStatsEvent,
     Event,
     EventQueue,
     SequentialWorkflowExecutor,
@@ -85,6 +94,13 @@ class Sink(DatasetSink[MyDataset], MockAction):
         self.called.append([data])
 
 
+class WorkerSink(Sink):
+    def __call__(self, data: MyDataset) -> None:
+        # Send the inherited data to a worker, like a grabber does.
+        pickle.dumps(InheritedData.data)
+        super().__call__(data)
+
+
 class Dataset2Dataset(DatasetOperator[MyDataset, MyDataset], MockAction):
     def __call__(self, x: MyDataset) -> MyDataset:
         for _ in self.loop(x):
@@ -221,6 +237,7 @@ class TestSequentialWorkflowExecutor:
         [
             WfOptions(),
             WfOptions(cache=True),
+            WfOptions(cache=True, cache_type=LRUCache, cache_params={"maxbytes": 1000}),
             WfOptions(cache=False),
             WfOptions(checkpoint=True),
             WfOptions(checkpoint=True, collect_after_checkpoint=True),
@@ -253,3 +270,157 @@ class TestSequentialWorkflowExecutor:
 
         if queue is not None:
             queue.close()
+
+    @pytest.mark.parametrize("cache", [True, False])
+    def test_cache_stats(self, cache: bool) -> None:
+        wf = Workflow(
+            options=WfOptions(cache=cache, cache_type=MemoCache, cache_params={})
+        )
+        source = wf.node(Source())()
+        data = wf.node(Dataset2Dataset())(source)
+        wf.node(Sink())(data)
+        queue = MockQueue()
+        executor = SequentialWorkflowExecutor()
+        executor.attach(queue)
+        executor.execute(wf)
+        events = []
+        while (event := queue.capture()) is not None:
+            if isinstance(event, CacheStatsEvent):
+                events.append(event)
+        if not cache:
+            assert events == []
+            return
+        assert [(x.node, x.socket) for x in events] == [
+            (source.node.name, None),
+            (data.node.name, None),
+        ]
+        assert events[0].stats == CacheStats(hits=10, misses=10, evictions=0, nbytes=0)
+        assert events[1].stats == CacheStats(hits=0, misses=10, evictions=0, nbytes=0)
+
+    @pytest.mark.parametrize("sink_type", [Sink, WorkerSink])
+    def test_cache_stats_default(self, sink_type: type[Sink]) -> None:
+        wf = Workflow(options=WfOptions(cache=True))
+        source = wf.node(Source())()
+        wf.node(sink_type())(source)
+        queue = MockQueue()
+        executor = SequentialWorkflowExecutor()
+        executor.attach(queue)
+        executor.execute(wf)
+        events = []
+        while (event := queue.capture()) is not None:
+            if isinstance(event, CacheStatsEvent):
+                events.append(event)
+        if sink_type is WorkerSink:
+            # The accesses of the workers are not counted, no stats are emitted.
+            assert events == []
+            return
+        # The default LIFOCache keeps the last sample only.
+        nbytes = estimate_nbytes(MyDataset(10)[9])
+        assert [x.stats for x in events] == [
+            CacheStats(hits=0, misses=10, evictions=9, nbytes=nbytes)
+        ]
+
+    def test_auto_cache_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            SequentialWorkflowExecutor(auto_cache=True, memory_budget=-1)
+
+    @pytest.mark.parametrize("budget", [None, 3000])
+    def test_auto_cache(self, budget: int | None) -> None:
+        wf = Workflow(options=WfOptions(cache=True))
+        source = wf.node(Source())()
+        other = wf.node(Source())()
+        data = wf.node(Dataset2Dataset())(source)
+        wf.node(Sink())(data)
+        wf.node(Sink())(data)
+        wf.node(Sink())(wf.node(ZipOp())([source, other]))
+        queue = MockQueue()
+        executor = SequentialWorkflowExecutor(auto_cache=True, memory_budget=budget)
+        executor.attach(queue)
+        executor.execute(wf)
+        events = []
+        while (event := queue.capture()) is not None:
+            if isinstance(event, CacheChoiceEvent):
+                events.append(event)
+        assert events == executor.cache_choices
+        choices = {(x.node, x.socket): x for x in events}
+        assert len(choices) == 4
+        assert choices[(source.node.name, None)].cache_type == "LRUCache"
+        assert "ZipOp" in choices[(source.node.name, None)].reason
+        assert choices[(other.node.name, None)].cache_type == "LRUCache"
+        assert choices[(data.node.name, None)].cache_type == "LRUCache"
+        assert "2 consumers" in choices[(data.node.name, None)].reason
+        zipped = [x for x in events if x.node.startswith("ZipOp")]
+        assert zipped[0].cache_type == "LIFOCache"
+        assert zipped[0].cache_params == {"maxsize": 1}
+        assert not any(x.node.startswith("Sink") for x in events)
+        if budget is None:
+            assert choices[(data.node.name, None)].cache_params == {}
+        else:
+            # Weights: 2 consumers for source and data, 1 for other.
+            for node, maxbytes in [(source, 1200), (other, 600), (data, 1200)]:
+                params = choices[(node.node.name, None)].cache_params
+                assert params == {"maxsize": None, "maxbytes": maxbytes}
+
+    def test_auto_cache_unconsumed(self) -> None:
+        wf = Workflow(options=WfOptions(cache=True))
+        source = wf.node(Source())()
+        executor = SequentialWorkflowExecutor(auto_cache=True)
+        executor.execute(wf)
+        assert executor.cache_choices == [
+            CacheChoiceEvent(
+                source.node.name, None, None, {}, "not consumed by any node"
+            )
+        ]
+
+    def test_auto_cache_all_socket(self) -> None:
+        wf = Workflow(options=WfOptions(cache=True))
+        sources = [wf.node(Source())() for _ in range(2)]
+        data = wf.node(List2List())(sources)
+        wf.node(Sink())(wf.node(ZipOp())(data))
+        executor = SequentialWorkflowExecutor(auto_cache=True, memory_budget=1000)
+        executor.execute(wf)
+        choices = {
+            (x.node, x.socket): x
+            for x in executor.cache_choices
+            if x.node == data[0].node.name
+        }
+        assert choices.keys() == {(data[0].node.name, 0), (data[0].node.name, 1)}
+        for choice in choices.values():
+            assert choice.cache_type == "LRUCache"
+            assert choice.cache_params == {"maxsize": None, "maxbytes": 500}
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            WfOptions(cache=False),
+            WfOptions(cache=True, cache_type=MemoCache, cache_params={}),
+            WfOptions(cache=True, cache_params={"maxsize": 3}),
+        ],
+    )
+    def test_auto_cache_explicit(self, options: WfOptions) -> None:
+        wf = Workflow(options=options)
+        source = wf.node(Source())()
+        wf.node(Sink())(source)
+        wf.node(Sink())(source)
+        executor = SequentialWorkflowExecutor(auto_cache=True)
+        executor.execute(wf)
+        assert executor.cache_choices == []
+
+    def test_auto_cache_node_options(self) -> None:
+        wf = Workflow(options=WfOptions(cache=True))
+        source = wf.node(
+            Source(), options=WfOptions(cache_type=MemoCache, cache_params={})
+        )()
+        wf.node(Sink())(source)
+        wf.node(Sink())(source)
+        queue = MockQueue()
+        executor = SequentialWorkflowExecutor(auto_cache=True)
+        executor.attach(queue)
+        executor.execute(wf)
+        assert executor.cache_choices == []
+        events = []
+        while (event := queue.capture()) is not None:
+            if isinstance(event, CacheStatsEvent):
+                events.append(event)
+        assert [x.node for x in events] == [source.node.name]
+        assert events[0].stats.hits == 10